@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from utils import load_orders, load_suppliers, load_risk_report, load_anomalies
+from app.utils import load_suppliers, load_risk_report, load_anomalies, load_kpis, kpi_deltas, load_order_trend, order_trend_bounds
 from app.theme import apply_dark_theme
 
 st.set_page_config(
@@ -68,22 +68,27 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Load data once
-orders_df = load_orders()
+# Load data once (order counts come from the KPI snapshot, not the order table)
+kpi_snapshot = load_kpis()
+kpis = kpi_snapshot["kpis"]
+deltas = kpi_deltas(kpi_snapshot)
 risk_df = load_risk_report()
 alerts_df = load_anomalies()
 
 last_updated = datetime.now().strftime("%d %b %Y • %I:%M %p")
 
-total_orders = len(orders_df)
-total_alerts = len(alerts_df)
+total_orders = kpis["total_orders"]
+total_alerts = kpis["anomaly_records"]
+
+def delta_label(value):
+    return f" ({value:+,})" if value else ""
 
 st.markdown(f"""
 <div class="status-strip">
     <div class="pill">🟢 <span>System:</span> Online</div>
     <div class="pill">🤖 <span>Model:</span> Ready</div>
-    <div class="pill">📦 <span>Total Orders:</span> {total_orders}</div>
-    <div class="pill">🚨 <span>Active Alerts:</span> {total_alerts}</div>
+    <div class="pill">📦 <span>Total Orders:</span> {total_orders}{delta_label(deltas["total_orders"])}</div>
+    <div class="pill">🚨 <span>Active Alerts:</span> {total_alerts}{delta_label(deltas["anomaly_records"])}</div>
     <div class="pill">🕒 <span>Last Updated:</span> {last_updated}</div>
 </div>
 """, unsafe_allow_html=True)
@@ -93,15 +98,45 @@ st.markdown("## 📈 Trends & Risk Insights")
 left, right = st.columns([7, 5])
 
 with left:
-    st.subheader("📊 Orders Trend (Sample)")
-    
-    # If you have a date column, we can do real trend.
-    # Otherwise we generate a dummy trend from total orders.
-    trend = pd.DataFrame({
-        "Day": list(range(1, 15)),
-        "Orders": [max(1, int(total_orders/14) + (i % 3) * 2) for i in range(14)]
-    })
-    st.line_chart(trend.set_index("Day"))
+    st.subheader("📊 Orders Trend")
+
+    # Served from the date-partitioned rollups in dataset/trends/
+    t1, t2, t3 = st.columns([2, 3, 2])
+    with t1:
+        grain = st.selectbox("Granularity", ["daily", "weekly", "monthly"], format_func=str.title)
+    first_date, last_date = order_trend_bounds()
+    with t2:
+        default_start = max(first_date, last_date - pd.Timedelta(days=90)) if first_date is not None else None
+        date_range = st.date_input(
+            "Date range",
+            value=(default_start, last_date) if first_date is not None else (),
+            min_value=first_date,
+            max_value=last_date
+        )
+    with t3:
+        split_by = st.selectbox(
+            "Split by",
+            [None, "region", "item_category", "supplier_id"],
+            format_func=lambda x: "None" if x is None else x.replace("_", " ").title()
+        )
+
+    if isinstance(date_range, tuple) and len(date_range) == 2:
+        start, end = date_range
+    else:
+        # Range still being picked
+        start, end = first_date, last_date
+    trend = load_order_trend(grain, start, end, by=split_by)
+
+    if len(trend) == 0:
+        st.info("No dated orders in the selected range.")
+    elif split_by:
+        st.line_chart(trend.pivot(index="period", columns=split_by, values="orders").fillna(0))
+    else:
+        st.line_chart(
+            trend.set_index("period")[["orders", "delayed_orders"]]
+            .rename(columns={"orders": "Orders", "delayed_orders": "Delayed"})
+        )
+        st.caption(f"Delay rate over range: {trend['delayed_orders'].sum() / trend['orders'].sum() * 100:.1f}%")
 
 with right:
     st.subheader("🏢 Top Risk Suppliers")
@@ -1,5 +1,5 @@
 import streamlit as st
-from app.utils import load_orders
+from app.utils import load_orders, load_kpis, kpi_deltas
 import pandas as pd
 
 from app.theme import apply_dark_theme
@@ -77,13 +77,25 @@ st.markdown("""
 st.markdown("# 🏠 Dashboard Overview")
 st.markdown("Real-time procurement analytics and performance metrics")
 
-df = load_orders()
+# KPIs come from the precomputed snapshot; deltas are vs the previous one
+kpi_snapshot = load_kpis()
+kpis = kpi_snapshot["kpis"]
+deltas = kpi_deltas(kpi_snapshot)
+
+total_orders = kpis["total_orders"]
+delayed_orders = kpis["delayed_orders"]
+ontime_orders = kpis["ontime_orders"]
+on_time_percentage = kpis["on_time_rate_percent"]
+delayed_percentage = kpis["delayed_rate_percent"]
+avg_delay = kpis["avg_delay_days"]
 
-total_orders = len(df)
-delayed_orders = int((df["order_status"] == "Delayed").sum())
-ontime_orders = int((df["order_status"] == "OnTime").sum())
-on_time_percentage = (ontime_orders / total_orders * 100) if total_orders > 0 else 0
-delayed_percentage = (delayed_orders / total_orders * 100) if total_orders > 0 else 0
+def delta_label(key, fmt="{:+,}"):
+    value = deltas[key]
+    if not value:
+        return ""
+    return f'<div class="metric-label">{fmt.format(value)} vs previous snapshot</div>'
+
+st.caption(f"KPI snapshot generated {kpi_snapshot['generated_at']}")
 
 # Key Metrics with custom styling
 st.markdown("### 📊 Key Performance Indicators")
@@ -94,6 +106,7 @@ with col1:
     <div class="metric-card">
         <div class="metric-label">📦 Total Orders</div>
         <div class="metric-value">{total_orders:,}</div>
+        {delta_label("total_orders")}
     </div>
     """, unsafe_allow_html=True)
 
@@ -103,6 +116,7 @@ with col2:
         <div class="metric-label">✅ On-Time Orders</div>
         <div class="metric-value">{ontime_orders:,}</div>
         <div class="metric-label">{on_time_percentage:.1f}%</div>
+        {delta_label("on_time_rate_percent", "{:+.1f} pts")}
     </div>
     """, unsafe_allow_html=True)
 
@@ -112,16 +126,17 @@ with col3:
         <div class="metric-label">⏳ Delayed Orders</div>
         <div class="metric-value">{delayed_orders:,}</div>
         <div class="metric-label">{delayed_percentage:.1f}%</div>
+        {delta_label("delayed_rate_percent", "{:+.1f} pts")}
     </div>
     """, unsafe_allow_html=True)
 
 with col4:
-    avg_delay = df["delay_days"].mean()
     st.markdown(f"""
     <div class="metric-card" style="background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%); box-shadow: 0 4px 15px rgba(245, 158, 11, 0.2);">
         <div class="metric-label">⏱️ Avg Delay</div>
         <div class="metric-value">{avg_delay:.1f}</div>
         <div class="metric-label">Days</div>
+        {delta_label("avg_delay_days", "{:+.2f} days")}
     </div>
     """, unsafe_allow_html=True)
 
@@ -130,19 +145,19 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.markdown("### 📈 Order Status Distribution")
-    status_counts = df["order_status"].value_counts()
+    status_counts = kpis["status_counts"]
     fig_data = pd.DataFrame({
-        'Status': status_counts.index,
-        'Count': status_counts.values
+        'Status': list(status_counts.keys()),
+        'Count': list(status_counts.values())
     })
     st.bar_chart(fig_data.set_index('Status'))
 
 with col2:
     st.markdown("### 🎯 Priority Breakdown")
-    priority_counts = df["order_priority"].value_counts()
+    priority_counts = kpis["priority_counts"]
     fig_data = pd.DataFrame({
-        'Priority': priority_counts.index,
-        'Count': priority_counts.values
+        'Priority': list(priority_counts.keys()),
+        'Count': list(priority_counts.values())
     })
     st.bar_chart(fig_data.set_index('Priority'))
 
@@ -151,21 +166,22 @@ st.markdown(f"<div class='section-header'>📋 Detailed Orders Data</div>", unsa
 
 col1, col2, col3 = st.columns(3)
 with col1:
-    status_filter = st.selectbox("Filter by Status", ["All"] + sorted(df["order_status"].unique()))
+    status_filter = st.selectbox("Filter by Status", ["All"] + sorted(status_counts))
 with col2:
-    priority_filter = st.selectbox("Filter by Priority", ["All"] + sorted(df["order_priority"].unique()))
+    priority_filter = st.selectbox("Filter by Priority", ["All"] + sorted(priority_counts))
 with col3:
     rows_display = st.slider("Rows to Display", 5, 100, 20, step=5)
 
-# Apply filters
-filtered_df = df.copy()
+# Apply filters (only the detail table needs the order rows)
+df = load_orders()
+filtered_df = df
 if status_filter != "All":
     filtered_df = filtered_df[filtered_df["order_status"] == status_filter]
 if priority_filter != "All":
     filtered_df = filtered_df[filtered_df["order_priority"] == priority_filter]
 
 # Display filtered data
-st.info(f"Showing {len(filtered_df)} of {len(df)} orders")
+st.info(f"Showing {len(filtered_df)} of {total_orders} orders")
 st.dataframe(
     filtered_df.head(rows_display),
     use_container_width=True,
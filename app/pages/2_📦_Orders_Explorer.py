@@ -1,5 +1,5 @@
 import streamlit as st
-from app.utils import load_orders
+from app.utils import load_order_index, load_kpis
 import pandas as pd
 
 from app.theme import apply_dark_theme
@@ -50,7 +50,9 @@ st.markdown("""
 st.markdown("# 📦 Orders Explorer")
 st.markdown("Advanced filtering and analysis of all orders in the system")
 
-df = load_orders()
+# Filters, sorting and paging run on per-column indexes; only one page of rows is materialized
+index = load_order_index()
+kpis = load_kpis()["kpis"]
 
 # Enhanced Filter Section
 st.markdown("## 🔍 Advanced Filters")
@@ -60,7 +62,7 @@ col1, col2, col3, col4 = st.columns(4)
 with col1:
     supplier_filter = st.selectbox(
         "Supplier ID",
-        ["All"] + sorted(df["supplier_id"].unique()),
+        ["All"] + index.categories["supplier_id"],
         help="Select specific supplier or view all"
     )
 
@@ -74,7 +76,7 @@ with col2:
 with col3:
     priority_filter = st.selectbox(
         "Priority Level",
-        ["All"] + sorted(df["order_priority"].unique()),
+        ["All"] + sorted(kpis["priority_counts"]),
         help="Filter by order priority"
     )
 
@@ -86,37 +88,43 @@ with col4:
     )
 
 # Apply filters
-filtered = df.copy()
-
-if supplier_filter != "All":
-    filtered = filtered[filtered["supplier_id"] == supplier_filter]
-
-if status_filter != "All":
-    filtered = filtered[filtered["order_status"] == status_filter]
-
-if priority_filter != "All":
-    filtered = filtered[filtered["order_priority"] == priority_filter]
+filters = {
+    "supplier_id": supplier_filter,
+    "order_status": status_filter,
+    "order_priority": priority_filter
+}
+filters = {col: value for col, value in filters.items() if value != "All"}
+no_filters = not filters
+rows = index.filter_rows(filters)
 
 # Display count
-st.markdown(f'<div class="order-count">📊 Showing {len(filtered):,} orders (filtered from {len(df):,} total)</div>', unsafe_allow_html=True)
+st.markdown(f'<div class="order-count">📊 Showing {len(rows):,} orders (filtered from {kpis["total_orders"]:,} total)</div>', unsafe_allow_html=True)
+
+# Summary stats for filtered data (unfiltered view reads the KPI snapshot)
+if no_filters:
+    on_time_count = kpis["ontime_orders"]
+    delayed_count = kpis["delayed_orders"]
+    avg_delay = kpis["avg_delay_days"]
+    avg_defect = kpis["avg_defect_rate"]
+else:
+    summary = index.summary(rows)
+    on_time_count = summary["OnTime"]
+    delayed_count = summary["Delayed"]
+    avg_delay = summary["avg_delay_days"]
+    avg_defect = summary["avg_defect_rate"]
 
-# Summary stats for filtered data
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    on_time_count = (filtered["order_status"] == "OnTime").sum()
     st.metric("✅ On-Time", f"{on_time_count:,}")
 
 with col2:
-    delayed_count = (filtered["order_status"] == "Delayed").sum()
     st.metric("⏳ Delayed", f"{delayed_count:,}")
 
 with col3:
-    avg_delay = filtered["delay_days"].mean()
     st.metric("⏱️ Avg Delay (days)", f"{avg_delay:.1f}")
 
 with col4:
-    avg_defect = filtered["defect_rate"].mean()
     st.metric("🔧 Avg Defect Rate", f"{avg_defect:.3f}")
 
 # Sortable data display
@@ -131,10 +139,13 @@ sort_by = st.selectbox(
 sort_order = st.radio("Sort order", ["Ascending", "Descending"], horizontal=True)
 ascending = sort_order == "Ascending"
 
-filtered_sorted = filtered.sort_values(by=sort_by, ascending=ascending)
+total_pages = max(1, -(-len(rows) // rows_to_show))
+page = st.number_input(f"Page (of {total_pages:,})", min_value=1, max_value=total_pages, value=1, step=1)
+
+page_rows = index.page_rows(rows, sort_by=sort_by, ascending=ascending, page=page - 1, page_size=rows_to_show)
 
 st.dataframe(
-    filtered_sorted.head(rows_to_show),
+    index.orders.iloc[page_rows],
     use_container_width=True,
     hide_index=True
 )
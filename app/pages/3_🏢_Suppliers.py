@@ -1,5 +1,6 @@
 import streamlit as st
-from app.utils import load_suppliers, load_risk_report
+from app.utils import load_suppliers, load_risk_report, search_table, SUPPLIER_SEARCH_COLUMNS
+from risk_engine import risk_category
 import pandas as pd
 
 from app.theme import apply_dark_theme
@@ -104,10 +105,8 @@ st.markdown(f"<div class='section-header'>🏢 Supplier Master Data</div>", unsa
 
 search_term = st.text_input("🔍 Search suppliers", placeholder="Search by supplier ID or name")
 
-if search_term:
-    suppliers_filtered = suppliers[suppliers.astype(str).apply(lambda x: x.str.contains(search_term, case=False)).any(axis=1)]
-else:
-    suppliers_filtered = suppliers
+# Trigram index over id, name, location, category and email
+suppliers_filtered = search_table("dataset/suppliers.csv", search_term, SUPPLIER_SEARCH_COLUMNS)
 
 st.info(f"Showing {len(suppliers_filtered)} suppliers")
 st.dataframe(
@@ -123,9 +122,9 @@ risk_sorted = risk_report.sort_values("risk_score", ascending=False)
 
 # Add risk level category
 risk_sorted_display = risk_sorted.copy()
-risk_sorted_display['Risk Level'] = risk_sorted_display['risk_score'].apply(
-    lambda x: '🔴 HIGH' if x >= 70 else ('🟠 MEDIUM' if x >= 40 else '🟢 LOW')
-)
+risk_sorted_display['Risk Level'] = pd.Series(
+    risk_category(risk_sorted_display['risk_score']), index=risk_sorted_display.index
+).map({"High": "🔴 HIGH", "Medium": "🟠 MEDIUM", "Low": "🟢 LOW"})
 
 sort_ascending = st.checkbox("Sort by lowest risk first")
 if sort_ascending:
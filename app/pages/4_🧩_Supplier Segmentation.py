@@ -1,5 +1,5 @@
 import streamlit as st
-from app.utils import load_clusters
+from app.utils import load_clusters, search_table
 import pandas as pd
 from app.theme import apply_dark_theme
 apply_dark_theme()
@@ -172,11 +172,8 @@ st.markdown(f"<div class='section-header'>📋 Complete Supplier Segmentation Da
 # Add search/filter functionality
 search_term = st.text_input("🔍 Search suppliers", placeholder="Search by supplier ID or name")
 
-filtered_clusters = clusters.copy()
-if search_term:
-    filtered_clusters = filtered_clusters[
-        filtered_clusters.astype(str).apply(lambda x: x.str.contains(search_term, case=False)).any(axis=1)
-    ]
+# Indexed search over every column, as the old cell-by-cell scan did
+filtered_clusters = search_table("dataset/supplier_clusters.csv", search_term)
 
 # Display count
 st.info(f"Showing {len(filtered_clusters)} of {len(clusters)} suppliers")
@@ -1,5 +1,6 @@
 import streamlit as st
 from app.utils import load_orders
+from risk_engine import order_risk_scores
 import pandas as pd
 
 from app.theme import apply_dark_theme
@@ -84,16 +85,9 @@ st.markdown("Real-time monitoring of critical issues and anomalies")
 
 df = load_orders()
 
-# Create risk_score if missing
+# Create risk_score if missing (assign copies - the loaded frame is shared)
 if "risk_score" not in df.columns:
-    priority_weight = {"Low": 5, "Medium": 10, "High": 20}
-    df["priority_weight"] = df["order_priority"].map(priority_weight).fillna(10)
-    df["risk_score"] = (
-        (df["delay_days"] * 18) +
-        (df["defect_rate"] * 100 * 2.5) +
-        (df["price_change_percent"].abs() * 1.2) +
-        (df["priority_weight"] * 0.6)
-    ).clip(0, 100)
+    df = df.assign(risk_score=order_risk_scores(df))
 
 # Identify anomalies
 high_risk = df[df["risk_score"] >= 70]
@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
-from app.utils import load_orders, load_model
+from app.utils import load_model, load_supplier_features
+from batch_predict import ORDER_FEATURES, score_orders
+from instrumentation import measure
 
 from app.theme import apply_dark_theme
 apply_dark_theme()
@@ -71,23 +73,66 @@ st.markdown("""
 st.markdown("# 🤖 ML-Powered Delay Prediction")
 st.markdown("Advanced machine learning model to forecast delivery delays based on supplier history and order characteristics")
 
-orders_df = load_orders()
-model = load_model()
+supplier_features = load_supplier_features()
+supplier_stats = supplier_features.set_index("supplier_id")
+
+mode = st.radio("Prediction mode", ["Single Order", "Bulk Scoring (CSV)"], horizontal=True)
+
+if mode == "Bulk Scoring (CSV)":
+    st.markdown(f"<div class='section-header'>📂 Bulk Scoring</div>", unsafe_allow_html=True)
+    st.markdown(
+        "Upload a CSV of open orders with `supplier_id` and: "
+        + ", ".join(f"`{c}`" for c in ORDER_FEATURES)
+    )
+
+    uploaded = st.file_uploader("Open orders CSV", type=["csv"])
+
+    if uploaded is not None:
+        try:
+            open_orders = pd.read_csv(uploaded)
+            scored = score_orders(open_orders, load_model(), supplier_features)
+
+            delayed_count = int(scored["delay_prediction"].sum())
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("📦 Orders Scored", f"{len(scored):,}")
+            with col2:
+                st.metric("🚨 Predicted Delayed", f"{delayed_count:,}")
+            with col3:
+                st.metric("📈 Avg Delay Probability", f"{scored['delay_probability'].mean():.1%}")
+
+            st.dataframe(
+                scored.sort_values("delay_probability", ascending=False).head(100),
+                use_container_width=True,
+                hide_index=True
+            )
+
+            st.download_button(
+                "⬇️ Download Scored Orders",
+                scored.to_csv(index=False).encode("utf-8"),
+                "scored_orders.csv",
+                "text/csv",
+                use_container_width=True
+            )
+        except Exception as e:
+            st.error(f"❌ Scoring Error: {str(e)}")
+
+    st.stop()
 
 # Supplier Selection
 st.markdown(f"<div class='section-header'>📌 Select Supplier</div>", unsafe_allow_html=True)
 
 supplier_id = st.selectbox(
     "Choose a supplier to analyze",
-    sorted(orders_df["supplier_id"].unique()),
+    supplier_stats.index.tolist(),
     help="Select the supplier for this order"
 )
 
 # Get supplier history
-supplier_orders = orders_df[orders_df["supplier_id"] == supplier_id]
-supplier_avg_delay_days = supplier_orders["delay_days"].mean()
-supplier_avg_defect_rate = supplier_orders["defect_rate"].mean()
-supplier_on_time_rate = (supplier_orders["order_status"] == "OnTime").mean()
+supplier_row = supplier_stats.loc[supplier_id]
+supplier_avg_delay_days = supplier_row["avg_delay_days"]
+supplier_avg_defect_rate = supplier_row["avg_defect_rate"]
+supplier_on_time_rate = supplier_row["on_time_rate"]
 
 # Display supplier history card
 st.markdown(f"""
@@ -207,7 +252,9 @@ with col2:
 
 if predict_button:
     try:
-        prediction = model.predict(input_data)[0]
+        model = load_model()
+        with measure("predict.single", rows=len(input_data)):
+            prediction = model.predict(input_data)[0]
         
         if prediction == 0:
             st.markdown(f"""
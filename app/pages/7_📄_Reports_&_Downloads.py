@@ -1,36 +1,13 @@
 import streamlit as st
 import os
 from datetime import datetime
-import io
-import zipfile
-import pandas as pd
-import subprocess
-from utils import load_orders, load_suppliers, load_risk_report, load_clusters, load_anomalies
+from app.utils import build_export, cached_export
 from app.theme import apply_dark_theme
 
 st.set_page_config(page_title="Reports & Downloads", layout="wide")
 
 apply_dark_theme()
 
-def create_bulk_export_zip():
-    orders = load_orders()
-    suppliers = load_suppliers()
-    risk = load_risk_report()
-    clusters = load_clusters()
-    anomalies = load_anomalies()
-
-    buffer = io.BytesIO()
-
-    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-        zf.writestr("orders.csv", orders.to_csv(index=False))
-        zf.writestr("suppliers.csv", suppliers.to_csv(index=False))
-        zf.writestr("supplier_risk_report.csv", risk.to_csv(index=False))
-        zf.writestr("supplier_clusters.csv", clusters.to_csv(index=False))
-        zf.writestr("anomaly_report.csv", anomalies.to_csv(index=False))
-
-    buffer.seek(0)
-    return buffer
-
 # Custom styling
 st.markdown("""
 <style>
@@ -180,15 +157,26 @@ with col1:
     Export all available reports at once for comprehensive analysis and archiving.
     """)
 
-    zip_buffer = create_bulk_export_zip()
+    # Built on demand and reused until one of the exported files changes
+    export_path = cached_export()
+    if export_path is None:
+        if st.button("📦 Prepare Bulk Export (ZIP)", use_container_width=True):
+            with st.spinner("Packaging reports..."):
+                build_export()
+            st.rerun()
+    else:
+        def read_export(path=export_path):
+            with open(path, "rb") as f:
+                return f.read()
 
-    st.download_button(
-        label="📦 Export All Reports (ZIP)",
-        data=zip_buffer,
-        file_name="APIS_Bulk_Export.zip",
-        mime="application/zip",
-        use_container_width=True
-    )
+        # The ZIP is read only when the button is clicked, not on every rerun
+        st.download_button(
+            label=f"📦 Export All Reports (ZIP, {os.path.getsize(export_path) / 1024:.1f} KB)",
+            data=read_export,
+            file_name="APIS_Bulk_Export.zip",
+            mime="application/zip",
+            use_container_width=True
+        )
 
 with col2:
     st.markdown("""
@@ -201,6 +189,7 @@ with col2:
     if st.button("📨 Send Report Now", use_container_width=True):
      if email_address:
         try:
+            import subprocess
             subprocess.run(
                 ["python", "src/send_email_report.py", email_address],
                 check=True
@@ -1,10 +1,9 @@
 import streamlit as st
 import pandas as pd
-import subprocess
 import os
-import sys
 from datetime import datetime
 from app.theme import apply_dark_theme
+from app.utils import get_job_runner, list_model_versions, latest_model_version, search_table
 apply_dark_theme()
 
 st.set_page_config(page_title="Retrain & Logs", layout="wide")
@@ -141,7 +140,7 @@ with col1:
    
     model_type = st.selectbox(
         "Model Type",
-        ["Delay Prediction", "Risk Scoring", "Anomaly Detection"],
+        ["Delay Prediction", "Delay Prediction (Tuned)", "Delay Prediction (Incremental)", "Risk Scoring", "Anomaly Detection", "Anomaly Scoring (New Orders)", "Full Pipeline (Changed Inputs)"],
         help="Select which model to retrain"
     )
    
@@ -157,49 +156,79 @@ with col1:
         type="primary"
     )
 
+# model type -> (script, args)
+JOB_SCRIPTS = {
+    "Delay Prediction": ("src/retrain_model.py", []),
+    # Hyperparameter search first (successive halving); sized for the nightly run
+    "Delay Prediction (Tuned)": ("src/retrain_model.py", ["--search"]),
+    # Learns from orders appended since the live model; publishes only if no worse
+    "Delay Prediction (Incremental)": ("src/model_update.py", []),
+    "Risk Scoring": ("src/risk_score.py", []),
+    "Anomaly Detection": ("src/anomaly_detection.py", ["fit"]),
+    "Anomaly Scoring (New Orders)": ("src/anomaly_detection.py", ["score"]),
+    # Every stage whose inputs changed, independent stages in parallel
+    "Full Pipeline (Changed Inputs)": ("src/pipeline.py", [])
+}
+
+# Retraining runs in a background worker process; this page only polls it
+runner = get_job_runner()
+
 if retrain_button:
-    try:
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-       
-        status_text.text("🔄 Initializing training pipeline...")
-        progress_bar.progress(10)
-       
-        status_text.text("📊 Loading data from sources...")
-        progress_bar.progress(25)
-       
-        status_text.text("🔧 Preprocessing and feature engineering...")
-        progress_bar.progress(45)
-       
-        status_text.text("🤖 Training model...")
-        progress_bar.progress(70)
-       
-        status_text.text("✅ Validating model performance...")
-        progress_bar.progress(90)
-       
-        if model_type == "Delay Prediction":
-           subprocess.run([sys.executable, "src/retrain_model.py"], check=True)
-        elif model_type == "Risk Scoring":
-           subprocess.run([sys.executable, "src/risk_score.py"], check=True)
-        elif model_type == "Anomaly Detection":
-            subprocess.run([sys.executable, "src/anomaly_detection.py"], check=True)
-       
-        progress_bar.progress(100)
-        status_text.text("✅ Retraining completed successfully!")
-       
-        st.success("✨ Model retrained successfully! Updated metrics:")
-       
-        metric_col1, metric_col2, metric_col3 = st.columns(3)
-        with metric_col1:
-            st.metric("New Accuracy", "87.5%", "+2.3%")
-        with metric_col2:
-            st.metric("Training Time", "5m 23s", "-15s")
-        with metric_col3:
-            st.metric("Data Points", "15,432", "+2,104")
-           
-    except Exception as e:
-        st.error(f"❌ Training failed: {str(e)}")
-        st.info("Check the logs below for more details.")
+    script, args = JOB_SCRIPTS[model_type]
+    job_id = runner.submit(model_type, script, args)
+    st.success(f"✅ {model_type} retraining queued (job {job_id}). You can keep using the dashboard while it runs.")
+
+
+def render_jobs():
+    active_jobs = runner.active_jobs()
+
+    if active_jobs:
+        for job in active_jobs:
+            job_col, cancel_col = st.columns([5, 1])
+            with job_col:
+                st.progress(
+                    float(job["progress"]),
+                    text=f"{job['name']} • {job['stage']} ({job['status']}, job {job['job_id']})"
+                )
+            with cancel_col:
+                if st.button("✖ Cancel", key=f"cancel_{job['job_id']}", use_container_width=True):
+                    runner.cancel(job["job_id"])
+    else:
+        st.info("No retraining jobs queued or running.")
+
+    finished = [job for job in runner.jobs() if job["status"] not in ("queued", "running")][:3]
+    for job in finished:
+        label = f"{job['name']} (job {job['job_id']}) finished at {job['finished_at']}"
+        if job["status"] == "succeeded":
+            st.success(f"✨ {label}")
+        elif job["status"] == "cancelled":
+            st.warning(f"⏹ {label} - cancelled")
+        else:
+            reason = job.get("error") or f"exit code {job['returncode']}"
+            st.error(f"❌ {label} - failed ({reason})")
+            if os.path.exists(job["log_path"]):
+                with open(job["log_path"], "r", encoding="utf-8", errors="replace") as f:
+                    st.code(f.read()[-3000:])
+
+
+st.markdown("### ⏳ Retraining Jobs")
+
+# Auto-refresh the job panel where st.fragment is available (Streamlit >= 1.37)
+if hasattr(st, "fragment"):
+    render_jobs = st.fragment(run_every=2)(render_jobs)
+else:
+    st.button("🔄 Refresh job status")
+
+render_jobs()
+
+job_history = runner.history()
+if job_history:
+    with st.expander(f"🗂 Job History ({len(job_history)} runs)"):
+        st.dataframe(
+            pd.DataFrame(job_history).iloc[::-1].head(50),
+            use_container_width=True,
+            hide_index=True
+        )
 
 # Training Logs Section
 st.markdown(f"<div class='section-header'>📊 Training Logs</div>", unsafe_allow_html=True)
@@ -226,12 +255,8 @@ with col2:
 
 if os.path.exists(log_path):
     try:
-        logs = pd.read_csv(log_path)
-       
-        # Apply search filter
-        if log_search:
-            mask = logs.astype(str).apply(lambda x: x.str.contains(log_search, case=False)).any(axis=1)
-            logs = logs[mask]
+        # Apply search filter (indexed; rebuilt when the log file changes)
+        logs = search_table(log_path, log_search)
        
        
         # Display recent logs
@@ -275,25 +300,31 @@ else:
     First training will create a log file. Click the "Start Retraining Now" button to generate logs.
     """)
 
-st.markdown("""
-<div class="model-card">
-    <strong>🤖 Active Model: v2.3</strong>
-    <div style="color: #9ca3af; font-size: 0.9rem; margin-top: 0.5rem;">
-    Latest production model • Accuracy: 87.5% • Updated: 2 days ago
-    </div>
-</div>
+# Published model versions (models/registry)
+model_versions = list_model_versions()
+live_version = latest_model_version()
 
-<div class="model-card">
-    <strong>🔄 Previous Model: v2.2</strong>
-    <div style="color: #9ca3af; font-size: 0.9rem; margin-top: 0.5rem;">
-    Fallback model • Accuracy: 85.2% • Updated: 9 days ago
-    </div>
-</div>
-
-<div class="model-card">
-    <strong>📦 Staging Model: v2.4-beta</strong>
-    <div style="color: #9ca3af; font-size: 0.9rem; margin-top: 0.5rem;">
-    Testing model • Accuracy: 88.1% • Updated: 1 day ago
-    </div>
-</div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+if model_versions:
+    for info in model_versions:
+        if info["version"] == live_version:
+            title = f"🤖 Active Model: {info['version']}"
+            subtitle = "Latest production model"
+        else:
+            title = f"🔄 Previous Model: {info['version']}"
+            subtitle = "Fallback model"
+        if info.get("update") == "incremental":
+            # Scored on held-out new orders, not on a full retrain's test split
+            scores = (f"Holdout F1 (new orders): {info.get('holdout_f1_score', 0):.3f} • "
+                      f"Holdout Accuracy: {info.get('holdout_accuracy', 0):.1%}")
+        else:
+            scores = f"F1: {info.get('f1_score', 0):.3f} • Accuracy: {info.get('accuracy', 0):.1%}"
+        st.markdown(f"""
+        <div class="model-card">
+            <strong>{title}</strong>
+            <div style="color: #9ca3af; font-size: 0.9rem; margin-top: 0.5rem;">
+            {subtitle} • {info.get('model_name', 'N/A')} • {scores} • Published: {info.get('published_at', 'N/A')}
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+else:
+    st.info("No model versions published yet. Retrain the Delay Prediction model to publish one.")
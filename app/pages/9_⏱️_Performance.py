@@ -0,0 +1,108 @@
+import streamlit as st
+import pandas as pd
+from app.utils import frame_cache
+import instrumentation
+from instrumentation import latency_summary, read_metrics, recent_records
+from app.theme import apply_dark_theme
+apply_dark_theme()
+
+st.set_page_config(page_title="Performance", layout="wide")
+
+# Custom styling
+st.markdown("""
+<style>
+    .section-header {
+        font-size: 1.5rem;
+        font-weight: 700;
+        color: #f1f5f9;
+        margin-top: 1.5rem;
+        margin-bottom: 1rem;
+        border-bottom: 3px solid #06b6d4;
+        padding-bottom: 0.5rem;
+    }
+
+    .info-box {
+        background: #1e293b;
+        border-left: 4px solid #06b6d4;
+        padding: 1rem;
+        border-radius: 8px;
+        border: 1px solid #334155;
+        margin-bottom: 1rem;
+    }
+</style>
+""", unsafe_allow_html=True)
+
+st.markdown("# ⏱️ Performance")
+st.markdown("Latency percentiles for the app loaders, pipeline stages and model predictions")
+
+status = "enabled" if instrumentation.ENABLED else "disabled (APIS_METRICS=0)"
+cache = frame_cache.stats()
+st.markdown(f"""
+<div class="info-box">
+    <strong>Instrumentation:</strong> {status} •
+    <strong>Metrics file:</strong> {instrumentation.METRICS_PATH} •
+    <strong>Frame cache:</strong> {cache["entries"]} entries, {cache["bytes"] / 1024 / 1024:.1f} of {cache["max_bytes"] / 1024 / 1024:.0f} MB
+</div>
+""", unsafe_allow_html=True)
+
+col1, col2 = st.columns(2)
+with col1:
+    source = st.radio(
+        "Records",
+        ["All processes (metrics file)", "This app process"],
+        horizontal=True,
+        help="Pipeline stages and background jobs run in their own processes and only appear in the metrics file"
+    )
+with col2:
+    window = st.select_slider("Most recent records", [1_000, 5_000, 20_000, 100_000], value=20_000)
+
+if source == "This app process":
+    records = pd.DataFrame(recent_records()[-window:], columns=instrumentation.METRIC_COLUMNS)
+else:
+    records = read_metrics(max_records=window)
+
+if records.empty:
+    st.info("No measurements recorded yet. Open a few pages or run the pipeline, then refresh.")
+    st.stop()
+
+summary = latency_summary(records)
+
+# Headline numbers
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("📊 Measurements", f"{len(records):,}")
+with col2:
+    st.metric("🔧 Operations", f"{len(summary):,}")
+with col3:
+    slowest = summary.iloc[0]
+    st.metric("🐢 Slowest p95", f"{slowest['p95_ms']:,.1f} ms", help=slowest["operation"])
+with col4:
+    growth = pd.to_numeric(records["rss_delta_mb"], errors="coerce")
+    biggest = growth.idxmax() if growth.notna().any() else None
+    st.metric(
+        "💾 Largest RSS Growth",
+        f"{growth[biggest]:,.1f} MB" if biggest is not None else "N/A",
+        help=records.loc[biggest, "operation"] if biggest is not None else "Resident memory is sampled on Linux only"
+    )
+
+st.markdown(f"<div class='section-header'>📈 Latency by Operation</div>", unsafe_allow_html=True)
+
+kinds = {"App loaders": "load_", "Pipeline stages": "stage.", "Predictions": "predict."}
+kind = st.selectbox("Show", ["All"] + list(kinds))
+shown = summary if kind == "All" else summary[summary["operation"].str.startswith(kinds[kind])]
+
+st.dataframe(
+    shown.rename(columns={
+        "operation": "Operation", "calls": "Calls", "p50_ms": "p50 (ms)", "p95_ms": "p95 (ms)",
+        "p99_ms": "p99 (ms)", "mean_cpu_ms": "Mean CPU (ms)", "rows_per_sec": "Rows/sec",
+        "max_rss_mb": "Max RSS at Exit (MB)", "max_rss_delta_mb": "Max RSS Growth (MB)"
+    }),
+    use_container_width=True,
+    hide_index=True
+)
+
+if not shown.empty:
+    st.bar_chart(shown.set_index("operation")[["p50_ms", "p95_ms", "p99_ms"]])
+
+st.markdown(f"<div class='section-header'>🕒 Recent Measurements</div>", unsafe_allow_html=True)
+st.dataframe(records.tail(50).iloc[::-1], use_container_width=True, hide_index=True)
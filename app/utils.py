@@ -1,20 +1,212 @@
-import pandas as pd
-import joblib
+import os
+import sys
+import threading
+from collections import OrderedDict
 
+# Pipeline modules in src/ are shared with the app
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from export_bundle import build_export, cached_export
+from instrumentation import timed
+from kpi_store import kpi_deltas, load_snapshot as load_kpi_snapshot
+from model_registry import ModelCache, latest_version as latest_model_version, list_versions as list_model_versions
+from order_query import OrderIndex
+from storage import read_table, resolve_table_path
+from supplier_features import supplier_features
+from text_index import SUPPLIER_SEARCH_COLUMNS, TextIndex
+from trend_store import date_bounds as trend_date_bounds, load_trend, read_partition, sync as sync_trends
+
+# Memory budget for parsed frames kept between Streamlit reruns (MB)
+CACHE_MAX_MB = int(os.environ.get("APIS_CACHE_MAX_MB", "512"))
+
+
+def _size_of(obj):
+    # DataFrames report their own footprint; index objects expose nbytes
+    if hasattr(obj, "memory_usage"):
+        return int(obj.memory_usage(deep=True).sum())
+    return int(obj.nbytes)
+
+
+class FrameCache:
+    """
+    LRU cache of parsed data files shared by every page and session.
+
+    Entries are keyed on the file path (plus an optional tag for frames
+    derived from it) and validated against the file's mtime and size, so
+    the same frame is handed back until the file changes on disk. Frames
+    are evicted least-recently-used first once the total in-memory size
+    goes over the budget.
+
+    Callers get the cached object itself - do not mutate it in place.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # path -> (signature, frame, nbytes)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, path, reader, tag=None):
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = (os.path.abspath(path), tag)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        frame = reader(path)
+        nbytes = _size_of(frame)
+
+        with self._lock:
+            self._discard(key)
+            # A frame larger than the whole budget is served but not kept
+            if nbytes <= self.max_bytes:
+                self._entries[key] = (signature, frame, nbytes)
+                self._total_bytes += nbytes
+                while self._total_bytes > self.max_bytes:
+                    oldest = next(iter(self._entries))
+                    self._discard(oldest)
+        return frame
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry[2]
+
+
+frame_cache = FrameCache(CACHE_MAX_MB * 1024 * 1024)
+
+# Live delay model, reloaded only when a new registry version is published
+model_cache = ModelCache()
+
+
+def _resolve(path):
+    # Cache on the copy actually read (CSV or its Parquet/Feather sibling)
+    resolved = resolve_table_path(path)
+    if resolved is None:
+        raise FileNotFoundError(f"{path} not found")
+    return resolved
+
+
+def _load_table(path):
+    return frame_cache.get(_resolve(path), read_table)
+
+
+@timed("load_orders", rows=len)
 def load_orders():
-    return pd.read_csv("dataset/orders.csv")
+    return _load_table("dataset/orders.csv")
 
+@timed("load_suppliers", rows=len)
 def load_suppliers():
-    return pd.read_csv("dataset/suppliers.csv")
+    return _load_table("dataset/suppliers.csv")
 
+@timed("load_risk_report", rows=len)
 def load_risk_report():
-    return pd.read_csv("dataset/supplier_risk_report.csv")
+    return _load_table("dataset/supplier_risk_report.csv")
 
+@timed("load_clusters", rows=len)
 def load_clusters():
-    return pd.read_csv("dataset/supplier_clusters.csv")
+    return _load_table("dataset/supplier_clusters.csv")
 
+@timed("load_anomalies", rows=len)
 def load_anomalies():
-    return pd.read_csv("dataset/anomaly_report.csv")
+    return _load_table("dataset/anomaly_report.csv")
+
+@timed("load_supplier_features", rows=len)
+def load_supplier_features():
+    # Derived from the cached orders frame; recomputed only when orders change
+    return frame_cache.get(
+        _resolve("dataset/orders.csv"),
+        lambda _: supplier_features(load_orders()),
+        tag="supplier_features"
+    )
+
+@timed("load_order_index", rows=lambda index: index.size)
+def load_order_index():
+    # Built once per orders file; shares the cached orders frame
+    return frame_cache.get(
+        _resolve("dataset/orders.csv"),
+        lambda _: OrderIndex(load_orders()),
+        tag="order_index"
+    )
 
+@timed("load_text_index", rows=lambda index: index.size)
+def load_text_index(path, columns=None):
+    # Rebuilt only when the file changes; row positions match _load_table(path)
+    return frame_cache.get(
+        _resolve(path),
+        lambda _: TextIndex(_load_table(path), columns),
+        tag=("text_index", tuple(columns) if columns else None)
+    )
+
+@timed("search_table", rows=len)
+def search_table(path, query, columns=None):
+    """Rows of a table matching the search box text (all rows if empty)."""
+    frame = _load_table(path)
+    if not query or not query.strip():
+        return frame
+    return frame.iloc[load_text_index(path, columns).search(query)]
+
+@timed("load_model")
 def load_model():
-    return joblib.load("models/model.pkl")
+    # First call per process unpickles the pipeline (and imports sklearn);
+    # pages call this only once a prediction is actually requested
+    return model_cache.get()
+
+def get_job_runner():
+    # The runner (subprocess / worker thread) is only needed on the Retrain page
+    from job_runner import get_runner
+    return get_runner()
+
+@timed("load_kpis")
+def load_kpis():
+    # Precomputed snapshot (current + previous); two stats and a small JSON read
+    return load_kpi_snapshot()
+
+_trend_sync_lock = threading.Lock()
+_trend_synced_signature = None
+
+
+def _sync_trends_if_changed():
+    # A render asks for bounds and the trend; sync_trends() only runs again
+    # once the orders file (or its columnar copy) has changed on disk
+    global _trend_synced_signature
+    resolved = _resolve("dataset/orders.csv")
+    stat = os.stat(resolved)
+    signature = (resolved, stat.st_mtime_ns, stat.st_size)
+    with _trend_sync_lock:
+        if signature != _trend_synced_signature:
+            sync_trends()
+            _trend_synced_signature = signature
+
+@timed("load_order_trend", rows=len)
+def load_order_trend(grain="daily", start=None, end=None, by=None, filters=None):
+    # New orders are merged into the rollups first; partitions stay cached until rewritten
+    _sync_trends_if_changed()
+    return load_trend(
+        grain, start, end, by=by, filters=filters,
+        reader=lambda path: frame_cache.get(path, read_partition)
+    )
+
+@timed("order_trend_bounds")
+def order_trend_bounds():
+    _sync_trends_if_changed()
+    return trend_date_bounds()
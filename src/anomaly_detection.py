@@ -1,57 +1,180 @@
-import pandas as pd
-import numpy as np
+import json
 import os
+import sys
+
+import joblib
 
 from sklearn.ensemble import IsolationForest
 
-# -----------------------------
-# 1) Load dataset
-# -----------------------------
-df = pd.read_csv("dataset/orders.csv")
+import order_log
+from instrumentation import add_rows, timed
+from progress import report_progress
+from storage import ORDER_DTYPES, read_table, resolve_table_path, write_table
 
 # -----------------------------
-# 2) Select numeric features for anomaly detection
+# Anomaly detection: fit once, score incrementally
 # -----------------------------
-features = ["delay_days", "defect_rate", "price_change_percent", "unit_price", "quantity"]
+#   python src/anomaly_detection.py fit    -> refit on full history, rewrite report
+#   python src/anomaly_detection.py score  -> stream only newly appended orders
+#                                             through the saved model and append
+#                                             flagged rows to the report
+# Refits are scheduled separately (e.g. nightly); "fit" is the default.
 
-X = df[features].copy()
+ORDERS_PATH = "dataset/orders.csv"
+REPORT_PATH = "dataset/anomaly_report.csv"
+MODEL_PATH = "models/anomaly_model.pkl"
+STATE_PATH = "models/anomaly_state.json"
 
-# Fill missing values (safety)
-X = X.fillna(0)
+CHUNK_SIZE = int(os.environ.get("APIS_ANOMALY_CHUNK_SIZE", "100000"))
 
-# -----------------------------
-# 3) Train Isolation Forest
-# -----------------------------
-# contamination = approx % of anomalies expected
-model = IsolationForest(
-    n_estimators=200,
-    contamination=0.08,   # 8% anomalies (you can change to 0.05 or 0.10)
-    random_state=42
-)
+# Numeric features for anomaly detection
+FEATURES = ["delay_days", "defect_rate", "price_change_percent", "unit_price", "quantity"]
 
-model.fit(X)
 
-# Predict anomalies: -1 = anomaly, 1 = normal
-df["anomaly_flag"] = model.predict(X)
-df["anomaly_flag"] = df["anomaly_flag"].apply(lambda x: 1 if x == -1 else 0)
+def _score(model, df):
+    """Add anomaly_flag (1 = anomaly) and anomaly_score (lower = more anomalous)."""
+    # Fill missing values (safety)
+    X = df[FEATURES].fillna(0)
 
-# Anomaly score (lower = more anomalous)
-df["anomaly_score"] = model.decision_function(X)
-df["anomaly_score"] = df["anomaly_score"].round(4)
+    # IsolationForest.predict is decision_function < 0, so one pass gives both
+    scores = model.decision_function(X)
+    df = df.copy()
+    df["anomaly_flag"] = (scores < 0).astype("int64")
+    df["anomaly_score"] = scores.round(4)
+    return df
 
-# -----------------------------
-# 4) Create anomaly report
-# -----------------------------
-anomalies = df[df["anomaly_flag"] == 1].copy()
 
-# Sort most suspicious first
-anomalies = anomalies.sort_values("anomaly_score")
+def _save_model(model):
+    os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
+    tmp_path = MODEL_PATH + ".tmp"
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, MODEL_PATH)
+
+
+def _load_state():
+    if not os.path.exists(STATE_PATH):
+        return None
+    with open(STATE_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_state(resolved):
+    state = order_log.snapshot(resolved) if resolved.endswith(".csv") else {"orders_path": resolved}
+    with open(STATE_PATH, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+
+def _append_to_report(flagged):
+    if len(flagged) == 0:
+        return
+    write_header = not os.path.exists(REPORT_PATH)
+    flagged.to_csv(REPORT_PATH, mode="a", header=write_header, index=False)
+
+
+@timed("stage.anomaly_fit")
+def fit(orders=None):
+    """
+    Refit the Isolation Forest on the full history and rewrite the report.
+    `orders` is the loaded orders table, if the caller already has it.
+    """
+    # -----------------------------
+    # 1) Load dataset
+    # -----------------------------
+    report_progress("Loading orders", 0.1)
+    df = read_table(ORDERS_PATH) if orders is None else orders
+    add_rows(len(df))
+
+    # -----------------------------
+    # 2) Train Isolation Forest
+    # -----------------------------
+    report_progress("Fitting Isolation Forest", 0.3)
+    # contamination = approx % of anomalies expected
+    model = IsolationForest(
+        n_estimators=200,
+        contamination=0.08,   # 8% anomalies (you can change to 0.05 or 0.10)
+        random_state=42
+    )
+
+    model.fit(df[FEATURES].fillna(0))
+    _save_model(model)
+
+    # -----------------------------
+    # 3) Score history + create anomaly report
+    # -----------------------------
+    report_progress("Scoring orders", 0.7)
+    df = _score(model, df)
+    anomalies = df[df["anomaly_flag"] == 1]
+
+    # Sort most suspicious first
+    anomalies = anomalies.sort_values("anomaly_score")
+
+    report_progress("Saving anomaly report", 0.9)
+    write_table(anomalies, REPORT_PATH, keep_csv=True)
+    _save_state(resolve_table_path(ORDERS_PATH))
+
+    print("✅ Anomaly Detection Completed!")
+    print(f"Total Orders: {len(df)}")
+    print(f"Anomalies Found: {len(anomalies)}")
+    print(f"Saved: {REPORT_PATH} (model: {MODEL_PATH})")
+
+
+@timed("stage.anomaly_score")
+def score_new():
+    """
+    Score orders appended since the last fit/score with the saved model,
+    CHUNK_SIZE rows at a time, appending flagged rows to the report.
+    """
+    if not os.path.exists(MODEL_PATH):
+        print("ℹ️ No saved anomaly model yet - running a full fit instead.")
+        fit()
+        return
+
+    model = joblib.load(MODEL_PATH)
+    resolved = resolve_table_path(ORDERS_PATH)
+    state = _load_state()
+
+    if not order_log.is_append_of(resolved, state):
+        # Orders were rewritten: rescore everything with the saved model
+        report_progress("Rescoring full history", 0.1)
+        orders = read_table(ORDERS_PATH)
+        add_rows(len(orders))
+        anomalies = _score(model, orders)
+        anomalies = anomalies[anomalies["anomaly_flag"] == 1].sort_values("anomaly_score")
+        write_table(anomalies, REPORT_PATH, keep_csv=True)
+        _save_state(resolved)
+        print(f"✅ Orders file changed - rescored full history ({len(anomalies)} anomalies)")
+        return
+
+    if not order_log.has_new_rows(resolved, state):
+        print("✅ No new orders to score.")
+        return
+
+    # Text columns stay as written (dates included) so appended rows match the report
+    scored_rows = 0
+    flagged_rows = 0
+    dtypes = {c: t for c, t in ORDER_DTYPES.items() if c in state["header"]}
+    for chunk in order_log.read_appended(state, dtype=dtypes, chunksize=CHUNK_SIZE):
+        report_progress(f"Scoring new orders ({scored_rows:,} done)", 0.5)
+        scored = _score(model, chunk)
+        flagged = scored[scored["anomaly_flag"] == 1].sort_values("anomaly_score")
+        _append_to_report(flagged)
+        scored_rows += len(chunk)
+        add_rows(len(chunk))
+        flagged_rows += len(flagged)
+
+    _save_state(resolved)
+
+    print("✅ Incremental Anomaly Scoring Completed!")
+    print(f"New Orders Scored: {scored_rows}")
+    print(f"New Anomalies Found: {flagged_rows}")
+    print(f"Appended to: {REPORT_PATH}")
 
-# Save report
-os.makedirs("dataset", exist_ok=True)
-anomalies.to_csv("dataset/anomaly_report.csv", index=False)
 
-print("✅ Anomaly Detection Completed!")
-print(f"Total Orders: {len(df)}")
-print(f"Anomalies Found: {len(anomalies)}")
-print("Saved: dataset/anomaly_report.csv")
+if __name__ == "__main__":
+    mode = sys.argv[1] if len(sys.argv) > 1 else "fit"
+    if mode == "fit":
+        fit()
+    elif mode == "score":
+        score_new()
+    else:
+        raise SystemExit(f"Unknown mode '{mode}' (expected 'fit' or 'score')")
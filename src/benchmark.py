@@ -0,0 +1,445 @@
+import argparse
+import csv
+import json
+import math
+import os
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+try:
+    import resource  # POSIX only; peak RSS is left blank elsewhere
+except ImportError:
+    resource = None
+
+# -----------------------------
+# Pipeline benchmark
+# -----------------------------
+#   python src/benchmark.py --sizes 10000,100000,1000000
+#   python src/benchmark.py --sizes 10000,100000 --save-baseline
+#   python src/benchmark.py --sizes 10000,100000 --baseline reports/benchmarks/baseline.json
+# For every size a synthetic dataset is generated into its own work dir and
+# each stage runs there as `python src/<stage>.py` would, in a fresh child
+# process so wall time and peak RSS are that stage's alone. Results are
+# appended to reports/benchmarks/results.csv; with a baseline the run fails
+# (exit code 1) when a stage got slower or bigger than the tolerance allows.
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SRC_DIR)
+
+BENCH_DIR = os.path.join("reports", "benchmarks")
+RESULTS_PATH = os.path.join(BENCH_DIR, "results.csv")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DEFAULT_TOLERANCE = 0.25
+# Regressions smaller than this are timer noise, whatever the ratio
+MIN_WALL_DELTA_S = 0.5
+SINGLE_PREDICTIONS = 200
+# How often the stage's process tree is polled for worker peaks (seconds)
+RSS_SAMPLE_INTERVAL_S = 0.1
+
+# rss_source: "self" when the stage process itself peaked highest,
+# "children" when one of its descendants (e.g. a pool worker) did
+RESULT_COLUMNS = ["run_at", "stage", "orders", "rows", "wall_s", "peak_rss_mb", "rows_per_sec", "status", "rss_source"]
+
+# Stage name -> (script, argv), in dependency order (later stages read the
+# reports written by earlier ones). Stages without a script are measured by
+# the in-process functions below.
+STAGES = {
+    "risk_score": ("risk_score.py", []),
+    "retrain_risk_model": ("retrain_risk_model.py", []),
+    "anomaly_detection": ("anomaly_detection.py", ["fit"]),
+    "supplier_clustering": ("supplier_clustering.py", []),
+    "retrain_model": ("retrain_model.py", []),
+    "generate_final_report": ("generate_final_report.py", []),
+    "app_loaders": (None, []),
+    "predict_single": (None, []),
+    "predict_batch": (None, []),
+}
+
+
+def _descendants(pid):
+    """Pids of every live descendant of `pid`, from /proc/<pid>/stat parent ids."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # "pid (comm) state ppid ..."; comm may itself hold spaces or ")"
+        ppid = int(stat[stat.rindex(b")") + 2:].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def _vm_hwm_kb(pid):
+    """Peak RSS (VmHWM, KiB) of a live process, 0 once it is gone."""
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+class TreeRssSampler(threading.Thread):
+    """
+    Polls the peak RSS of every descendant of this process until stop().
+    Pool workers started by a forkserver are its children, not ours, and
+    are never waited for here, so RUSAGE_CHILDREN does not see them.
+    VmHWM is each process's own high-water mark, so a worker only has to
+    be alive at one poll for its peak to count.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL_S):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_kb = 0
+        self._done = threading.Event()
+
+    def sample(self):
+        for pid in _descendants(os.getpid()):
+            self.peak_kb = max(self.peak_kb, _vm_hwm_kb(pid))
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.sample()
+        return self.peak_kb
+
+
+def _peak_rss_mb(descendant_kb=0):
+    """
+    (peak RSS in MB, "self" | "children"). Retrain and search do their heavy
+    lifting in pool workers, so the largest descendant counts too: reaped
+    children via RUSAGE_CHILDREN, others via `descendant_kb` (VmHWM sampled
+    by TreeRssSampler, Linux only).
+    """
+    if resource is None:
+        return None, None
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    if descendant_kb and sys.platform != "darwin":
+        children = max(children, descendant_kb)
+    peak, source = (children, "children") if children > own else (own, "self")
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1), source
+
+
+def suppliers_for(n_orders):
+    """Supplier count for a benchmark size (~200 orders per supplier)."""
+    return max(50, min(5_000, n_orders // 200))
+
+
+def prepare_workdir(work_dir, n_orders, seed=42, formats=("csv",)):
+    """Synthetic dataset/ plus empty models/, logs/ and reports/ in `work_dir`."""
+    from enrich_orders import generate
+
+    dataset_dir = os.path.join(work_dir, "dataset")
+    if not os.path.exists(os.path.join(dataset_dir, "orders.csv")):
+        generate(suppliers_for(n_orders), n_orders, seed=seed, out_dir=dataset_dir, formats=formats)
+    for name in ["models", "logs", "reports"]:
+        os.makedirs(os.path.join(work_dir, name), exist_ok=True)
+
+
+# -----------------------------
+# In-process stages (run inside the child)
+# -----------------------------
+def _bench_app_loaders():
+    """Cold load of every cached table/index the pages use."""
+    sys.path.insert(0, REPO_ROOT)
+    from app import utils
+
+    orders = utils.load_orders()
+    utils.load_suppliers()
+    utils.load_risk_report()
+    utils.load_clusters()
+    utils.load_anomalies()
+    utils.load_supplier_features()
+    utils.load_order_index()
+    utils.search_table("dataset/suppliers.csv", "alpha", utils.SUPPLIER_SEARCH_COLUMNS)
+    utils.load_kpis()
+    utils.load_order_trend("weekly")
+    return len(orders)
+
+
+def _prediction_inputs():
+    import joblib
+
+    from storage import read_table
+    from supplier_store import load_supplier_features
+
+    return read_table("dataset/orders.csv"), joblib.load("models/model.pkl"), load_supplier_features()
+
+
+def _bench_predict_single():
+    """SINGLE_PREDICTIONS one-row predictions, as the Delay Predictor page makes them."""
+    from batch_predict import score_orders
+
+    orders, model, features = _prediction_inputs()
+    sample = orders.head(SINGLE_PREDICTIONS)
+    started = time.perf_counter()
+    for i in range(len(sample)):
+        score_orders(sample.iloc[i:i + 1], model, features)
+    return len(sample), time.perf_counter() - started
+
+
+def _bench_predict_batch():
+    from batch_predict import score_orders
+
+    orders, model, features = _prediction_inputs()
+    started = time.perf_counter()
+    score_orders(orders, model, features)
+    return len(orders), time.perf_counter() - started
+
+
+IN_PROCESS = {
+    "app_loaders": _bench_app_loaders,
+    "predict_single": _bench_predict_single,
+    "predict_batch": _bench_predict_batch,
+}
+
+
+def run_child(stage, result_path):
+    """Run one stage in this process (cwd = work dir) and write its measurements."""
+    script, argv = STAGES[stage]
+    sampler = TreeRssSampler() if os.path.isdir("/proc") else None
+    if sampler is not None:
+        sampler.start()
+    started = time.perf_counter()
+    rows = None
+    if script is not None:
+        sys.argv = [script, *argv]
+        runpy.run_path(os.path.join(SRC_DIR, script), run_name="__main__")
+        wall = time.perf_counter() - started
+    else:
+        outcome = IN_PROCESS[stage]()
+        if isinstance(outcome, tuple):
+            # Timed around the work only (input loading excluded)
+            rows, wall = outcome
+        else:
+            rows, wall = outcome, time.perf_counter() - started
+
+    descendant_kb = sampler.stop() if sampler is not None else 0
+    with open(result_path, "w", encoding="utf-8") as f:
+        peak, source = _peak_rss_mb(descendant_kb)
+        json.dump({"rows": rows, "wall_s": wall, "peak_rss_mb": peak, "rss_source": source}, f)
+
+
+# -----------------------------
+# Driver
+# -----------------------------
+def run_stage(stage, work_dir, n_orders, timeout=None):
+    """Run `stage` in a fresh interpreter; returns one result row."""
+    result_path = os.path.join(work_dir, f".bench_{stage}.json")
+    log_path = os.path.join(work_dir, f"bench_{stage}.log")
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", stage, "--result", result_path]
+
+    status = "ok"
+    measured = {"rows": None, "wall_s": None, "peak_rss_mb": None, "rss_source": None}
+    with open(log_path, "w", encoding="utf-8") as log:
+        try:
+            subprocess.run(cmd, cwd=work_dir, stdout=log, stderr=subprocess.STDOUT, timeout=timeout, check=True)
+            with open(result_path, "r", encoding="utf-8") as f:
+                measured = json.load(f)
+        except subprocess.TimeoutExpired:
+            status = "timeout"
+        except (subprocess.CalledProcessError, OSError, ValueError):
+            status = "failed"
+
+    rows = measured["rows"] if measured["rows"] is not None else n_orders
+    wall = measured["wall_s"]
+    return {
+        "stage": stage,
+        "orders": n_orders,
+        "rows": rows,
+        "wall_s": round(wall, 3) if wall is not None else None,
+        "peak_rss_mb": measured["peak_rss_mb"],
+        "rows_per_sec": round(rows / wall, 1) if wall else None,
+        "status": status,
+        "rss_source": measured.get("rss_source"),
+    }
+
+
+def append_results(results, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            old_rows = None if reader.fieldnames == RESULT_COLUMNS else list(reader)
+        if old_rows is not None:
+            # Results from before a column was added: rewrite under the new header
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS, extrasaction="ignore")
+                writer.writeheader()
+                writer.writerows(old_rows)
+    is_new = not os.path.exists(path)
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+        if is_new:
+            writer.writeheader()
+        writer.writerows(results)
+
+
+def scaling_exponents(results):
+    """
+    Per stage, the log-log slope of wall time vs orders (1.0 = linear).
+
+    Stages whose time grows faster than the data show up here long before
+    they time out in production.
+    """
+    exponents = {}
+    for stage in STAGES:
+        points = [(r["orders"], r["wall_s"]) for r in results
+                  if r["stage"] == stage and r["status"] == "ok" and r["wall_s"] and r["orders"] > 0]
+        if len(points) < 2:
+            continue
+        xs = [math.log(n) for n, _ in points]
+        ys = [math.log(t) for _, t in points]
+        x_mean, y_mean = sum(xs) / len(xs), sum(ys) / len(ys)
+        var = sum((x - x_mean) ** 2 for x in xs)
+        if var > 0:
+            exponents[stage] = round(sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / var, 2)
+    return exponents
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    baseline = {
+        "saved_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "results": [r for r in results if r["status"] == "ok"],
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def compare_to_baseline(results, path=BASELINE_PATH, tolerance=DEFAULT_TOLERANCE):
+    """Regression messages for results worse than the baseline by more than `tolerance`."""
+    with open(path, "r", encoding="utf-8") as f:
+        baseline = {(r["stage"], r["orders"]): r for r in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        base = baseline.get((result["stage"], result["orders"]))
+        if base is None:
+            continue
+        label = f"{result['stage']} @ {result['orders']:,} orders"
+        if result["status"] != "ok":
+            regressions.append(f"{label}: {result['status']} (baseline ok)")
+            continue
+        if (result["wall_s"] > base["wall_s"] * (1 + tolerance)
+                and result["wall_s"] - base["wall_s"] > MIN_WALL_DELTA_S):
+            regressions.append(f"{label}: wall {base['wall_s']:.2f}s -> {result['wall_s']:.2f}s")
+        if (result["peak_rss_mb"] and base.get("peak_rss_mb")
+                and result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance)):
+            regressions.append(f"{label}: peak RSS {base['peak_rss_mb']:.0f}MB -> {result['peak_rss_mb']:.0f}MB")
+    return regressions
+
+
+def run_benchmark(sizes, stages=None, work_root=None, keep=False, timeout=None, formats=("csv",)):
+    stages = [s for s in STAGES if stages is None or s in stages]
+    owns_root = work_root is None
+    work_root = work_root or tempfile.mkdtemp(prefix="apis_bench_")
+    run_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    results = []
+    try:
+        for n_orders in sizes:
+            work_dir = os.path.join(work_root, f"orders_{n_orders}")
+            print(f"\n📦 {n_orders:,} orders ({work_dir})")
+            prepare_workdir(work_dir, n_orders, formats=formats)
+            for stage in stages:
+                result = run_stage(stage, work_dir, n_orders, timeout=timeout)
+                results.append({"run_at": run_at, **result})
+                rss = f"{result['peak_rss_mb']:.0f}MB" if result["peak_rss_mb"] else "-"
+                if result["rss_source"] == "children":
+                    rss += "*"
+                wall = f"{result['wall_s']:.2f}s" if result["wall_s"] is not None else "-"
+                rate = f"{result['rows_per_sec']:,.0f} rows/s" if result["rows_per_sec"] else ""
+                print(f"  {stage:<22} {result['status']:<8} {wall:>10} {rss:>8}  {rate}")
+        if any(r["rss_source"] == "children" for r in results):
+            print("\n  * peak RSS of a worker process the stage started")
+    finally:
+        if owns_root and not keep:
+            shutil.rmtree(work_root, ignore_errors=True)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the APIS pipeline at several data sizes.")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="comma-separated order counts, e.g. 10000,100000,10000000")
+    parser.add_argument("--stages", default=None, help=f"comma-separated subset of: {', '.join(STAGES)}")
+    parser.add_argument("--format", default="csv", help="dataset format(s) to generate: csv, parquet, feather")
+    parser.add_argument("--work-dir", default=None, help="keep generated datasets here (reused across runs)")
+    parser.add_argument("--keep", action="store_true", help="do not delete the temporary work dir")
+    parser.add_argument("--timeout", type=float, default=None, help="per-stage timeout in seconds")
+    parser.add_argument("--results", default=RESULTS_PATH)
+    parser.add_argument("--baseline", default=None, help="compare against this baseline JSON")
+    parser.add_argument("--save-baseline", action="store_true", help=f"store this run as {BASELINE_PATH}")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--result", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.result)
+        sys.exit(0)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    stages = [s.strip() for s in args.stages.split(",")] if args.stages else None
+    unknown = [s for s in stages or [] if s not in STAGES]
+    if unknown:
+        raise SystemExit(f"Unknown stage(s): {unknown}")
+
+    results = run_benchmark(
+        sizes,
+        stages=stages,
+        work_root=os.path.abspath(args.work_dir) if args.work_dir else None,
+        keep=args.keep,
+        timeout=args.timeout,
+        formats=[f.strip().lower() for f in args.format.split(",")]
+    )
+    append_results(results, args.results)
+
+    print("\n📈 Scaling exponents (wall time ~ orders^k):")
+    for stage, k in scaling_exponents(results).items():
+        print(f"  {stage:<22} k = {k:.2f}")
+
+    if args.save_baseline:
+        save_baseline(results)
+        print(f"✅ Baseline saved: {BASELINE_PATH}")
+
+    print(f"✅ Benchmark complete! Results appended to {args.results}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) vs {args.baseline} (tolerance {args.tolerance:.0%}):")
+            for message in regressions:
+                print(f"  - {message}")
+            sys.exit(1)
+        print(f"✅ No regressions vs {args.baseline}")
@@ -0,0 +1,91 @@
+import glob
+import hashlib
+import os
+import uuid
+
+from storage import resolve_table_path
+
+# -----------------------------
+# Bulk export archive
+# -----------------------------
+# The ZIP is built from the files on disk (raw bytes, streamed in blocks by
+# zipfile; no pandas round-trip) and named after a digest of its inputs'
+# (path, size, mtime). As long as no input changes the same archive is
+# served; a changed input gives a new digest and the next build replaces it.
+
+EXPORT_DIR = "reports/exports"
+ARCHIVE_PREFIX = "APIS_Bulk_Export_"
+
+# Archive member name -> source table
+EXPORT_TABLES = {
+    "orders.csv": "dataset/orders.csv",
+    "suppliers.csv": "dataset/suppliers.csv",
+    "supplier_risk_report.csv": "dataset/supplier_risk_report.csv",
+    "supplier_clusters.csv": "dataset/supplier_clusters.csv",
+    "anomaly_report.csv": "dataset/anomaly_report.csv",
+}
+
+# Already-compressed formats are stored as-is
+STORED_SUFFIXES = (".parquet", ".feather")
+
+
+def export_sources():
+    """(member name, file on disk) for every export table that exists."""
+    sources = []
+    for name, table in EXPORT_TABLES.items():
+        # The copy the app reads: a newer Parquet/Feather beats a stale CSV
+        path = resolve_table_path(table)
+        if path is None:
+            continue
+        member = name if path.endswith(".csv") else os.path.splitext(name)[0] + os.path.splitext(path)[1]
+        sources.append((member, path))
+    return sources
+
+
+def export_digest(sources=None):
+    """Digest of the export inputs' identities (name, path, size, mtime)."""
+    digest = hashlib.sha1()
+    for member, path in sources if sources is not None else export_sources():
+        stat = os.stat(path)
+        digest.update(f"{member}|{path}|{stat.st_size}|{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def archive_path(digest):
+    return os.path.join(EXPORT_DIR, f"{ARCHIVE_PREFIX}{digest}.zip")
+
+
+def cached_export():
+    """Path of an up-to-date archive, or None if it needs (re)building."""
+    path = archive_path(export_digest())
+    return path if os.path.exists(path) else None
+
+
+def build_export():
+    """Return an up-to-date archive, writing it (streamed to disk) if needed."""
+    sources = export_sources()
+    path = archive_path(export_digest(sources))
+    if os.path.exists(path):
+        return path
+
+    import zipfile  # only needed when an archive is actually built
+
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for member, source in sources:
+            compression = zipfile.ZIP_STORED if source.endswith(STORED_SUFFIXES) else zipfile.ZIP_DEFLATED
+            zf.write(source, member, compress_type=compression)
+    os.replace(tmp_path, path)
+
+    # Older archives describe inputs that no longer exist
+    for old in glob.glob(os.path.join(EXPORT_DIR, f"{ARCHIVE_PREFIX}*.zip")):
+        if old != path:
+            os.remove(old)
+    return path
+
+
+if __name__ == "__main__":
+    result = build_export()
+    print("✅ Bulk export ready!")
+    print(f"Saved: {result} ({os.path.getsize(result) / 1024:.1f} KB)")
@@ -0,0 +1,287 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder
+
+from supplier_features import HISTORY_FEATURES
+
+# -----------------------------
+# Encoded feature matrix cache
+# -----------------------------
+# The delay model's design matrix is the one-hot encoded categoricals plus
+# the numeric columns, in the layout the ColumnTransformer produces. The
+# order-level part (every column except the supplier history averages) is
+# cached on disk as .npy blocks together with the target:
+#   dataset/feature_cache/meta.json        spec hash, row hash, categories, blocks
+#   dataset/feature_cache/block-00000.X.npy
+#   dataset/feature_cache/block-00000.y.npy
+# A retrain reuses the cached rows when the orders table still starts with
+# exactly the rows that were encoded (same content hash) and encodes only
+# the appended ones; a changed row, a new category value or a different
+# feature spec rebuilds the cache. The supplier history columns move
+# whenever any order is appended, so they are joined fresh every time
+# (three dense columns, no encoding) and staged to a temporary .npy for the
+# run. design_matrix() hands out a DesignMatrix over those files: rows are
+# gathered from the memory-mapped blocks only when a fit asks for them, and
+# worker processes reopen the same files instead of receiving a copy.
+
+CACHE_DIR = os.environ.get("APIS_FEATURE_CACHE_DIR", "dataset/feature_cache")
+# Appended blocks are merged back into one file past this many
+MAX_BLOCKS = 16
+FORMAT_VERSION = 1
+
+CATEGORICAL_COLUMNS = ["item_category", "shipping_mode", "payment_terms", "order_priority", "region"]
+HISTORY_COLUMNS = list(HISTORY_FEATURES.values())
+# History columns last, so the cached block is a prefix of every row
+FEATURES = [
+    "quantity",
+    "unit_price",
+    "defect_rate",
+    "item_category",
+    "shipping_mode",
+    "payment_terms",
+    "order_priority",
+    "region",
+    "price_change_percent",
+    *HISTORY_COLUMNS
+]
+NUMERIC_COLUMNS = [c for c in FEATURES if c not in CATEGORICAL_COLUMNS]
+ORDER_NUMERIC_COLUMNS = [c for c in NUMERIC_COLUMNS if c not in HISTORY_COLUMNS]
+TARGET_COLUMN = "target"
+
+
+def build_preprocessor(categories, numeric_cols=NUMERIC_COLUMNS):
+    """
+    One-hot + passthrough encoder with fixed categories. The output is
+    kept dense: 20 one-hot columns plus 7 numeric ones are ~45% non-zero,
+    and dense blocks can be memory-mapped and row-sliced directly.
+    """
+    return ColumnTransformer(
+        transformers=[
+            ("cat", OneHotEncoder(categories=categories, handle_unknown="ignore"), CATEGORICAL_COLUMNS),
+            ("num", "passthrough", numeric_cols)
+        ],
+        sparse_threshold=0
+    )
+
+
+def spec_hash():
+    spec = {
+        "version": FORMAT_VERSION,
+        "categorical": CATEGORICAL_COLUMNS,
+        "numeric": ORDER_NUMERIC_COLUMNS,
+        "target": TARGET_COLUMN,
+    }
+    return hashlib.sha1(json.dumps(spec).encode("utf-8")).hexdigest()
+
+
+def _row_hashes(df):
+    # One uint64 per row over every cached input column
+    return pd.util.hash_pandas_object(
+        df[CATEGORICAL_COLUMNS + ORDER_NUMERIC_COLUMNS + [TARGET_COLUMN]], index=False
+    ).to_numpy()
+
+
+def _digest(hashes):
+    return hashlib.sha1(hashes.tobytes()).hexdigest()
+
+
+def _categories(df):
+    return [sorted(df[c].dropna().unique().tolist()) for c in CATEGORICAL_COLUMNS]
+
+
+def _encode(df, categories):
+    encoder = build_preprocessor(categories, ORDER_NUMERIC_COLUMNS)
+    X = encoder.fit_transform(df[CATEGORICAL_COLUMNS + ORDER_NUMERIC_COLUMNS])
+    return np.ascontiguousarray(X, dtype="float64"), df[TARGET_COLUMN].to_numpy()
+
+
+def _load_meta(cache_dir):
+    path = os.path.join(cache_dir, "meta.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_block(cache_dir, meta, X, y):
+    name = f"block-{meta['next_block']:05d}"
+    meta["next_block"] += 1
+    for suffix, array in [("X", X), ("y", y)]:
+        np.save(os.path.join(cache_dir, f"{name}.{suffix}.npy"), array)
+    meta["blocks"].append({"name": name, "rows": len(y)})
+
+
+def _commit(cache_dir, meta):
+    # Blocks are written first; meta.json switches to them atomically, then
+    # files no longer referenced are removed
+    tmp = os.path.join(cache_dir, "meta.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, os.path.join(cache_dir, "meta.json"))
+
+    live = {f"{b['name']}.{s}.npy" for b in meta["blocks"] for s in ("X", "y")}
+    for file in os.listdir(cache_dir):
+        if file.startswith("block-") and file not in live:
+            os.remove(os.path.join(cache_dir, file))
+
+
+def _block_paths(cache_dir, meta):
+    return [
+        (os.path.join(cache_dir, f"{b['name']}.X.npy"), os.path.join(cache_dir, f"{b['name']}.y.npy"))
+        for b in meta["blocks"]
+    ]
+
+
+def _read_blocks(cache_dir, meta):
+    return [
+        (np.load(X_path, mmap_mode="r"), np.load(y_path, mmap_mode="r"))
+        for X_path, y_path in _block_paths(cache_dir, meta)
+    ]
+
+
+def encode_orders(df, cache_dir=CACHE_DIR):
+    """
+    Bring the cache up to date with `df` (training rows with a target
+    column). Returns (blocks, categories, status): `blocks` are the (X, y)
+    .npy paths covering every row of `df` in order, `status` is "hit",
+    "appended" or "rebuilt".
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    hashes = _row_hashes(df)
+    meta = _load_meta(cache_dir)
+
+    reusable = (
+        meta is not None
+        and meta["spec"] == spec_hash()
+        and meta["rows"] <= len(df)
+        and meta["digest"] == _digest(hashes[:meta["rows"]])
+    )
+    if reusable:
+        categories = meta["categories"]
+        if meta["rows"] == len(df):
+            return _block_paths(cache_dir, meta), categories, "hit"
+
+        new_rows = df.iloc[meta["rows"]:]
+        # Unseen category values would shift every one-hot column
+        reusable = all(
+            set(new_rows[c].dropna().unique().tolist()) <= set(known)
+            for c, known in zip(CATEGORICAL_COLUMNS, categories)
+        )
+
+    if reusable:
+        _write_block(cache_dir, meta, *_encode(new_rows, categories))
+        status = "appended"
+        if len(meta["blocks"]) > MAX_BLOCKS:
+            blocks = _read_blocks(cache_dir, meta)
+            X = np.concatenate([X for X, _ in blocks])
+            y = np.concatenate([y for _, y in blocks])
+            del blocks
+            meta["blocks"] = []
+            _write_block(cache_dir, meta, X, y)
+    else:
+        categories = _categories(df)
+        meta = {
+            "spec": spec_hash(),
+            "categories": categories,
+            "blocks": [],
+            "next_block": meta["next_block"] if meta else 0,
+        }
+        _write_block(cache_dir, meta, *_encode(df, categories))
+        status = "rebuilt"
+
+    meta["rows"] = len(df)
+    meta["digest"] = _digest(hashes)
+    _commit(cache_dir, meta)
+    return _block_paths(cache_dir, meta), categories, status
+
+
+class DesignMatrix:
+    """
+    Read-only view of the encoded training rows: the cached blocks plus the
+    supplier history columns, all memory-mapped. rows() materializes just
+    the rows a fit needs. Pickling sends the file paths, so pool workers
+    map the same pages. close() removes the staged history file.
+    """
+
+    def __init__(self, blocks, history_path):
+        self._blocks = blocks
+        self._history_path = history_path
+        self._open()
+
+    def _open(self):
+        self._X = [np.load(X_path, mmap_mode="r") for X_path, _ in self._blocks]
+        self._y = [np.load(y_path, mmap_mode="r") for _, y_path in self._blocks]
+        self._history = np.load(self._history_path, mmap_mode="r")
+        self._starts = np.cumsum([0] + [len(y) for y in self._y])
+        self._width = self._X[0].shape[1] if self._X else 0
+
+    def __getstate__(self):
+        return {"blocks": self._blocks, "history_path": self._history_path}
+
+    def __setstate__(self, state):
+        self._blocks = state["blocks"]
+        self._history_path = state["history_path"]
+        self._open()
+
+    def __len__(self):
+        return int(self._starts[-1])
+
+    @property
+    def shape(self):
+        return len(self), self._width + self._history.shape[1]
+
+    def rows(self, index, dtype="float64"):
+        """Dense (len(index), n_features) array of the rows at `index`, in that order."""
+        index = np.asarray(index, dtype="int64")
+        out = np.empty((len(index), self.shape[1]), dtype=dtype)
+        block_of = np.searchsorted(self._starts, index, side="right") - 1
+        for b, X_block in enumerate(self._X):
+            picked = np.flatnonzero(block_of == b)
+            if len(picked):
+                out[picked, :self._width] = X_block[index[picked] - self._starts[b]]
+        out[:, self._width:] = self._history[index]
+        return out
+
+    def target(self, index=None):
+        y = np.concatenate(self._y) if self._y else np.empty(0, dtype="int64")
+        return y if index is None else y[np.asarray(index, dtype="int64")]
+
+    def close(self):
+        self._X, self._y, self._history = [], [], None
+        shutil.rmtree(os.path.dirname(self._history_path), ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def design_matrix(df, cache_dir=CACHE_DIR):
+    """
+    Encoded training data for `df` (FEATURES plus TARGET_COLUMN).
+
+    Returns (X, y, preprocessor, status). X is a DesignMatrix whose rows
+    match build_preprocessor(...).fit_transform(df[FEATURES]); close it (or
+    use it as a context manager) when done. `preprocessor` is that encoder,
+    already fitted, to put in front of a model fitted on X's rows.
+    """
+    blocks, categories, status = encode_orders(df, cache_dir)
+
+    # The only per-run copy: three float columns
+    history_dir = tempfile.mkdtemp(prefix="apis_history_")
+    history_path = os.path.join(history_dir, "history.npy")
+    np.save(history_path, df[HISTORY_COLUMNS].to_numpy(dtype="float64"))
+    X = DesignMatrix(blocks, history_path)
+
+    # Categories are fixed, so fitting only records the input columns
+    preprocessor = build_preprocessor(categories).fit(df[FEATURES].head(1))
+    return X, X.target(), preprocessor, status
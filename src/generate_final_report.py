@@ -1,71 +1,91 @@
+import heapq
 import pandas as pd
 import os
 from datetime import datetime
 
-def safe_read_csv(path):
-    if os.path.exists(path):
-        return pd.read_csv(path)
-    return None
+from instrumentation import timed
+from kpi_store import CHUNK_SIZE, materialize
+from storage import iter_table, table_exists
 
-def main():
-    orders = safe_read_csv("dataset/orders.csv")
-    suppliers = safe_read_csv("dataset/suppliers.csv")
-    risk_report = safe_read_csv("dataset/supplier_risk_report.csv")
-    anomalies = safe_read_csv("dataset/anomaly_report.csv")
-    clusters = safe_read_csv("dataset/supplier_clusters.csv")
+# Streaming report: every input is read in CHUNK_SIZE-row chunks and only
+# running counts/sums and K-element heaps are kept, so memory stays bounded
+# whatever the size of the order history.
+TOP_K = 3
 
-    if orders is None:
-        raise FileNotFoundError("dataset/orders.csv not found. Cannot generate report.")
+def safe_iter_table(path, columns=None):
+    if table_exists(path):
+        return iter_table(path, columns=columns, chunksize=CHUNK_SIZE)
+    return iter([])
 
-    # ----------------------------
-    # 1) Procurement KPIs
-    # ----------------------------
-    total_orders = len(orders)
-    delayed_orders = int((orders["order_status"] == "Delayed").sum()) if "order_status" in orders.columns else 0
-    ontime_orders = int((orders["order_status"] == "OnTime").sum()) if "order_status" in orders.columns else 0
+def top_k_suppliers(path, k=TOP_K):
+    """
+    Top-k highest and lowest risk_score supplier ids, read chunk by chunk.
+    Ties keep file order, as a stable sort would.
+    """
+    riskiest, safest = [], []
+    offset = 0
+    for chunk in safe_iter_table(path):
+        if "risk_score" not in chunk.columns:
+            return [], []
+        scores = chunk["risk_score"].reset_index(drop=True)
+        ids = chunk["supplier_id"].astype(str).to_numpy()
+        # Pre-select each chunk's candidates vectorized, then merge into the heaps
+        high = scores.nlargest(k, keep="first").index
+        low = scores.nsmallest(k, keep="first").index
+        riskiest = heapq.nlargest(
+            k, riskiest + [(scores[i], -(offset + i), ids[i]) for i in high]
+        )
+        safest = heapq.nsmallest(
+            k, safest + [(scores[i], offset + i, ids[i]) for i in low]
+        )
+        offset += len(chunk)
+    return [s[2] for s in riskiest], [s[2] for s in safest]
 
-    avg_delay = float(orders["delay_days"].mean()) if "delay_days" in orders.columns else 0.0
-    avg_defect = float(orders["defect_rate"].mean()) if "defect_rate" in orders.columns else 0.0
-    avg_price_change = float(orders["price_change_percent"].mean()) if "price_change_percent" in orders.columns else 0.0
+def segment_counts(path):
+    """supplier_segment value counts (largest first), read chunk by chunk."""
+    counts = {}
+    for chunk in safe_iter_table(path):
+        if "supplier_segment" not in chunk.columns:
+            return {}
+        for segment, count in chunk["supplier_segment"].value_counts(sort=False).items():
+            counts[segment] = counts.get(segment, 0) + int(count)
+    return dict(sorted(counts.items(), key=lambda item: -item[1]))
 
-    on_time_rate = (ontime_orders / total_orders) * 100 if total_orders > 0 else 0
+@timed("stage.final_report")
+def main(orders=None):
+    if orders is None and not table_exists("dataset/orders.csv"):
+        raise FileNotFoundError("dataset/orders.csv not found. Cannot generate report.")
 
     # ----------------------------
-    # 2) Supplier KPIs
+    # 1) Procurement + supplier KPIs
     # ----------------------------
-    total_suppliers = orders["supplier_id"].nunique() if "supplier_id" in orders.columns else 0
+    # Running counts/sums over orders (anomalies: row count only); shared
+    # with the app pages and recomputed only if orders/anomalies changed
+    kpis = materialize(orders=orders)["kpis"]
 
-    # Top risky suppliers (from risk report if available)
-    top_risky = []
-    top_recommended = []
-    if risk_report is not None and "risk_score" in risk_report.columns:
-        top_risky = risk_report.sort_values("risk_score", ascending=False).head(3)["supplier_id"].astype(str).tolist()
-        top_recommended = risk_report.sort_values("risk_score", ascending=True).head(3)["supplier_id"].astype(str).tolist()
-
-    # Anomaly count
-    anomaly_count = 0
-    if anomalies is not None:
-        anomaly_count = len(anomalies)
+    # ----------------------------
+    # 2) Risk + cluster summaries
+    # ----------------------------
+    # Top risky / recommended suppliers (from risk report if available)
+    top_risky, top_recommended = top_k_suppliers("dataset/supplier_risk_report.csv")
 
     # Cluster breakdown
-    cluster_summary = {}
-    if clusters is not None and "supplier_segment" in clusters.columns:
-        cluster_summary = clusters["supplier_segment"].value_counts().to_dict()
+    cluster_summary = segment_counts("dataset/supplier_clusters.csv")
 
     # ----------------------------
     # 3) Build Final Summary Report (1-row table)
     # ----------------------------
     report = {
         "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "total_orders": total_orders,
-        "delayed_orders": delayed_orders,
-        "ontime_orders": ontime_orders,
-        "on_time_rate_percent": round(on_time_rate, 2),
-        "avg_delay_days": round(avg_delay, 2),
-        "avg_defect_rate": round(avg_defect, 4),
-        "avg_price_change_percent": round(avg_price_change, 2),
-        "total_suppliers": total_suppliers,
-        "anomaly_records": anomaly_count,
+        "total_orders": kpis["total_orders"],
+        "delayed_orders": kpis["delayed_orders"],
+        "ontime_orders": kpis["ontime_orders"],
+        "on_time_rate_percent": round(kpis["on_time_rate_percent"], 2),
+        "avg_delay_days": round(kpis["avg_delay_days"], 2),
+        "avg_defect_rate": round(kpis["avg_defect_rate"], 4),
+        "avg_price_change_percent": round(kpis["avg_price_change_percent"], 2),
+        "total_suppliers": kpis["total_suppliers"],
+        "anomaly_records": kpis["anomaly_records"],
         "top_3_risky_suppliers": ", ".join(top_risky) if top_risky else "N/A",
         "top_3_recommended_suppliers": ", ".join(top_recommended) if top_recommended else "N/A",
         "cluster_breakdown": str(cluster_summary) if cluster_summary else "N/A"
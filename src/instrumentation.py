@@ -0,0 +1,276 @@
+import csv
+import functools
+import io
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+try:
+    import resource  # POSIX only; peak memory is left blank elsewhere
+except ImportError:
+    resource = None
+
+# -----------------------------
+# Hot-path timing instrumentation
+# -----------------------------
+#   @timed("load_orders", rows=len)          -> wrap a function
+#   with measure("predict.single", rows=1):  -> wrap a block
+#   add_rows(len(chunk))                     -> count rows inside a measured call
+# Every measurement records wall time, CPU time (process-wide, so it includes
+# worker threads), rows processed, the resident set size when it ended, how
+# much RSS it added (rss_delta_mb; negative if it freed memory) and how much
+# it raised the process's lifetime peak (peak_growth_mb, 0 unless the
+# operation set a new high). Records go to an in-process ring
+# buffer and are appended to logs/metrics.csv, which every process (app,
+# pipeline, job runner scripts) shares. With APIS_METRICS=0 a wrapped call
+# costs one global check (well under 1us).
+
+ENABLED = os.environ.get("APIS_METRICS", "1").lower() not in ("0", "false", "no", "off")
+METRICS_PATH = os.environ.get("APIS_METRICS_FILE", "logs/metrics.csv")
+BUFFER_SIZE = int(os.environ.get("APIS_METRICS_BUFFER", "10000"))
+# The metrics file is rotated to <file>.1 when it grows past this (MB)
+MAX_FILE_MB = int(os.environ.get("APIS_METRICS_MAX_MB", "50"))
+
+METRIC_COLUMNS = [
+    "timestamp", "pid", "operation", "wall_ms", "cpu_ms", "rows", "rss_mb", "rss_delta_mb", "peak_growth_mb"
+]
+
+_buffer = deque(maxlen=BUFFER_SIZE)
+_write_lock = threading.Lock()
+_local = threading.local()
+_file = None
+
+
+def set_enabled(enabled):
+    global ENABLED
+    ENABLED = bool(enabled)
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    # Linux reports KiB (macOS would report bytes)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+_PAGE_MB = os.sysconf("SC_PAGE_SIZE") / 2**20 if hasattr(os, "sysconf") else None
+
+
+def _current_rss_mb():
+    # Linux only (a few us); blank elsewhere
+    if _PAGE_MB is None:
+        return None
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_MB
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _open_metrics_file():
+    global _file
+    if _file is not None and not _file.closed:
+        if os.path.exists(METRICS_PATH) and _file.tell() < MAX_FILE_MB * 2**20:
+            return _file
+        _file.close()
+    os.makedirs(os.path.dirname(METRICS_PATH) or ".", exist_ok=True)
+    if os.path.exists(METRICS_PATH) and (
+            os.path.getsize(METRICS_PATH) >= MAX_FILE_MB * 2**20 or _file_header(METRICS_PATH) != METRIC_COLUMNS):
+        # Full, or written with an older column layout
+        os.replace(METRICS_PATH, METRICS_PATH + ".1")
+    is_new = not os.path.exists(METRICS_PATH) or os.path.getsize(METRICS_PATH) == 0
+    # Line-buffered appends: each record is one short write, so records from
+    # several processes do not interleave mid-line
+    _file = open(METRICS_PATH, "a", newline="", encoding="utf-8", buffering=1)
+    if is_new:
+        csv.writer(_file).writerow(METRIC_COLUMNS)
+    return _file
+
+
+def _file_header(path):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return next(csv.reader(f), None)
+
+
+def _record(record):
+    _buffer.append(record)
+    with _write_lock:
+        try:
+            csv.writer(_open_metrics_file()).writerow([record[c] for c in METRIC_COLUMNS])
+        except OSError:
+            # Metrics must never break the operation being measured
+            pass
+
+
+class _Measurement:
+    __slots__ = ("operation", "rows", "_wall", "_cpu", "_peak", "_rss")
+
+    def __init__(self, operation, rows=None):
+        self.operation = operation
+        self.rows = rows
+
+    def __enter__(self):
+        _stack().append(self)
+        self._peak = _peak_rss_mb()
+        self._rss = _current_rss_mb()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        peak = _peak_rss_mb()
+        rss = _current_rss_mb()
+        _stack().pop()
+        _record({
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "pid": os.getpid(),
+            "operation": self.operation if exc_type is None else f"{self.operation} (error)",
+            "wall_ms": round(wall * 1000, 3),
+            "cpu_ms": round(cpu * 1000, 3),
+            "rows": self.rows,
+            "rss_mb": round(rss, 1) if rss is not None else None,
+            "rss_delta_mb": round(rss - self._rss, 1) if rss is not None and self._rss is not None else None,
+            "peak_growth_mb": round(peak - self._peak, 1) if peak is not None else None,
+        })
+        return False
+
+
+class _Disabled:
+    __slots__ = ()
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_DISABLED = _Disabled()
+
+
+def measure(operation, rows=None):
+    """Context manager timing the enclosed block as `operation`."""
+    if not ENABLED:
+        return _DISABLED
+    return _Measurement(operation, rows)
+
+
+def add_rows(count):
+    """Add `count` processed rows to the innermost running measurement."""
+    if not ENABLED:
+        return
+    stack = _stack()
+    if stack:
+        top = stack[-1]
+        top.rows = (top.rows or 0) + int(count)
+
+
+def timed(operation, rows=None):
+    """
+    Decorator timing every call as `operation`. `rows` is an optional
+    callable mapping the return value to the number of rows processed.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with _Measurement(operation) as m:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    m.rows = (m.rows or 0) + int(rows(result))
+            return result
+        return wrapper
+    return decorate
+
+
+# -----------------------------
+# Reading records back
+# -----------------------------
+def recent_records():
+    """This process's records (oldest first), from the ring buffer."""
+    return list(_buffer)
+
+
+_tail_cache = {}   # path -> (inode, bytes parsed, frame)
+_tail_lock = threading.Lock()
+
+
+def read_metrics(path=METRICS_PATH, max_records=None):
+    """
+    Records from the shared metrics file as a frame (the last `max_records`).
+
+    Parsed frames are kept per file; a later call parses only the lines
+    appended since (every process keeps appending, so the file is never
+    unchanged for long), and a rotated file is read afresh.
+    """
+    import pandas as pd
+
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=METRIC_COLUMNS)
+
+    with _tail_lock:
+        stat = os.stat(path)
+        cached = _tail_cache.get(path)
+        if cached is None or cached[0] != stat.st_ino or cached[1] > stat.st_size:
+            cached = (stat.st_ino, 0, pd.DataFrame(columns=METRIC_COLUMNS))
+        inode, offset, frame = cached
+
+        if stat.st_size > offset:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read(stat.st_size - offset)
+            # A record still being written is picked up next time
+            data = data[:data.rfind(b"\n") + 1]
+            if data:
+                new = pd.read_csv(
+                    io.BytesIO(data), on_bad_lines="skip",
+                    **({} if offset == 0 else {"header": None, "names": METRIC_COLUMNS})
+                ).reindex(columns=METRIC_COLUMNS)
+                frame = new if frame.empty else pd.concat([frame, new], ignore_index=True)
+                offset += len(data)
+        _tail_cache[path] = (inode, offset, frame)
+
+    return frame.tail(max_records) if max_records else frame
+
+
+def latency_summary(records):
+    """
+    Per-operation call count, p50/p95/p99 wall time, mean CPU time, rows/sec,
+    highest RSS at exit and largest RSS growth, slowest p95 first. `records`
+    is a frame or a list of record dicts.
+    """
+    import pandas as pd
+
+    frame = pd.DataFrame(records, columns=METRIC_COLUMNS)
+    if frame.empty:
+        return pd.DataFrame(columns=["operation", "calls", "p50_ms", "p95_ms", "p99_ms", "mean_cpu_ms", "rows_per_sec", "max_rss_mb", "max_rss_delta_mb"])
+
+    for col in ["wall_ms", "cpu_ms", "rows", "rss_mb", "rss_delta_mb"]:
+        frame[col] = pd.to_numeric(frame[col], errors="coerce")
+    grouped = frame.groupby("operation")
+    summary = pd.DataFrame({
+        "calls": grouped.size(),
+        "p50_ms": grouped["wall_ms"].quantile(0.50),
+        "p95_ms": grouped["wall_ms"].quantile(0.95),
+        "p99_ms": grouped["wall_ms"].quantile(0.99),
+        "mean_cpu_ms": grouped["cpu_ms"].mean(),
+        "rows_per_sec": grouped["rows"].sum() / (grouped["wall_ms"].sum() / 1000),
+        "max_rss_mb": grouped["rss_mb"].max(),
+        "max_rss_delta_mb": grouped["rss_delta_mb"].max(),
+    })
+    # Operations that never report rows have no throughput
+    summary.loc[grouped["rows"].count() == 0, "rows_per_sec"] = float("nan")
+    return summary.round(2).sort_values("p95_ms", ascending=False).reset_index()
@@ -0,0 +1,215 @@
+import csv
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from progress import PROGRESS_ENV, read_progress
+
+# -----------------------------
+# Local background job runner
+# -----------------------------
+# Pipeline scripts (retrain_model.py, risk_score.py, ...) are queued and run
+# one at a time in a worker process, so the Streamlit session stays usable.
+# Scripts report stage progress through progress.report_progress(); the
+# dashboard polls jobs() for status and can cancel queued or running jobs.
+
+JOB_LOG_DIR = "logs/jobs"
+HISTORY_PATH = "logs/job_history.csv"
+HISTORY_COLUMNS = [
+    "job_id", "name", "script", "status", "submitted_at",
+    "started_at", "finished_at", "duration_sec", "returncode"
+]
+
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _terminate(proc):
+    # Jobs run in their own session, so the signal also reaches the process
+    # pool / joblib workers a retrain or search starts
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(proc.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    else:
+        proc.terminate()
+
+
+class JobRunner:
+    def __init__(self, log_dir=JOB_LOG_DIR, history_path=HISTORY_PATH):
+        self.log_dir = log_dir
+        self.history_path = history_path
+        self._queue = queue.Queue()
+        self._jobs = OrderedDict()
+        self._procs = {}
+        self._lock = threading.Lock()
+
+        self._worker = threading.Thread(target=self._run_forever, name="apis-job-runner", daemon=True)
+        self._worker.start()
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def submit(self, name, script, args=()):
+        job_id = uuid.uuid4().hex[:8]
+        job = {
+            "job_id": job_id,
+            "name": name,
+            "script": script,
+            "args": list(args),
+            "status": "queued",
+            "stage": "Queued",
+            "progress": 0.0,
+            "submitted_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "returncode": None,
+            "cancel_requested": False,
+            "log_path": os.path.join(self.log_dir, f"{job_id}.log"),
+            "progress_path": os.path.join(self.log_dir, f"{job_id}.progress"),
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+        self._queue.put(job_id)
+        return job_id
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] in FINISHED_STATUSES:
+                return False
+            job["cancel_requested"] = True
+            proc = self._procs.get(job_id)
+        if proc is not None:
+            _terminate(proc)
+        return True
+
+    def jobs(self):
+        """Snapshot of every job in this process, newest first, with fresh progress."""
+        with self._lock:
+            for job in self._jobs.values():
+                if job["status"] == "running":
+                    latest = read_progress(job["progress_path"])
+                    if latest is not None:
+                        job["stage"] = latest["stage"]
+                        job["progress"] = latest["progress"]
+            return [dict(job) for job in reversed(self._jobs.values())]
+
+    def active_jobs(self):
+        return [job for job in self.jobs() if job["status"] not in FINISHED_STATUSES]
+
+    def history(self):
+        """Finished jobs recorded on disk (oldest first)."""
+        if not os.path.exists(self.history_path):
+            return []
+        with open(self.history_path, "r", encoding="utf-8", newline="") as f:
+            return list(csv.DictReader(f))
+
+    # -----------------------------
+    # Worker
+    # -----------------------------
+    def _run_forever(self):
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                job = self._jobs[job_id]
+                if job["cancel_requested"]:
+                    self._finish(job, "cancelled", None, started=None)
+                    continue
+            try:
+                self._run(job)
+            except Exception as exc:
+                # A job that could not be launched or recorded (unwritable
+                # logs/, disk full, ...) must not take the worker down with it
+                with self._lock:
+                    proc = self._procs.pop(job_id, None)
+                    if proc is not None and proc.poll() is None:
+                        _terminate(proc)
+                    if job["status"] not in FINISHED_STATUSES:
+                        job["error"] = f"{type(exc).__name__}: {exc}"
+                        self._finish(job, "failed", None, started=None)
+
+    def _run(self, job):
+        os.makedirs(self.log_dir, exist_ok=True)
+        env = dict(os.environ, PYTHONUNBUFFERED="1")
+        env[PROGRESS_ENV] = job["progress_path"]
+
+        started = time.time()
+        with open(job["log_path"], "w", encoding="utf-8") as log:
+            with self._lock:
+                proc = subprocess.Popen(
+                    [sys.executable, job["script"], *job["args"]],
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                    env=env,
+                    start_new_session=(os.name == "posix")
+                )
+                self._procs[job["job_id"]] = proc
+                job["status"] = "running"
+                job["stage"] = "Starting"
+                job["started_at"] = _now()
+                # cancel() may have landed between dequeue and launch
+                if job["cancel_requested"]:
+                    _terminate(proc)
+
+            returncode = proc.wait()
+            if job["cancel_requested"]:
+                # Workers still finishing after the script itself exited
+                _terminate(proc)
+
+        with self._lock:
+            self._procs.pop(job["job_id"], None)
+            if job["cancel_requested"]:
+                status = "cancelled"
+            else:
+                status = "succeeded" if returncode == 0 else "failed"
+            self._finish(job, status, returncode, started)
+
+    def _finish(self, job, status, returncode, started):
+        # Called with self._lock held
+        job["status"] = status
+        job["returncode"] = returncode
+        job["finished_at"] = _now()
+        if status == "succeeded":
+            job["stage"], job["progress"] = "Completed", 1.0
+        else:
+            job["stage"] = status.capitalize()
+
+        row = {col: job.get(col) for col in HISTORY_COLUMNS}
+        row["duration_sec"] = round(time.time() - started, 1) if started else 0.0
+
+        try:
+            os.makedirs(os.path.dirname(self.history_path) or ".", exist_ok=True)
+            write_header = not os.path.exists(self.history_path)
+            with open(self.history_path, "a", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=HISTORY_COLUMNS)
+                if write_header:
+                    writer.writeheader()
+                writer.writerow(row)
+        except OSError as exc:
+            # The in-memory status above is what the dashboard shows
+            job["error"] = job.get("error") or f"History not recorded: {exc}"
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_runner():
+    """Process-wide runner shared by every Streamlit session."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
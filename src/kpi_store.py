@@ -0,0 +1,163 @@
+import json
+import os
+import uuid
+from datetime import datetime
+
+from instrumentation import add_rows, timed
+from storage import iter_table, resolve_table_path
+
+# -----------------------------
+# Materialized KPI snapshot
+# -----------------------------
+# dataset/kpi_snapshot.json holds the order KPIs shown on the Dashboard,
+# Overview and Orders Explorer pages, plus the previous snapshot for deltas.
+# It is rebuilt (streaming orders.csv in chunks) only when orders or the
+# anomaly report change on disk; pages then read it in O(1).
+
+ORDERS_PATH = "dataset/orders.csv"
+ANOMALIES_PATH = "dataset/anomaly_report.csv"
+SNAPSHOT_PATH = "dataset/kpi_snapshot.json"
+
+KPI_COLUMNS = ["supplier_id", "order_status", "order_priority", "delay_days", "defect_rate", "price_change_percent"]
+CHUNK_SIZE = int(os.environ.get("APIS_KPI_CHUNK_SIZE", "500000"))
+
+# Scalar KPIs compared against the previous snapshot
+DELTA_KEYS = [
+    "total_orders", "delayed_orders", "ontime_orders", "on_time_rate_percent",
+    "delayed_rate_percent", "avg_delay_days", "avg_defect_rate",
+    "avg_price_change_percent", "total_suppliers", "anomaly_records"
+]
+
+
+def source_signature(orders_path=ORDERS_PATH, anomalies_path=ANOMALIES_PATH):
+    """(path, mtime, size) of every input, used to detect data changes."""
+    signature = {}
+    for name, path in [("orders", orders_path), ("anomalies", anomalies_path)]:
+        resolved = resolve_table_path(path)
+        if resolved is None:
+            signature[name] = None
+        else:
+            stat = os.stat(resolved)
+            signature[name] = [resolved, stat.st_mtime_ns, stat.st_size]
+    return signature
+
+
+def _add_counts(totals, counts):
+    for key, value in counts.items():
+        totals[str(key)] = totals.get(str(key), 0) + int(value)
+
+
+@timed("stage.compute_kpis")
+def compute_kpis(orders_path=ORDERS_PATH, anomalies_path=ANOMALIES_PATH, chunksize=CHUNK_SIZE, orders=None):
+    """
+    Order KPIs from running counts and sums over the orders table (or over
+    an already loaded `orders` frame, as one chunk).
+    """
+    total = 0
+    sums = {"delay_days": 0.0, "defect_rate": 0.0, "price_change_percent": 0.0}
+    non_null = {col: 0 for col in sums}
+    status_counts = {}
+    priority_counts = {}
+    suppliers = set()
+
+    if orders is not None:
+        chunks = [orders[KPI_COLUMNS]]
+    else:
+        chunks = iter_table(orders_path, columns=KPI_COLUMNS, chunksize=chunksize)
+
+    for chunk in chunks:
+        total += len(chunk)
+        add_rows(len(chunk))
+        for col in sums:
+            sums[col] += float(chunk[col].sum())
+            non_null[col] += int(chunk[col].count())
+        _add_counts(status_counts, chunk["order_status"].value_counts())
+        _add_counts(priority_counts, chunk["order_priority"].value_counts())
+        suppliers.update(chunk["supplier_id"].dropna().unique())
+
+    anomaly_records = 0
+    if resolve_table_path(anomalies_path) is not None:
+        for chunk in iter_table(anomalies_path, columns=["order_id"], chunksize=chunksize):
+            anomaly_records += len(chunk)
+
+    def mean(col):
+        return sums[col] / non_null[col] if non_null[col] else 0.0
+
+    delayed = status_counts.get("Delayed", 0)
+    ontime = status_counts.get("OnTime", 0)
+    return {
+        "total_orders": total,
+        "delayed_orders": delayed,
+        "ontime_orders": ontime,
+        "on_time_rate_percent": (ontime / total * 100) if total else 0.0,
+        "delayed_rate_percent": (delayed / total * 100) if total else 0.0,
+        "avg_delay_days": mean("delay_days"),
+        "avg_defect_rate": mean("defect_rate"),
+        "avg_price_change_percent": mean("price_change_percent"),
+        "total_suppliers": len(suppliers),
+        "anomaly_records": anomaly_records,
+        "status_counts": status_counts,
+        "priority_counts": priority_counts
+    }
+
+
+def _read_snapshot(path=SNAPSHOT_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def materialize(force=False, path=SNAPSHOT_PATH, orders=None):
+    """
+    Recompute the snapshot if its inputs changed (or `force`), keeping the
+    replaced one as "previous". Returns the current snapshot. `orders` is
+    the loaded orders table, if the caller already has it.
+    """
+    signature = source_signature()
+    current = _read_snapshot(path)
+    if not force and current is not None and current.get("source_signature") == signature:
+        return current
+
+    snapshot = {
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "source_signature": signature,
+        "kpis": compute_kpis(orders=orders),
+        "previous": None
+    }
+    if current is not None:
+        snapshot["previous"] = {"generated_at": current["generated_at"], "kpis": current["kpis"]}
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Unique tmp name: several app sessions may refresh a stale snapshot at once
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=2)
+    os.replace(tmp_path, path)
+    return snapshot
+
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    """Current snapshot, materializing it first if missing or stale."""
+    snapshot = _read_snapshot(path)
+    if snapshot is None or snapshot.get("source_signature") != source_signature():
+        snapshot = materialize(path=path)
+    return snapshot
+
+
+def kpi_deltas(snapshot):
+    """Change of each scalar KPI since the previous snapshot (None if no previous)."""
+    previous = snapshot.get("previous")
+    if not previous:
+        return {key: None for key in DELTA_KEYS}
+    return {
+        key: snapshot["kpis"].get(key, 0) - previous["kpis"].get(key, 0)
+        for key in DELTA_KEYS
+    }
+
+
+if __name__ == "__main__":
+    result = materialize()
+    print("✅ KPI snapshot up to date!")
+    print(f"Generated at: {result['generated_at']} | Total Orders: {result['kpis']['total_orders']}")
+    print(f"Saved: {SNAPSHOT_PATH}")
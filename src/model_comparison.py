@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from sklearn.pipeline import Pipeline
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+
+# Candidate pipelines fitted concurrently (1 = fit one after the other in-process)
+TRAIN_WORKERS = int(os.environ.get("APIS_TRAIN_WORKERS", "2"))
+
+
+def pool_context():
+    """
+    Start method for training pools. Training runs inside the pipeline's
+    thread pool next to other stages; fork()ing a multithreaded process can
+    copy a lock another thread (BLAS, IsolationForest) holds and deadlock
+    the worker, so workers start from a clean forkserver (spawn where
+    there is none).
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def candidate_models():
+    return {
+        "LogisticRegression": LogisticRegression(max_iter=2000),
+        # n_jobs=-1: the forest builds its trees on every core
+        "RandomForest": RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=-1)
+    }
+
+
+def fit_candidate(name, model, X_train, y_train, X_test, y_test):
+    """Fit one model on the encoded training rows and score it on the test rows."""
+    model.fit(X_train, y_train)
+    return name, model, score_model(model, X_test, y_test)
+
+
+def score_model(model, X_test, y_test):
+    y_pred = model.predict(X_test)
+    return {
+        "accuracy": accuracy_score(y_test, y_pred),
+        "precision": precision_score(y_test, y_pred, zero_division=0),
+        "recall": recall_score(y_test, y_pred, zero_division=0),
+        "f1_score": f1_score(y_test, y_pred, zero_division=0)
+    }
+
+
+_worker = {}
+
+
+def _init_worker(X, train_rows, test_rows):
+    # X arrives as file paths and is re-mapped here; only this worker's
+    # training rows are materialized, once
+    _worker.update(X=X, train_rows=train_rows, test_rows=test_rows)
+
+
+def _split(X, train_rows, test_rows):
+    return X.rows(train_rows), X.target(train_rows), X.rows(test_rows), X.target(test_rows)
+
+
+def _fit_shared(name, model):
+    if "split" not in _worker:
+        _worker["split"] = _split(_worker["X"], _worker["train_rows"], _worker["test_rows"])
+    return fit_candidate(name, model, *_worker["split"])
+
+
+def compare_models(models, preprocessor, X, train_rows, test_rows, n_workers=None):
+    """
+    Fit every candidate on the `train_rows` of the encoded design matrix `X`
+    (a feature_cache.DesignMatrix) - in a process pool when n_workers > 1 -
+    and pick the best by F1 on `test_rows`. Ties go to the earlier candidate
+    in `models`, so the winner does not depend on which worker finishes first.
+
+    Returns (results, best_name, best_f1, best_pipeline) where results is a
+    list of (name, metrics) in candidate order and best_pipeline puts the
+    fitted `preprocessor` in front of the winner, so it scores raw order rows.
+    """
+    n_workers = TRAIN_WORKERS if n_workers is None else n_workers
+    n_workers = max(1, min(n_workers, len(models)))
+
+    if n_workers == 1:
+        split = _split(X, train_rows, test_rows)
+        fitted = [fit_candidate(name, model, *split) for name, model in models.items()]
+    else:
+        # Workers map the cached blocks themselves instead of unpickling a copy
+        with ProcessPoolExecutor(
+            max_workers=n_workers, mp_context=pool_context(), initializer=_init_worker,
+            initargs=(X, train_rows, test_rows)
+        ) as pool:
+            futures = [pool.submit(_fit_shared, name, model) for name, model in models.items()]
+            fitted = [future.result() for future in futures]
+
+    best_name, best_f1, best_model = None, -1, None
+    for name, model, metrics in fitted:
+        if metrics["f1_score"] > best_f1:
+            best_name, best_f1, best_model = name, metrics["f1_score"], model
+
+    best_pipeline = Pipeline(steps=[
+        ("preprocess", preprocessor),
+        ("model", best_model)
+    ])
+    results = [(name, metrics) for name, _, metrics in fitted]
+    return results, best_name, best_f1, best_pipeline
@@ -0,0 +1,168 @@
+import json
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime
+
+# -----------------------------
+# Versioned model registry
+# -----------------------------
+# models/registry/v0007/{model.pkl, metrics.json} holds each published delay
+# model; models/registry/LATEST names the live version. Publishing writes the
+# version directory under a temporary name and renames it into place before
+# flipping LATEST, so readers never see a half-written pickle. The last
+# KEEP_VERSIONS versions are kept. models/model.pkl is still refreshed
+# (atomically) for scripts that load it directly.
+
+REGISTRY_DIR = "models/registry"
+LEGACY_MODEL_PATH = "models/model.pkl"
+KEEP_VERSIONS = int(os.environ.get("APIS_MODEL_KEEP_VERSIONS", "5"))
+
+
+def _version_name(number):
+    return f"v{number:04d}"
+
+
+def _version_numbers(registry_dir=REGISTRY_DIR):
+    if not os.path.isdir(registry_dir):
+        return []
+    return sorted(
+        int(name[1:]) for name in os.listdir(registry_dir)
+        if name.startswith("v") and name[1:].isdigit()
+    )
+
+
+def _atomic_write_text(path, text):
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def latest_version(registry_dir=REGISTRY_DIR):
+    """Name of the live version (e.g. "v0007"), or None if nothing is published."""
+    latest_path = os.path.join(registry_dir, "LATEST")
+    if not os.path.exists(latest_path):
+        return None
+    with open(latest_path, "r", encoding="utf-8") as f:
+        return f.read().strip() or None
+
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    """Published versions with their metrics, newest first."""
+    versions = []
+    for number in reversed(_version_numbers(registry_dir)):
+        metrics_path = os.path.join(registry_dir, _version_name(number), "metrics.json")
+        if os.path.exists(metrics_path):
+            with open(metrics_path, "r", encoding="utf-8") as f:
+                versions.append(json.load(f))
+    return versions
+
+
+def version_metrics(version, registry_dir=REGISTRY_DIR):
+    """The metrics.json record of `version`, or None if it is gone."""
+    metrics_path = os.path.join(registry_dir, version, "metrics.json")
+    if not os.path.exists(metrics_path):
+        return None
+    with open(metrics_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def full_training_metadata(order_rows):
+    """
+    Metadata every full retrain publishes for model_update.py: the number of
+    orders (file order) the model covers and no incremental updates yet.
+    """
+    return {"order_rows": order_rows, "update": "full", "incremental_updates": 0}
+
+
+def load_version(version, registry_dir=REGISTRY_DIR):
+    import joblib  # deferred: pulls in the pickled model's sklearn modules
+    return joblib.load(os.path.join(registry_dir, version, "model.pkl"))
+
+
+def publish(model, metrics, registry_dir=REGISTRY_DIR, keep=KEEP_VERSIONS):
+    """
+    Publish `model` as the next version with its `metrics` dict and make it
+    live. Returns the new version name.
+    """
+    os.makedirs(registry_dir, exist_ok=True)
+
+    staging_dir = os.path.join(registry_dir, f".staging-{uuid.uuid4().hex[:8]}")
+    os.makedirs(staging_dir)
+    import joblib
+    joblib.dump(model, os.path.join(staging_dir, "model.pkl"))
+
+    # Claim the next version number; a concurrent publisher makes rename fail
+    while True:
+        numbers = _version_numbers(registry_dir)
+        version = _version_name((numbers[-1] + 1) if numbers else 1)
+        record = {
+            "version": version,
+            "published_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            **metrics
+        }
+        with open(os.path.join(staging_dir, "metrics.json"), "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+        try:
+            os.rename(staging_dir, os.path.join(registry_dir, version))
+            break
+        except OSError:
+            if not os.path.exists(os.path.join(registry_dir, version)):
+                raise
+
+    _atomic_write_text(os.path.join(registry_dir, "LATEST"), version)
+
+    # Keep the legacy path current without ever exposing a partial file
+    legacy_tmp = f"{LEGACY_MODEL_PATH}.{uuid.uuid4().hex[:8]}.tmp"
+    shutil.copyfile(os.path.join(registry_dir, version, "model.pkl"), legacy_tmp)
+    os.replace(legacy_tmp, LEGACY_MODEL_PATH)
+
+    for number in _version_numbers(registry_dir)[:-keep] if keep > 0 else []:
+        shutil.rmtree(os.path.join(registry_dir, _version_name(number)), ignore_errors=True)
+
+    return version
+
+
+class ModelCache:
+    """
+    Memory-resident live model. get() only re-reads the small LATEST pointer
+    and deserializes again when a new version has been published; without a
+    registry it falls back to models/model.pkl keyed on mtime and size.
+    """
+
+    def __init__(self, registry_dir=REGISTRY_DIR, legacy_path=LEGACY_MODEL_PATH):
+        self.registry_dir = registry_dir
+        self.legacy_path = legacy_path
+        self._key = None
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _current_key(self):
+        version = latest_version(self.registry_dir)
+        if version is not None:
+            return ("registry", version)
+        stat = os.stat(self.legacy_path)
+        return ("legacy", stat.st_mtime_ns, stat.st_size)
+
+    def get(self):
+        key = self._current_key()
+        with self._lock:
+            if key == self._key:
+                return self._model
+
+            if key[0] == "registry":
+                model = load_version(key[1], self.registry_dir)
+            else:
+                import joblib
+                model = joblib.load(self.legacy_path)
+
+            self._key, self._model = key, model
+            return model
+
+    def version(self):
+        key = self._key
+        if key is None:
+            return None
+        return key[1] if key[0] == "registry" else "model.pkl"
@@ -0,0 +1,204 @@
+import itertools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score
+from sklearn.model_selection import train_test_split
+
+from model_comparison import pool_context
+from instrumentation import add_rows, timed
+from progress import report_progress
+
+# -----------------------------
+# Hyperparameter search (successive halving)
+# -----------------------------
+# Candidates are sampled from a search space (per model family, every list
+# is a grid axis) and raced on growing slices of the training rows:
+#   rung 0: every candidate on the smallest budget
+#   rung k: the best 1/ETA of rung k-1 on ETA times more rows
+#   last  : the survivors on all search rows
+# The search runs on the already-encoded design matrix (feature_cache): pool
+# workers map the cached blocks themselves and gather the rows of each
+# budget on demand, so nothing is re-encoded, copied to disk or pickled per
+# fit.
+# Scores are F1 on a validation split carved out of the training rows, so
+# the caller's test split stays untouched for the final comparison.
+
+SEARCH_WORKERS = int(os.environ.get("APIS_SEARCH_WORKERS", str(os.cpu_count() or 2)))
+SEARCH_CANDIDATES = int(os.environ.get("APIS_SEARCH_CANDIDATES", "27"))
+# Stop promoting once the search has run this long (seconds, 0 = no limit)
+SEARCH_TIME_BUDGET = float(os.environ.get("APIS_SEARCH_TIME_BUDGET", "0"))
+ETA = 3
+MIN_ROWS = 2_000
+VALIDATION_SIZE = 0.2
+SEARCH_RESULTS_PATH = "reports/model_search_results.csv"
+
+DEFAULT_SEARCH_SPACE = {
+    "LogisticRegression": {
+        "C": [0.01, 0.1, 1.0, 10.0],
+        "class_weight": [None, "balanced"],
+    },
+    "RandomForest": {
+        "n_estimators": [100, 200, 400],
+        "max_depth": [None, 12, 24],
+        "min_samples_leaf": [1, 5, 20],
+        "class_weight": [None, "balanced"],
+    },
+}
+
+MODEL_FAMILIES = {
+    "LogisticRegression": lambda params, n_jobs: LogisticRegression(max_iter=2000, **params),
+    "RandomForest": lambda params, n_jobs: RandomForestClassifier(random_state=42, n_jobs=n_jobs, **params),
+}
+
+
+def load_search_space(path=None):
+    """The search space from a JSON file ({family: {param: [values]}}), or the default."""
+    if path is None:
+        return DEFAULT_SEARCH_SPACE
+    with open(path, "r", encoding="utf-8") as f:
+        space = json.load(f)
+    unknown = [family for family in space if family not in MODEL_FAMILIES]
+    if unknown:
+        raise ValueError(f"Unknown model families in {path}: {unknown}")
+    return space
+
+
+def sample_candidates(space, n_candidates=SEARCH_CANDIDATES, seed=42):
+    """
+    Up to `n_candidates` (family, params) pairs. Each family gets a share
+    proportional to its grid size (at least one); grids larger than their
+    share are sampled without replacement.
+    """
+    grids = {
+        family: [dict(zip(axes, values)) for values in itertools.product(*axes.values())]
+        for family, axes in space.items()
+    }
+    total = sum(len(grid) for grid in grids.values())
+    rng = random.Random(seed)
+    candidates = []
+    for family, grid in grids.items():
+        share = max(1, round(n_candidates * len(grid) / total)) if total > n_candidates else len(grid)
+        picked = grid if share >= len(grid) else rng.sample(grid, share)
+        candidates += [(family, params) for params in picked]
+    return candidates
+
+
+def make_estimator(family, params, n_jobs=-1):
+    return MODEL_FAMILIES[family](params, n_jobs)
+
+
+def tuned_models(best):
+    """Candidates for compare_models built from the search winners (all cores per fit)."""
+    return {family: make_estimator(family, params) for family, params in best.items()}
+
+
+def rung_budgets(n_rows, n_candidates, eta=ETA, min_rows=MIN_ROWS):
+    """Training rows per rung, growing by `eta` and ending at all `n_rows`."""
+    rungs = max(1, math.ceil(math.log(max(n_candidates, 1), eta)) + 1)
+    smallest = max(min(min_rows, n_rows), n_rows // eta ** (rungs - 1))
+    budgets = [min(n_rows, smallest * eta ** r) for r in range(rungs)]
+    budgets[-1] = n_rows
+    # Budgets that hit n_rows early collapse into the last rung
+    return sorted(set(budgets))
+
+
+# -----------------------------
+# Pool workers
+# -----------------------------
+_worker = {}
+
+
+def _init_worker(X, fit_rows, val_rows):
+    # X arrives as file paths and is re-mapped here
+    _worker.update(X=X, fit_rows=fit_rows, val_rows=val_rows)
+
+
+def _fit_and_score(index, family, params, n_rows):
+    started = time.perf_counter()
+    X = _worker["X"]
+    if "val" not in _worker:
+        val_rows = _worker["val_rows"]
+        _worker["val"] = X.rows(val_rows, "float32"), X.target(val_rows)
+    # The last budget's rows are kept for the next candidate on that rung
+    if _worker.get("fit_budget") != n_rows:
+        fit_rows = _worker["fit_rows"][:n_rows]
+        _worker["fit"] = X.rows(fit_rows, "float32"), X.target(fit_rows)
+        _worker["fit_budget"] = n_rows
+    X_val, y_val = _worker["val"]
+    model = make_estimator(family, params, n_jobs=1)
+    model.fit(*_worker["fit"])
+    score = f1_score(y_val, model.predict(X_val), zero_division=0)
+    return index, float(score), time.perf_counter() - started
+
+
+@timed("stage.model_search")
+def successive_halving(X, rows, space=None, n_candidates=SEARCH_CANDIDATES,
+                       n_workers=SEARCH_WORKERS, time_budget=SEARCH_TIME_BUDGET,
+                       eta=ETA, min_rows=MIN_ROWS, seed=42):
+    """
+    Race sampled candidates on growing row budgets of the training `rows`
+    of the encoded design matrix `X` (a feature_cache.DesignMatrix).
+
+    Returns (best, trials): `best` maps each model family that produced a
+    finalist to its best params (ranked by the last rung it reached, then
+    validation F1); `trials` lists every fit as a dict.
+    """
+    candidates = sample_candidates(space or DEFAULT_SEARCH_SPACE, n_candidates, seed)
+    add_rows(len(rows))
+
+    # Rows are shuffled by the split, so row prefixes are random subsets of
+    # every size
+    fit_rows, val_rows = train_test_split(
+        rows, test_size=VALIDATION_SIZE, random_state=seed, stratify=X.target(rows)
+    )
+
+    trials = []
+    started = time.perf_counter()
+    budgets = rung_budgets(len(fit_rows), len(candidates), eta, min_rows)
+    alive = list(range(len(candidates)))
+    reached = {}
+    n_workers = max(1, min(n_workers, len(candidates)))
+
+    with ProcessPoolExecutor(
+        max_workers=n_workers, mp_context=pool_context(), initializer=_init_worker,
+        initargs=(X, fit_rows, val_rows)
+    ) as pool:
+        for rung, n_rows in enumerate(budgets):
+            report_progress(
+                f"Hyperparameter search: rung {rung + 1}/{len(budgets)} ({len(alive)} candidates, {n_rows:,} rows)",
+                0.35 + 0.4 * rung / len(budgets)
+            )
+            # Largest models first so the pool does not end on a straggler
+            order = sorted(alive, key=lambda i: -candidates[i][1].get("n_estimators", 0))
+            futures = [pool.submit(_fit_and_score, i, *candidates[i], n_rows) for i in order]
+            scores = {}
+            for future in futures:
+                index, score, seconds = future.result()
+                scores[index] = score
+                reached[index] = (rung, score)
+                family, params = candidates[index]
+                trials.append({
+                    "rung": rung, "rows": n_rows, "model_name": family,
+                    "params": json.dumps(params), "f1_score": round(score, 4),
+                    "fit_sec": round(seconds, 2)
+                })
+
+            over_budget = time_budget and time.perf_counter() - started > time_budget
+            if rung == len(budgets) - 1 or over_budget:
+                break
+            # Ties keep sampling order, so results do not depend on timing
+            keep = max(1, len(alive) // eta)
+            alive = sorted(alive, key=lambda i: (-scores[i], i))[:keep]
+
+    best = {}
+    for index in sorted(reached, key=lambda i: (-reached[i][0], -reached[i][1], i)):
+        family, params = candidates[index]
+        best.setdefault(family, params)
+    return best, trials
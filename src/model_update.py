@@ -0,0 +1,190 @@
+import copy
+import csv
+import os
+from datetime import datetime
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+from feature_cache import design_matrix
+from instrumentation import timed
+from model_comparison import score_model
+from model_registry import latest_version, load_version, publish, version_metrics
+from progress import report_progress
+from retrain_model import train_and_save_model, training_frame
+
+# -----------------------------
+# Incremental delay model updates
+# -----------------------------
+#   python src/model_update.py          -> e.g. hourly, between nightly full retrains
+# Learns from the orders appended since the live model was published:
+#   RandomForest          -> UPDATE_TREES more trees grown on the new rows (warm start)
+#   partial_fit models    -> partial_fit on the new rows (e.g. SGD logistic regression)
+#   anything else         -> full retrain; LogisticRegression (lbfgs) cannot learn
+#                            from the new rows alone without refitting on all of them
+# A slice of the new rows is held out; the update is published only if it
+# scores (F1) no worse than the live model on those rows, within MAX_F1_DROP.
+# Those scores are published as holdout_* metrics: they are not comparable
+# with the test-split f1_score / accuracy of a full retrain.
+# It falls back to a full retrain every FULL_RETRAIN_EVERY updates, once the
+# new rows reach FULL_RETRAIN_GROWTH of the rows already covered, or when
+# earlier orders or the category values changed (the feature cache rebuilt).
+
+MIN_NEW_ROWS = int(os.environ.get("APIS_UPDATE_MIN_ROWS", "500"))
+UPDATE_TREES = int(os.environ.get("APIS_UPDATE_TREES", "20"))
+FULL_RETRAIN_EVERY = int(os.environ.get("APIS_FULL_RETRAIN_EVERY", "24"))
+FULL_RETRAIN_GROWTH = float(os.environ.get("APIS_FULL_RETRAIN_GROWTH", "0.5"))
+MAX_F1_DROP = float(os.environ.get("APIS_UPDATE_MAX_F1_DROP", "0.01"))
+HOLDOUT_SIZE = 0.2
+UPDATE_LOG_PATH = "logs/model_update_log.csv"
+UPDATE_LOG_COLUMNS = [
+    "timestamp", "action", "reason", "base_version", "version", "model_name",
+    "new_rows", "live_f1", "updated_f1"
+]
+
+
+def _file_header(path):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return next(csv.reader(f), None)
+
+
+def _log_update(record):
+    # One appended row per run; the header is written once, in a fixed order
+    os.makedirs(os.path.dirname(UPDATE_LOG_PATH), exist_ok=True)
+    record = {"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), **record}
+    if os.path.exists(UPDATE_LOG_PATH) and _file_header(UPDATE_LOG_PATH) not in (None, UPDATE_LOG_COLUMNS):
+        # Written with another column order
+        os.replace(UPDATE_LOG_PATH, UPDATE_LOG_PATH + ".1")
+    new_file = not os.path.exists(UPDATE_LOG_PATH) or os.path.getsize(UPDATE_LOG_PATH) == 0
+    with open(UPDATE_LOG_PATH, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(UPDATE_LOG_COLUMNS)
+        writer.writerow(["" if record.get(c) is None else record[c] for c in UPDATE_LOG_COLUMNS])
+
+
+def _full_retrain(orders, reason, base_version):
+    report_progress(f"Full retrain: {reason}", 0.3)
+    model_name, f1 = train_and_save_model(orders=orders)
+    record = {
+        "action": "full_retrain", "reason": reason, "base_version": base_version,
+        "version": latest_version(), "model_name": model_name, "new_rows": None,
+        "live_f1": None, "updated_f1": round(f1, 4)
+    }
+    _log_update(record)
+    return record
+
+
+def update_estimator(model, X, y, fit_rows):
+    """
+    Fit a copy of the live `model` further on `fit_rows` (the new training
+    rows) of the DesignMatrix X / y, and on nothing else. Returns None for
+    estimators with no incremental path.
+    """
+    model = copy.deepcopy(model)
+    if hasattr(model, "partial_fit"):
+        model.partial_fit(X.rows(fit_rows), y[fit_rows])
+    elif isinstance(model, RandomForestClassifier):
+        # New trees see only the new rows; the existing ones are kept as-is
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + UPDATE_TREES)
+        model.fit(X.rows(fit_rows), y[fit_rows])
+        model.set_params(warm_start=False)
+    else:
+        return None
+    return model
+
+
+@timed("stage.update_model")
+def update_model(orders=None):
+    """
+    Update the live delay model with the orders appended since it was
+    published. Returns the update log record (action is "published",
+    "rejected", "skipped" or "full_retrain").
+    """
+    version = latest_version()
+    info = version_metrics(version) if version else None
+    if info is None or "order_rows" not in info:
+        return _full_retrain(orders, "no model with a known training set", version)
+    if info.get("incremental_updates", 0) >= FULL_RETRAIN_EVERY:
+        return _full_retrain(orders, f"{FULL_RETRAIN_EVERY} incremental updates since the last full retrain", version)
+
+    df = training_frame(orders)
+    report_progress("Encoding new orders", 0.3)
+    X, y, preprocessor, cache_status = design_matrix(df)
+    try:
+        seen = info["order_rows"]
+        new_rows = np.arange(seen, len(y))
+
+        if cache_status == "rebuilt" or len(y) < seen:
+            return _full_retrain(orders, "earlier orders or category values changed", version)
+        if len(new_rows) < MIN_NEW_ROWS:
+            record = {"action": "skipped", "reason": f"{len(new_rows)} new orders (< {MIN_NEW_ROWS})",
+                      "base_version": version, "new_rows": len(new_rows)}
+            _log_update(record)
+            return record
+        if len(new_rows) > FULL_RETRAIN_GROWTH * seen:
+            return _full_retrain(orders, f"{len(new_rows)} new orders on {seen} covered", version)
+
+        live = load_version(version)
+        if list(live.named_steps["preprocess"].get_feature_names_out()) != list(preprocessor.get_feature_names_out()):
+            return _full_retrain(orders, "feature layout differs from the live model", version)
+
+        # Both models are scored on new rows neither has been trained on
+        y_new = y[new_rows]
+        stratify = y_new if np.bincount(y_new, minlength=2).min() >= 2 else None
+        fit_rows, holdout_rows = train_test_split(new_rows, test_size=HOLDOUT_SIZE, random_state=42, stratify=stratify)
+        if len(np.unique(y[fit_rows])) < 2:
+            return _full_retrain(orders, "new orders contain a single class", version)
+
+        report_progress(f"Updating {info['model_name']} on {len(fit_rows):,} new orders", 0.5)
+        updated = update_estimator(live.named_steps["model"], X, y, fit_rows)
+        if updated is None:
+            return _full_retrain(orders, f"{info['model_name']} has no incremental update", version)
+
+        report_progress("Comparing with the live model", 0.8)
+        X_holdout = X.rows(holdout_rows)
+        live_metrics = score_model(live.named_steps["model"], X_holdout, y[holdout_rows])
+        metrics = score_model(updated, X_holdout, y[holdout_rows])
+        record = {
+            "base_version": version, "model_name": info["model_name"], "new_rows": len(new_rows),
+            "live_f1": round(live_metrics["f1_score"], 4), "updated_f1": round(metrics["f1_score"], 4)
+        }
+
+        if metrics["f1_score"] < live_metrics["f1_score"] - MAX_F1_DROP:
+            record.update(action="rejected", reason="F1 on the held-out new orders dropped")
+            _log_update(record)
+            return record
+
+        record["version"] = publish(
+            Pipeline(steps=[("preprocess", live.named_steps["preprocess"]), ("model", updated)]),
+            {
+                "model_name": info["model_name"],
+                **{f"holdout_{k}": round(v, 4) for k, v in metrics.items()},
+                "holdout_rows": len(holdout_rows),
+                "training_rows": info["training_rows"] + len(fit_rows),
+                "order_rows": len(y),
+                "update": "incremental",
+                "incremental_updates": info.get("incremental_updates", 0) + 1,
+                "base_version": version
+            }
+        )
+        record.update(action="published", reason=None)
+        _log_update(record)
+        return record
+    finally:
+        X.close()
+
+
+if __name__ == "__main__":
+    result = update_model()
+    if result["action"] == "published":
+        print(f"✅ {result['model_name']} updated on {result['new_rows']:,} new orders → {result['version']} "
+              f"(F1 {result['live_f1']:.4f} → {result['updated_f1']:.4f})")
+    elif result["action"] == "rejected":
+        print(f"⚠️ Update not published: F1 {result['live_f1']:.4f} → {result['updated_f1']:.4f} on held-out new orders")
+    elif result["action"] == "skipped":
+        print(f"ℹ️ Nothing to update: {result['reason']}")
+    else:
+        print(f"✅ Full retrain ({result['reason']}) → {result['version']} | {result['model_name']} F1: {result['updated_f1']:.4f}")
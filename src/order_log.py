@@ -0,0 +1,94 @@
+import hashlib
+import os
+
+import pandas as pd
+
+# -----------------------------
+# Append-only view of orders.csv
+# -----------------------------
+# Incremental stages remember a snapshot of the CSV (byte offset, header and
+# a fingerprint of the bytes at the head and just before the offset). If the
+# file still matches the snapshot up to that offset, everything after it is
+# newly appended rows and can be read without touching the rest of the file.
+
+# Bytes hashed at the head of the file and just before the snapshot offset
+FINGERPRINT_BYTES = 64 * 1024
+
+
+def _fingerprint(path, offset):
+    with open(path, "rb") as f:
+        head = f.read(min(FINGERPRINT_BYTES, offset))
+        f.seek(max(0, offset - FINGERPRINT_BYTES))
+        tail = f.read(offset - max(0, offset - FINGERPRINT_BYTES))
+    return hashlib.sha1(head + b"|" + tail).hexdigest()
+
+
+def ends_with_newline(path, offset=None):
+    offset = os.path.getsize(path) if offset is None else offset
+    if offset == 0:
+        return True
+    with open(path, "rb") as f:
+        f.seek(offset - 1)
+        return f.read(1) == b"\n"
+
+
+def read_header(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.readline().rstrip("\r\n").split(",")
+
+
+def snapshot(path):
+    """Snapshot of a CSV file as it is now."""
+    size = os.path.getsize(path)
+    return {
+        "orders_path": path,
+        "offset": size,
+        "fingerprint": _fingerprint(path, size),
+        "header": read_header(path),
+    }
+
+
+def is_append_of(path, state):
+    """True if `path` is the snapshotted file, unchanged or with rows appended."""
+    if state is None or state.get("orders_path") != path or "offset" not in state:
+        return False
+    offset = state["offset"]
+    return (
+        os.path.getsize(path) >= offset
+        and ends_with_newline(path, offset)
+        and read_header(path) == state["header"]
+        and _fingerprint(path, offset) == state["fingerprint"]
+    )
+
+
+def has_new_rows(path, state):
+    return os.path.getsize(path) > state["offset"]
+
+
+def read_appended(state, columns=None, dtype=None, chunksize=None):
+    """
+    Read the rows appended after the snapshot. With `chunksize`, returns an
+    iterator of frames like pd.read_csv does.
+    """
+    f = open(state["orders_path"], "rb")
+    f.seek(state["offset"])
+    reader = pd.read_csv(
+        f,
+        header=None,
+        names=state["header"],
+        usecols=columns,
+        dtype=dtype,
+        chunksize=chunksize
+    )
+    if chunksize is None:
+        f.close()
+        return reader
+    return _closing_chunks(reader, f)
+
+
+def _closing_chunks(reader, f):
+    try:
+        for chunk in reader:
+            yield chunk
+    finally:
+        f.close()
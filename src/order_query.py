@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Indexed filter / sort / page queries over the orders table
+# -----------------------------
+# OrderIndex is built once per orders frame:
+#   - categorical columns -> integer codes plus a posting list (row ids) per
+#     value, so "supplier_id == S01" is a slice, not a scan
+#   - numeric columns     -> a sorted permutation and each row's rank in it,
+#     so range filters are two binary searches and sorting a filtered set
+#     is a partial sort of its ranks
+# A query starts from the most selective filter, checks the rest on that
+# candidate set only, and materializes just the requested page.
+
+CATEGORICAL_COLUMNS = ["supplier_id", "order_status", "order_priority", "region", "item_category", "shipping_mode"]
+NUMERIC_COLUMNS = ["delay_days", "defect_rate", "quantity", "unit_price", "price_change_percent"]
+
+
+class OrderIndex:
+    """Per-column indexes over an orders frame (the frame is not copied)."""
+
+    def __init__(self, orders):
+        self.orders = orders
+        self.size = len(orders)
+        self.codes = {}
+        self.categories = {}
+        self._postings = {}
+        self.sorted_rows = {}
+        self.ranks = {}
+        # Row ids fit in int32 below 2**31 orders
+        self.row_dtype = row_dtype = "int32" if self.size < 2 ** 31 else "int64"
+
+        for col in CATEGORICAL_COLUMNS:
+            if col not in orders.columns:
+                continue
+            codes, categories = pd.factorize(orders[col], sort=True)
+            # Smallest signed type that still holds code + 1
+            codes = codes.astype(np.min_scalar_type(-(len(categories) + 1)))
+            # CSR posting lists; code -1 (missing) sits in the first bucket
+            rows = np.argsort(codes, kind="stable").astype(row_dtype)
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(codes + 1, minlength=len(categories) + 1))])
+            self.codes[col] = codes
+            self.categories[col] = list(categories)
+            self._postings[col] = (rows, offsets)
+
+        for col in NUMERIC_COLUMNS:
+            if col not in orders.columns:
+                continue
+            rows = np.argsort(self._values(col), kind="stable").astype(row_dtype)
+            ranks = np.empty(self.size, dtype=row_dtype)
+            ranks[rows] = np.arange(self.size, dtype=row_dtype)
+            self.sorted_rows[col] = rows
+            self.ranks[col] = ranks
+
+    @property
+    def nbytes(self):
+        """Memory held by the indexes (the orders frame is shared)."""
+        arrays = [*self.codes.values(), *self.sorted_rows.values(), *self.ranks.values()]
+        arrays += [a for pair in self._postings.values() for a in pair]
+        return int(sum(a.nbytes for a in arrays))
+
+    def _values(self, col):
+        # Zero-copy for numeric columns
+        return self.orders[col].to_numpy()
+
+    # -----------------------------
+    # Filtering
+    # -----------------------------
+    def _code(self, col, value):
+        categories = self.categories[col]
+        position = np.searchsorted(categories, value)
+        if position < len(categories) and categories[position] == value:
+            return int(position)
+        return None
+
+    def _value_span(self, col, low, high):
+        """Positions [start, stop) of the sorted permutation with low <= value <= high."""
+        start = 0 if low is None else self._bisect(col, low, right=False)
+        stop = self.size if high is None else self._bisect(col, high, right=True)
+        return start, max(start, stop)
+
+    def _bisect(self, col, value, right):
+        # Binary search through the permutation; no sorted copy of the column is kept
+        values, rows = self._values(col), self.sorted_rows[col]
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            probe = values[rows[mid]]
+            if probe < value or (right and probe == value):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def filter_rows(self, filters=None, ranges=None):
+        """
+        Row ids matching every filter, ascending.
+
+        `filters` maps categorical columns to a value; `ranges` maps numeric
+        columns to an inclusive (low, high) pair where either end may be None.
+        """
+        filters = {c: v for c, v in (filters or {}).items() if v is not None}
+        ranges = {c: r for c, r in (ranges or {}).items() if r is not None}
+
+        # (estimated size, kind, column, argument) for every filter
+        candidates = []
+        for col, value in filters.items():
+            code = self._code(col, value)
+            if code is None:
+                return np.empty(0, dtype=self.row_dtype)
+            _, offsets = self._postings[col]
+            candidates.append((offsets[code + 2] - offsets[code + 1], "category", col, code))
+        for col, (low, high) in ranges.items():
+            start, stop = self._value_span(col, low, high)
+            candidates.append((stop - start, "range", col, (start, stop)))
+
+        if not candidates:
+            return np.arange(self.size, dtype=self.row_dtype)
+
+        # Materialize the most selective filter, check the others on it
+        candidates.sort(key=lambda c: c[0])
+        _, kind, col, arg = candidates[0]
+        if kind == "category":
+            rows, offsets = self._postings[col]
+            selected = rows[offsets[arg + 1]:offsets[arg + 2]]
+        else:
+            selected = np.sort(self.sorted_rows[col][arg[0]:arg[1]])
+
+        for _, kind, col, arg in candidates[1:]:
+            if len(selected) == 0:
+                break
+            if kind == "category":
+                selected = selected[self.codes[col][selected] == arg]
+            else:
+                ranks = self.ranks[col][selected]
+                selected = selected[(ranks >= arg[0]) & (ranks < arg[1])]
+        return selected
+
+    # -----------------------------
+    # Sorting + paging
+    # -----------------------------
+    def page_rows(self, rows, sort_by=None, ascending=True, page=0, page_size=50):
+        """Row ids of one page of `rows`, ordered by `sort_by`."""
+        start = page * page_size
+        stop = min(start + page_size, len(rows))
+        if start >= stop:
+            return np.empty(0, dtype=self.row_dtype)
+        if sort_by is None:
+            return rows[start:stop]
+
+        if len(rows) == self.size:
+            # Unfiltered: the page is a slice of the sorted permutation
+            ordered = self.sorted_rows[sort_by]
+            if ascending:
+                return ordered[start:stop]
+            return ordered[::-1][start:stop]
+
+        keys = self.ranks[sort_by][rows]
+        if not ascending:
+            keys = -keys
+        # Partial sort: only the first `stop` keys need to be ordered
+        if stop < len(keys):
+            head = np.argpartition(keys, stop - 1)[:stop]
+        else:
+            head = np.arange(len(keys))
+        head = head[np.argsort(keys[head], kind="stable")]
+        return rows[head[start:stop]]
+
+    def query(self, filters=None, ranges=None, sort_by=None, ascending=True, page=0, page_size=50):
+        """One page of matching orders as a frame, plus the total match count."""
+        rows = self.filter_rows(filters, ranges)
+        page_ids = self.page_rows(rows, sort_by, ascending, page, page_size)
+        return self.orders.iloc[page_ids], len(rows)
+
+    def summary(self, rows):
+        """On-time / delayed counts and average delay / defect rate over `rows`."""
+        summary = {"orders": len(rows)}
+        if "order_status" in self.codes:
+            status = np.bincount(self.codes["order_status"][rows] + 1, minlength=len(self.categories["order_status"]) + 1)
+            for label in ["OnTime", "Delayed"]:
+                code = self._code("order_status", label)
+                summary[label] = int(status[code + 1]) if code is not None else 0
+        for col in ["delay_days", "defect_rate"]:
+            if col in self.sorted_rows:
+                summary[f"avg_{col}"] = float(np.nanmean(self._values(col)[rows])) if len(rows) else float("nan")
+        return summary
@@ -0,0 +1,333 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import threading
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from instrumentation import timed
+from progress import report_progress
+from storage import read_table, resolve_table_path
+
+# -----------------------------
+# Pipeline orchestrator
+# -----------------------------
+#   python src/pipeline.py            -> run every stage whose inputs changed
+#   python src/pipeline.py --force    -> run every stage
+#   python src/pipeline.py --dry-run  -> show what would run
+# Stages declare the files they read and write; a stage depends on every
+# stage that writes one of its inputs. Stages run in a thread pool as soon as
+# their dependencies are done, so a run takes as long as the longest path
+# through the DAG rather than the sum of the stages. A stage is skipped when
+# the content hashes of its inputs match its last successful run and all of
+# its outputs exist. The orders table is read once, on first use, and the
+# same frame is handed to every stage that needs it (stages do not modify it).
+
+ORDERS_PATH = "dataset/orders.csv"
+STATE_PATH = "dataset/pipeline_state.json"
+LOG_PATH = "logs/pipeline_log.csv"
+LOG_COLUMNS = ["timestamp", "stage", "status", "duration_sec"]
+
+PIPELINE_WORKERS = int(os.environ.get("APIS_PIPELINE_WORKERS", "4"))
+HASH_BLOCK_SIZE = 1 << 20
+
+# Columns added by `enrich_orders.py enrich`; orders without them are enriched first
+ENRICHED_COLUMNS = ["item_category", "shipping_mode", "payment_terms", "order_priority", "region", "price_change_percent"]
+
+Stage = namedtuple("Stage", ["name", "inputs", "outputs", "run"])
+
+
+class SharedOrders:
+    """The orders table, read on first use and shared by every stage."""
+
+    def __init__(self, path=ORDERS_PATH):
+        self.path = path
+        self._frame = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._frame is None:
+                self._frame = read_table(self.path)
+            return self._frame
+
+
+# -----------------------------
+# Stages
+# -----------------------------
+# Stage modules are imported when the stage runs, so skipped stages never
+# pay for sklearn & co.
+def _run_supplier_features(orders):
+    import supplier_store
+    supplier_store.sync(orders=orders.get())
+
+
+def _run_risk_score(orders):
+    # retrain_risk_model.py writes the same report from the supplier store;
+    # the order-level score is the one the Retrain page schedules
+    import risk_score
+    risk_score.main(orders=orders.get())
+
+
+def _run_anomaly_detection(orders):
+    import anomaly_detection
+    anomaly_detection.fit(orders=orders.get())
+
+
+def _run_supplier_clustering(orders):
+    import supplier_clustering
+    supplier_clustering.cluster_suppliers()
+
+
+def _run_retrain_model(orders):
+    import retrain_model
+    model_name, f1 = retrain_model.train_and_save_model(orders=orders.get())
+    print(f"✅ Retraining done! Best Model: {model_name} | Best F1: {f1:.4f}")
+
+
+def _run_final_report(orders):
+    import generate_final_report
+    generate_final_report.main(orders=orders.get())
+
+
+STAGES = [
+    Stage("supplier_features", [ORDERS_PATH],
+          ["dataset/supplier_aggregates.csv"], _run_supplier_features),
+    Stage("risk_score", [ORDERS_PATH],
+          ["dataset/supplier_risk_report.csv"], _run_risk_score),
+    Stage("anomaly_detection", [ORDERS_PATH],
+          ["dataset/anomaly_report.csv", "models/anomaly_model.pkl"], _run_anomaly_detection),
+    Stage("supplier_clustering", ["dataset/supplier_aggregates.csv"],
+          ["dataset/supplier_clusters.csv"], _run_supplier_clustering),
+    Stage("retrain_model", [ORDERS_PATH, "dataset/supplier_aggregates.csv"],
+          ["models/registry/LATEST", "reports/model_comparison.csv"], _run_retrain_model),
+    Stage("generate_final_report",
+          [ORDERS_PATH, "dataset/anomaly_report.csv", "dataset/supplier_risk_report.csv", "dataset/supplier_clusters.csv"],
+          ["reports/final_procurement_summary.csv", "dataset/kpi_snapshot.json"], _run_final_report),
+]
+
+
+def dependencies(stages=STAGES):
+    """Stage name -> names of the stages writing one of its inputs."""
+    writers = {}
+    for stage in stages:
+        for path in stage.outputs:
+            writers.setdefault(path, []).append(stage.name)
+    return {
+        stage.name: sorted({w for path in stage.inputs for w in writers.get(path, []) if w != stage.name})
+        for stage in stages
+    }
+
+
+def _check_acyclic(deps):
+    visiting, done = set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Pipeline stages form a cycle through '{name}'")
+        visiting.add(name)
+        for dep in deps[name]:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in deps:
+        visit(name)
+
+
+# -----------------------------
+# Input hashes and run state
+# -----------------------------
+def _resolve(path):
+    # Tables may be stored as CSV or a columnar sibling; hash the copy read
+    return resolve_table_path(path) if path.endswith(".csv") else (path if os.path.exists(path) else None)
+
+
+def content_hash(path, cache=None):
+    """
+    SHA-1 of a file's bytes. `cache` maps path -> [size, mtime_ns, digest]
+    so files that were not touched since the last run are not re-read.
+    """
+    stat = os.stat(path)
+    cached = (cache or {}).get(path)
+    if cached and cached[:2] == [stat.st_size, stat.st_mtime_ns]:
+        return cached[2]
+
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    if cache is not None:
+        cache[path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+    return digest.hexdigest()
+
+
+def input_hashes(stage, hash_cache):
+    hashes = {}
+    for path in stage.inputs:
+        resolved = _resolve(path)
+        hashes[path] = None if resolved is None else f"{resolved}:{content_hash(resolved, hash_cache)}"
+    return hashes
+
+
+def _outputs_exist(stage):
+    return all(_resolve(path) is not None for path in stage.outputs)
+
+
+def _load_state(path=STATE_PATH):
+    if not os.path.exists(path):
+        return {"stages": {}, "hashes": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_state(state, path=STATE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _log(rows, path=LOG_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    is_new = not os.path.exists(path)
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=LOG_COLUMNS)
+        if is_new:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def ensure_enriched(orders_path=ORDERS_PATH):
+    """Run `enrich_orders.py enrich` once on a CSV that lacks the industry columns."""
+    import order_log
+
+    resolved = resolve_table_path(orders_path)
+    if resolved is None or not resolved.endswith(".csv"):
+        return False
+    if all(col in order_log.read_header(resolved) for col in ENRICHED_COLUMNS):
+        return False
+    from enrich_orders import enrich
+    enrich(resolved)
+    return True
+
+
+# -----------------------------
+# Scheduler
+# -----------------------------
+def _timed(stage, orders):
+    started = time.perf_counter()
+    stage.run(orders)
+    return time.perf_counter() - started
+
+
+@timed("pipeline.run")
+def run_pipeline(stages=STAGES, force=False, workers=PIPELINE_WORKERS, dry_run=False, state_path=STATE_PATH):
+    """
+    Run the stages in dependency order, independent ones concurrently.
+
+    Returns {stage name: status} with status one of "succeeded", "skipped",
+    "failed" or "blocked" (a dependency failed). With `dry_run` nothing is
+    executed and every stage that would run is reported as "pending".
+    """
+    deps = dependencies(stages)
+    _check_acyclic(deps)
+    by_name = {stage.name: stage for stage in stages}
+
+    if not dry_run and ensure_enriched():
+        print("✅ orders.csv enriched with the industry-level columns")
+
+    state = _load_state(state_path)
+    orders = SharedOrders()
+    status, durations, log_rows = {}, {}, []
+    pending = [stage.name for stage in stages]
+    running = {}
+    run_started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="apis-pipeline") as pool:
+        while pending or running:
+            progressed = True
+            while progressed:
+                progressed = False
+                for name in list(pending):
+                    dep_status = [status.get(dep) for dep in deps[name]]
+                    if any(s in ("failed", "blocked") for s in dep_status):
+                        status[name] = "blocked"
+                    elif all(s in ("succeeded", "skipped", "pending") for s in dep_status):
+                        stage = by_name[name]
+                        hashes = input_hashes(stage, state["hashes"])
+                        last = state["stages"].get(name, {})
+                        # An upstream stage that reruns may still write identical
+                        # bytes, so only the hashes decide (a dry run cannot know)
+                        upstream_pending = "pending" in dep_status
+                        if not force and not upstream_pending and last.get("inputs") == hashes and _outputs_exist(stage):
+                            status[name] = "skipped"
+                            print(f"⏭️ {name}: inputs unchanged, skipped")
+                        elif dry_run:
+                            status[name] = "pending"
+                            print(f"▶️ {name}: would run")
+                        else:
+                            print(f"▶️ {name}: started")
+                            running[pool.submit(_timed, stage, orders)] = (name, hashes)
+                            status[name] = "running"
+                    else:
+                        continue
+                    pending.remove(name)
+                    progressed = True
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, hashes = running.pop(future)
+                try:
+                    durations[name] = future.result()
+                except Exception as e:
+                    status[name] = "failed"
+                    traceback.print_exception(type(e), e, e.__traceback__)
+                    print(f"❌ {name}: failed ({e})")
+                    log_rows.append({"stage": name, "status": "failed", "duration_sec": ""})
+                    continue
+                status[name] = "succeeded"
+                # Record the hashes seen before the run: if an input changed
+                # while the stage ran, the next run picks it up again
+                state["stages"][name] = {
+                    "inputs": hashes,
+                    "finished_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "duration_sec": round(durations[name], 2)
+                }
+                _save_state(state, state_path)
+                print(f"✅ {name}: done in {durations[name]:.1f}s")
+                log_rows.append({"stage": name, "status": "succeeded", "duration_sec": round(durations[name], 2)})
+                finished = sum(s in ("succeeded", "skipped", "failed", "blocked") for s in status.values())
+                report_progress(f"Finished {name}", finished / len(stages))
+
+    if not dry_run:
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        _log([{"timestamp": timestamp, **row} for row in log_rows])
+        _save_state(state, state_path)
+        wall = time.perf_counter() - run_started
+        print(f"⏱️ Pipeline wall time {wall:.1f}s (stages total {sum(durations.values()):.1f}s)")
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the APIS pipeline stages whose inputs changed.")
+    parser.add_argument("--force", action="store_true", help="run every stage, even if its inputs are unchanged")
+    parser.add_argument("--workers", type=int, default=PIPELINE_WORKERS)
+    parser.add_argument("--dry-run", action="store_true", help="only show which stages would run")
+    args = parser.parse_args()
+
+    result = run_pipeline(force=args.force, workers=args.workers, dry_run=args.dry_run)
+    failed = [name for name, s in result.items() if s in ("failed", "blocked")]
+    if failed:
+        raise SystemExit(f"❌ Pipeline failed: {', '.join(failed)}")
+    print("✅ Pipeline complete!")
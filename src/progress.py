@@ -0,0 +1,35 @@
+import json
+import os
+import time
+
+# Set by the job runner for the worker process; unset when a stage is run by hand
+PROGRESS_ENV = "APIS_PROGRESS_FILE"
+
+
+def report_progress(stage, fraction):
+    """
+    Record that a pipeline script reached `stage` (`fraction` in 0..1).
+
+    A no-op unless the script was launched by the job runner.
+    """
+    path = os.environ.get(PROGRESS_ENV)
+    if not path:
+        return
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"stage": stage, "progress": round(float(fraction), 4), "time": time.time()}) + "\n")
+
+
+def read_progress(path):
+    """Return the latest {"stage", "progress", "time"} record, or None."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 4096))
+        lines = f.read().decode("utf-8", errors="ignore").strip().splitlines()
+    for line in reversed(lines):
+        try:
+            return json.loads(line)
+        except ValueError:
+            continue
+    return None
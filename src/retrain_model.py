@@ -1,106 +1,111 @@
+import argparse
+import numpy as np
 import pandas as pd
 import os
-import joblib
 from datetime import datetime
 
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
-from sklearn.preprocessing import OneHotEncoder
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
 
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.linear_model import LogisticRegression
-
-
-def train_and_save_model():
-    df = pd.read_csv("dataset/orders.csv")
+from feature_cache import design_matrix
+from instrumentation import add_rows, timed
+from model_comparison import candidate_models, compare_models
+from model_registry import full_training_metadata, publish
+from model_search import SEARCH_RESULTS_PATH, load_search_space, successive_halving, tuned_models
+from progress import report_progress
+from storage import read_table
+from supplier_features import add_supplier_history
+from supplier_store import load_supplier_features
+
+
+TRAINING_COLUMNS = [
+    "supplier_id", "order_status", "delay_days", "quantity", "unit_price", "defect_rate",
+    "item_category", "shipping_mode", "payment_terms", "order_priority", "region",
+    "price_change_percent"
+]
+
+
+def training_frame(orders=None):
+    """Training rows: order columns, target and supplier history features, in file order."""
+    report_progress("Loading orders", 0.05)
+    if orders is None:
+        df = read_table("dataset/orders.csv", columns=TRAINING_COLUMNS)
+    else:
+        df = orders[TRAINING_COLUMNS].copy()
+    add_rows(len(df))
 
     # Target: Delayed=1, OnTime=0
-    df["target"] = df["order_status"].apply(lambda x: 1 if x == "Delayed" else 0)
+    df["target"] = (df["order_status"] == "Delayed").astype(int)
 
     # Supplier history features
-    supplier_stats = df.groupby("supplier_id").agg(
-        supplier_avg_delay_days=("delay_days", "mean"),
-        supplier_avg_defect_rate=("defect_rate", "mean"),
-        supplier_on_time_rate=("order_status", lambda x: (x == "OnTime").mean())
-    ).reset_index()
-
-    df = df.merge(supplier_stats, on="supplier_id", how="left")
-
-    features = [
-        "quantity",
-        "unit_price",
-        "defect_rate",
-        "item_category",
-        "shipping_mode",
-        "payment_terms",
-        "order_priority",
-        "region",
-        "price_change_percent",
-        "supplier_avg_delay_days",
-        "supplier_avg_defect_rate",
-        "supplier_on_time_rate"
-    ]
+    report_progress("Building supplier history features", 0.2)
+    return add_supplier_history(df, load_supplier_features())
 
-    X = df[features]
-    y = df["target"]
 
-    categorical_cols = ["item_category", "shipping_mode", "payment_terms", "order_priority", "region"]
-    numeric_cols = [c for c in features if c not in categorical_cols]
+@timed("stage.retrain_model")
+def train_and_save_model(n_workers=None, orders=None, search=False, space=None, n_candidates=None):
+    # `orders`: the loaded orders table, if the caller already has it
+    # `search`: tune each model family by successive halving before the comparison
+    df = training_frame(orders)
 
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_cols),
-            ("num", "passthrough", numeric_cols)
-        ]
-    )
+    # Encoded rows come from the feature cache; only appended orders are encoded
+    report_progress("Encoding features", 0.3)
+    X, y, preprocessor, cache_status = design_matrix(df)
+    print(f"Feature cache: {cache_status}")
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
+    # Split row positions, so the split matches splitting the frame itself
+    train_rows, test_rows = train_test_split(
+        np.arange(len(y)), test_size=0.2, random_state=42, stratify=y
     )
 
-    models = {
-        "LogisticRegression": LogisticRegression(max_iter=2000),
-        "RandomForest": RandomForestClassifier(n_estimators=200, random_state=42)
-    }
-
-    best_model_name = None
-    best_f1 = -1
-    best_pipeline = None
-    results = []
-
-    for name, model in models.items():
-        pipeline = Pipeline(steps=[
-            ("preprocess", preprocessor),
-            ("model", model)
-        ])
-
-        pipeline.fit(X_train, y_train)
-        y_pred = pipeline.predict(X_test)
-
-        acc = accuracy_score(y_test, y_pred)
-        prec = precision_score(y_test, y_pred, zero_division=0)
-        rec = recall_score(y_test, y_pred, zero_division=0)
-        f1 = f1_score(y_test, y_pred, zero_division=0)
-
-        results.append({
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    models = candidate_models()
+    try:
+        if search:
+            # Searched on the training split only; the test split still decides the winner
+            search_kwargs = {"space": load_search_space(space)}
+            if n_candidates:
+                search_kwargs["n_candidates"] = n_candidates
+            best_params, trials = successive_halving(X, train_rows, **search_kwargs)
+            models = tuned_models(best_params)
+
+            os.makedirs("reports", exist_ok=True)
+            trials_df = pd.DataFrame(trials)
+            trials_df.insert(0, "timestamp", timestamp)
+            trials_df.to_csv(SEARCH_RESULTS_PATH, index=False)
+
+        # Candidates are fitted concurrently (APIS_TRAIN_WORKERS / n_workers)
+        report_progress("Training candidate models", 0.75 if search else 0.35)
+        fitted, best_model_name, best_f1, best_pipeline = compare_models(
+            models, preprocessor, X, train_rows, test_rows, n_workers=n_workers
+        )
+    finally:
+        X.close()
+
+    results = [
+        {
+            "timestamp": timestamp,
             "model_name": name,
-            "accuracy": round(acc, 4),
-            "precision": round(prec, 4),
-            "recall": round(rec, 4),
-            "f1_score": round(f1, 4)
-        })
-
-        if f1 > best_f1:
-            best_f1 = f1
-            best_model_name = name
-            best_pipeline = pipeline
+            "accuracy": round(metrics["accuracy"], 4),
+            "precision": round(metrics["precision"], 4),
+            "recall": round(metrics["recall"], 4),
+            "f1_score": round(metrics["f1_score"], 4)
+        }
+        for name, metrics in fitted
+    ]
 
-    # Save best model
-    os.makedirs("models", exist_ok=True)
-    joblib.dump(best_pipeline, "models/model.pkl")
+    # Publish best model as a new registry version (atomic, keeps last N)
+    report_progress("Saving best model and reports", 0.9)
+    best_metrics = dict(fitted)[best_model_name]
+    publish(best_pipeline, {
+        "model_name": best_model_name,
+        "accuracy": round(best_metrics["accuracy"], 4),
+        "precision": round(best_metrics["precision"], 4),
+        "recall": round(best_metrics["recall"], 4),
+        "f1_score": round(best_metrics["f1_score"], 4),
+        "training_rows": len(train_rows),
+        # Orders covered so far; incremental updates (model_update.py) learn from the rest
+        **full_training_metadata(len(y))
+    })
 
     # Save model comparison report
     os.makedirs("reports", exist_ok=True)
@@ -123,5 +128,11 @@ def train_and_save_model():
 
 
 if __name__ == "__main__":
-    model_name, f1 = train_and_save_model()
+    parser = argparse.ArgumentParser(description="Retrain the delay prediction model.")
+    parser.add_argument("--search", action="store_true", help="tune hyperparameters (successive halving) first")
+    parser.add_argument("--space", default=os.environ.get("APIS_SEARCH_SPACE"), help="JSON search space file")
+    parser.add_argument("--candidates", type=int, help="configurations to sample (default APIS_SEARCH_CANDIDATES)")
+    args = parser.parse_args()
+
+    model_name, f1 = train_and_save_model(search=args.search, space=args.space, n_candidates=args.candidates)
     print(f"✅ Retraining done! Best Model: {model_name} | Best F1: {f1:.4f}")
@@ -2,47 +2,32 @@ import os
 import pandas as pd
 from datetime import datetime
 
+from instrumentation import add_rows, timed
+from risk_engine import risk_category, supplier_risk_scores
+from storage import write_table
+from supplier_store import load_supplier_features
 
-def retrain_risk_model():
-    # Load data
-    orders = pd.read_csv("dataset/orders.csv")
 
-    # Basic supplier performance metrics
-    supplier_stats = orders.groupby("supplier_id").agg(
-        total_orders=("order_id", "count"),
-        avg_defect_rate=("defect_rate", "mean"),
-        avg_delay_days=("delay_days", "mean"),
-        on_time_rate=("order_status", lambda x: (x == "OnTime").mean())
-    ).reset_index()
+@timed("stage.retrain_risk_model")
+def retrain_risk_model():
+    # Basic supplier performance metrics (incrementally maintained store)
+    supplier_stats = load_supplier_features()[
+        ["supplier_id", "total_orders", "avg_defect_rate", "avg_delay_days", "on_time_rate"]
+    ].copy()
+    add_rows(len(supplier_stats))
 
     # -----------------------------
     # Risk Score Calculation (0-100)
     # -----------------------------
-    # Higher delay + higher defects + lower on-time => higher risk
-
-    supplier_stats["risk_score"] = (
-        (supplier_stats["avg_defect_rate"] * 400) +
-        (supplier_stats["avg_delay_days"] * 3) +
-        ((1 - supplier_stats["on_time_rate"]) * 50)
-    )
-
-    # Clamp risk_score between 0 and 100
-    supplier_stats["risk_score"] = supplier_stats["risk_score"].clip(0, 100).round(2)
+    # Higher delay + higher defects + lower on-time => higher risk (clamped 0-100)
+    supplier_stats["risk_score"] = supplier_risk_scores(supplier_stats).round(2)
 
     # Add risk category
-    def risk_category(score):
-        if score >= 70:
-            return "High"
-        elif score >= 40:
-            return "Medium"
-        return "Low"
-
-    supplier_stats["risk_category"] = supplier_stats["risk_score"].apply(risk_category)
+    supplier_stats["risk_category"] = risk_category(supplier_stats["risk_score"])
 
     # Save report
-    os.makedirs("dataset", exist_ok=True)
     out_path = "dataset/supplier_risk_report.csv"
-    supplier_stats.to_csv(out_path, index=False)
+    write_table(supplier_stats, out_path, keep_csv=True)
 
     # -----------------------------
     # Logging
@@ -0,0 +1,104 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import add_rows
+from storage import iter_table
+
+# -----------------------------
+# Single source of truth for order and supplier risk scores
+# -----------------------------
+# Scores are 0-100 and computed with array arithmetic only; bands use
+# np.select. Weights can be overridden per call.
+
+# Order risk: delay + defects + price spikes + priority
+ORDER_WEIGHTS = {
+    "delay_days": 18,
+    "defect_rate": 250,            # defect_rate * 100 * 2.5
+    "price_change_percent": 1.2,   # applied to |price change|
+    "priority_weight": 0.6
+}
+PRIORITY_WEIGHTS = {"Low": 5, "Medium": 10, "High": 20}
+DEFAULT_PRIORITY_WEIGHT = 10
+
+# Supplier risk: higher delay + higher defects + lower on-time => higher risk
+SUPPLIER_WEIGHTS = {
+    "avg_defect_rate": 400,
+    "avg_delay_days": 3,
+    "late_rate": 50                # (1 - on_time_rate)
+}
+
+# (lower bound, label), highest first
+RISK_BANDS = [(70, "High"), (40, "Medium")]
+DEFAULT_BAND = "Low"
+
+ORDER_RISK_COLUMNS = ["supplier_id", "delay_days", "defect_rate", "price_change_percent", "order_priority"]
+CHUNK_SIZE = int(os.environ.get("APIS_RISK_CHUNK_SIZE", "500000"))
+
+
+def priority_weights(priority, weights=PRIORITY_WEIGHTS, default=DEFAULT_PRIORITY_WEIGHT):
+    """Map order_priority labels to numeric weights (unknown -> default)."""
+    # Unknown labels get position -1, which indexes the trailing default
+    codes = pd.Index(list(weights)).get_indexer(np.asarray(priority, dtype=object))
+    lookup = np.append(np.asarray(list(weights.values()), dtype="float64"), default)
+    return lookup[codes]
+
+
+def order_risk_scores(orders, weights=None):
+    """Per-order risk score (0-100) as a float array."""
+    w = {**ORDER_WEIGHTS, **(weights or {})}
+    score = (
+        orders["delay_days"].to_numpy(dtype="float64") * w["delay_days"]
+        + orders["defect_rate"].to_numpy(dtype="float64") * w["defect_rate"]
+        + np.abs(orders["price_change_percent"].to_numpy(dtype="float64")) * w["price_change_percent"]
+        + priority_weights(orders["order_priority"]) * w["priority_weight"]
+    )
+    return np.clip(score, 0, 100)
+
+
+def supplier_risk_scores(features, weights=None):
+    """Per-supplier risk score (0-100) from avg_defect_rate, avg_delay_days and on_time_rate."""
+    w = {**SUPPLIER_WEIGHTS, **(weights or {})}
+    score = (
+        features["avg_defect_rate"].to_numpy(dtype="float64") * w["avg_defect_rate"]
+        + features["avg_delay_days"].to_numpy(dtype="float64") * w["avg_delay_days"]
+        + (1 - features["on_time_rate"].to_numpy(dtype="float64")) * w["late_rate"]
+    )
+    return np.clip(score, 0, 100)
+
+
+def risk_category(scores, bands=RISK_BANDS, default=DEFAULT_BAND):
+    """Band scores into High / Medium / Low."""
+    scores = np.asarray(scores, dtype="float64")
+    return np.select(
+        [scores >= lower for lower, _ in bands],
+        [label for _, label in bands],
+        default=default
+    )
+
+
+def supplier_order_risk(orders_path="dataset/orders.csv", weights=None, chunksize=CHUNK_SIZE, orders=None):
+    """
+    Mean order risk score per supplier, streamed over the orders table in
+    chunks so files larger than memory can be scored. An already loaded
+    `orders` frame is scored as one chunk instead.
+    """
+    if orders is not None:
+        chunks = [orders[ORDER_RISK_COLUMNS]]
+    else:
+        chunks = iter_table(orders_path, columns=ORDER_RISK_COLUMNS, chunksize=chunksize)
+
+    sums = None
+    for chunk in chunks:
+        scores = pd.Series(order_risk_scores(chunk, weights), index=chunk.index)
+        partial = scores.groupby(chunk["supplier_id"], observed=True).agg(["sum", "count"])
+        add_rows(len(chunk))
+        sums = partial if sums is None else sums.add(partial, fill_value=0)
+
+    if sums is None:
+        return pd.DataFrame(columns=["supplier_id", "risk_score"])
+
+    supplier_risk = (sums["sum"] / sums["count"]).rename("risk_score")
+    supplier_risk.index.name = "supplier_id"
+    return supplier_risk.reset_index()
@@ -1,32 +1,29 @@
-import pandas as pd
-import os
+from instrumentation import timed
+from progress import report_progress
+from risk_engine import supplier_order_risk
+from storage import write_table
 
-df = pd.read_csv("dataset/orders.csv")
 
-# Convert priority into numeric weight
-priority_weight = {"Low": 5, "Medium": 10, "High": 20}
-df["priority_weight"] = df["order_priority"].map(priority_weight)
+@timed("stage.risk_score")
+def main(orders=None):
+    # Order risk formula (delay + defects + price spikes + priority) lives in
+    # risk_engine; orders are streamed in chunks so any history size fits
+    # (or scored in one pass when the caller already loaded them)
+    report_progress("Scoring orders", 0.1)
+    supplier_risk = supplier_order_risk("dataset/orders.csv", orders=orders)
 
-# Risk score formula (improved)
-# Delay + defects + price spikes + priority
-df["risk_score"] = (
-    (df["delay_days"] * 18) +
-    (df["defect_rate"] * 100 * 2.5) +
-    (df["price_change_percent"].abs() * 1.2) +
-    (df["priority_weight"] * 0.6)
-)
+    # Supplier-wise risk report
+    report_progress("Ranking suppliers", 0.7)
+    supplier_risk = supplier_risk.sort_values("risk_score", ascending=False)
 
-# Clip between 0 and 100
-df["risk_score"] = df["risk_score"].clip(0, 100)
+    print("\n📌 Supplier Risk Ranking:\n")
+    print(supplier_risk)
 
-# Supplier-wise risk report
-supplier_risk = df.groupby("supplier_id")["risk_score"].mean().reset_index()
-supplier_risk = supplier_risk.sort_values("risk_score", ascending=False)
+    # Save report
+    report_progress("Saving risk report", 0.9)
+    write_table(supplier_risk, "dataset/supplier_risk_report.csv", keep_csv=True)
+    print("\n✅ Saved: dataset/supplier_risk_report.csv")
 
-print("\n📌 Supplier Risk Ranking:\n")
-print(supplier_risk)
 
-# Save report
-os.makedirs("dataset", exist_ok=True)
-supplier_risk.to_csv("dataset/supplier_risk_report.csv", index=False)
-print("\n✅ Saved: dataset/supplier_risk_report.csv")
+if __name__ == "__main__":
+    main()
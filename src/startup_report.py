@@ -0,0 +1,85 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# -----------------------------
+# App cold-start import report
+# -----------------------------
+#   python src/startup_report.py                 -> what a fresh app process imports
+#   python src/startup_report.py --top 30 batch_predict
+# Each target is imported in a fresh interpreter under `python -X importtime`;
+# the report sums the time spent in each top-level package's own modules
+# (pandas, pyarrow, streamlit, ...) and flags heavy packages that should
+# only load on demand.
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What the app imports before any page renders: Streamlit, the shared theme
+# and the cached loaders
+DEFAULT_TARGETS = ["streamlit", "app.theme", "app.utils"]
+
+# Only needed once a prediction / retrain / export is requested
+ON_DEMAND_PACKAGES = ["sklearn", "joblib", "scipy", "matplotlib"]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_costs(statement):
+    """
+    Run `statement` in a fresh interpreter and return [(module, self_us,
+    cumulative_us, depth)] in the order the imports finished.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([REPO_ROOT, os.path.join(REPO_ROOT, "src")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"`{statement}` failed:\n{proc.stderr[-2000:]}")
+
+    costs = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            costs.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return costs
+
+
+def package_costs(costs):
+    """Import time (seconds) spent in each top-level package's own modules, largest first."""
+    totals = {}
+    for module, self_us, _, _ in costs:
+        package = module.split(".")[0]
+        totals[package] = totals.get(package, 0) + self_us / 1e6
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def startup_report(targets=DEFAULT_TARGETS):
+    """Per-package import cost of importing `targets` (in order) in one fresh process."""
+    costs = import_costs("; ".join(f"import {t}" for t in targets))
+    loaded = {module.split(".")[0] for module, *_ in costs}
+    return {
+        "total_sec": sum(c[2] for c in costs if c[3] == 0) / 1e6,
+        "packages": package_costs(costs),
+        "on_demand_loaded": [p for p in ON_DEMAND_PACKAGES if p in loaded],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report the import cost of an app cold start.")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS, help="modules to import (in order)")
+    parser.add_argument("--top", type=int, default=15, help="packages to list")
+    args = parser.parse_args()
+
+    report = startup_report(args.targets)
+    print(f"⏱️ Cold import of {', '.join(args.targets)}: {report['total_sec']:.2f}s\n")
+    for package, seconds in report["packages"][:args.top]:
+        print(f"  {package:<28} {seconds * 1000:8.1f} ms")
+
+    if report["on_demand_loaded"]:
+        print(f"\n⚠️ Loaded at startup but only needed on demand: {', '.join(report['on_demand_loaded'])}")
+        sys.exit(1)
+    print("\n✅ No on-demand packages (sklearn, joblib, ...) loaded at startup")
@@ -0,0 +1,250 @@
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (backs both Parquet and Feather)
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# -----------------------------
+# Storage backend for the dataset/ tables
+# -----------------------------
+# Every table is addressed by its CSV path (e.g. "dataset/orders.csv").
+# With APIS_STORAGE_FORMAT=parquet|feather the writers also store a
+# columnar sibling (dataset/orders.parquet) and the readers pick whichever
+# copy was written last, so stages can be switched over one at a time.
+# Without pyarrow everything silently stays on CSV.
+STORAGE_FORMAT = os.environ.get("APIS_STORAGE_FORMAT", "csv").lower()
+
+COLUMNAR_SUFFIXES = {"parquet": ".parquet", "feather": ".feather"}
+
+# Canonical (compact) orders schema: low-cardinality text as categoricals,
+# integers downcast. Floats stay float64 so thresholds such as
+# defect_rate >= 0.06 compare exactly as they do on the CSV text.
+ORDER_DTYPES = {
+    "order_id": str,
+    "supplier_id": "category",
+    "quantity": "int32",
+    "unit_price": "float64",
+    "defect_rate": "float64",
+    "delay_days": "int32",
+    "order_status": "category",
+    "item_category": "category",
+    "shipping_mode": "category",
+    "payment_terms": "category",
+    "order_priority": "category",
+    "region": "category",
+    "price_change_percent": "float64",
+}
+ORDER_DATE_COLS = ["order_date", "expected_delivery_date", "actual_delivery_date"]
+
+# Explicit dtypes per table (keyed by file stem); unknown tables are inferred
+SCHEMAS = {
+    "orders": {
+        "dtypes": ORDER_DTYPES,
+        "dates": ORDER_DATE_COLS,
+    },
+    "anomaly_report": {
+        "dtypes": {**ORDER_DTYPES, "anomaly_flag": "int8", "anomaly_score": "float64"},
+        "dates": ORDER_DATE_COLS,
+    },
+}
+
+
+def _stem(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _base(path):
+    return os.path.splitext(path)[0]
+
+
+def _format_of(path):
+    suffix = os.path.splitext(path)[1].lower()
+    for fmt, fmt_suffix in COLUMNAR_SUFFIXES.items():
+        if suffix == fmt_suffix:
+            return fmt
+    return "csv"
+
+
+def resolve_table_path(path):
+    """Return the freshest existing copy of a table (CSV or columnar), or None."""
+    candidates = [_base(path) + ".csv"]
+    if HAS_PYARROW:
+        candidates += [_base(path) + suffix for suffix in COLUMNAR_SUFFIXES.values()]
+
+    existing = [p for p in candidates if os.path.exists(p)]
+    if not existing:
+        return None
+    return max(existing, key=lambda p: os.stat(p).st_mtime_ns)
+
+
+def table_exists(path):
+    return resolve_table_path(path) is not None
+
+
+def _apply_schema(df, schema):
+    # str columns are already text; astype(str) would turn NaN into "nan"
+    dtypes = {
+        c: t for c, t in schema["dtypes"].items()
+        if c in df.columns and t is not str and df[c].dtype != t
+    }
+    if dtypes:
+        df = df.astype(dtypes)
+    for col in schema["dates"]:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    return df
+
+
+def _typed(df, path):
+    """Columnar copies written by older code (or other tools) get the schema too."""
+    schema = SCHEMAS.get(_stem(path))
+    return _apply_schema(df, schema) if schema is not None else df
+
+
+def _csv_schema(path, columns):
+    """Explicit CSV dtypes and date columns for the projected columns."""
+    schema = SCHEMAS.get(_stem(path))
+    if schema is None:
+        return None, []
+    wanted = set(columns) if columns is not None else None
+    dtypes = {c: t for c, t in schema["dtypes"].items() if wanted is None or c in wanted}
+    dates = [c for c in schema["dates"] if wanted is None or c in wanted]
+    return dtypes, dates
+
+
+def _parse_dates(df, dates):
+    for col in dates:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    return df
+
+
+def read_table(path, columns=None):
+    """
+    Read a dataset table, decoding only `columns` when given.
+
+    `path` may point at the CSV name or directly at a columnar copy.
+    """
+    resolved = path if os.path.exists(path) and _format_of(path) != "csv" else resolve_table_path(path)
+    if resolved is None:
+        raise FileNotFoundError(f"{path} not found")
+
+    fmt = _format_of(resolved)
+    if fmt == "parquet":
+        return _typed(pd.read_parquet(resolved, columns=columns), resolved)
+    if fmt == "feather":
+        return _typed(pd.read_feather(resolved, columns=columns), resolved)
+
+    dtypes, dates = _csv_schema(resolved, columns)
+    return _parse_dates(pd.read_csv(resolved, usecols=columns, dtype=dtypes), dates)
+
+
+def write_table(df, path, fmt=None, keep_csv=False):
+    """
+    Write a dataset table in `fmt` (default: APIS_STORAGE_FORMAT).
+
+    User-facing reports pass keep_csv=True so the CSV download stays current
+    alongside the columnar copy. Returns the path of the primary file.
+    """
+    fmt = (fmt or STORAGE_FORMAT).lower()
+    if fmt not in COLUMNAR_SUFFIXES or not HAS_PYARROW:
+        fmt = "csv"
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    csv_path = _base(path) + ".csv"
+
+    if fmt == "csv":
+        df.to_csv(csv_path, index=False)
+        return csv_path
+
+    schema = SCHEMAS.get(_stem(path))
+    typed = _apply_schema(df, schema) if schema is not None else df
+
+    out_path = _base(path) + COLUMNAR_SUFFIXES[fmt]
+    if keep_csv:
+        df.to_csv(csv_path, index=False)
+    if fmt == "parquet":
+        typed.to_parquet(out_path, index=False)
+    else:
+        typed.reset_index(drop=True).to_feather(out_path)
+    return out_path
+
+
+def iter_table(path, columns=None, chunksize=100_000):
+    """
+    Yield a dataset table as frames of up to `chunksize` rows, so callers can
+    process tables larger than memory. Same dtypes as read_table().
+    """
+    resolved = path if os.path.exists(path) and _format_of(path) != "csv" else resolve_table_path(path)
+    if resolved is None:
+        raise FileNotFoundError(f"{path} not found")
+
+    fmt = _format_of(resolved)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(resolved).iter_batches(batch_size=chunksize, columns=columns):
+            yield _typed(batch.to_pandas(), resolved)
+        return
+    if fmt == "feather":
+        import pyarrow.ipc as ipc
+        with ipc.open_file(resolved) as reader:
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if columns is not None:
+                    batch = batch.select(columns)
+                yield _typed(batch.to_pandas(), resolved)
+        return
+
+    dtypes, dates = _csv_schema(resolved, columns)
+    for chunk in pd.read_csv(resolved, usecols=columns, dtype=dtypes, chunksize=chunksize):
+        yield _parse_dates(chunk, dates)
+
+
+def memory_report(path, nrows=None):
+    """
+    In-memory bytes per column of a table read with inferred dtypes
+    ("before") vs the canonical schema ("after"), as a frame with a total row.
+    """
+    resolved = path if os.path.exists(path) and _format_of(path) != "csv" else resolve_table_path(path)
+    if resolved is None:
+        raise FileNotFoundError(f"{path} not found")
+
+    fmt = _format_of(resolved)
+    if fmt == "csv":
+        before = pd.read_csv(resolved, nrows=nrows)
+        dtypes, dates = _csv_schema(resolved, None)
+        after = _parse_dates(pd.read_csv(resolved, nrows=nrows, dtype=dtypes), dates)
+    else:
+        before = pd.read_parquet(resolved) if fmt == "parquet" else pd.read_feather(resolved)
+        if nrows is not None:
+            before = before.head(nrows)
+        after = _typed(before, resolved)
+
+    report = pd.DataFrame({
+        "before_dtype": before.dtypes.astype(str),
+        "after_dtype": after.dtypes.astype(str),
+        "before_bytes": before.memory_usage(deep=True, index=False),
+        "after_bytes": after.memory_usage(deep=True, index=False),
+    })
+    totals = report[["before_bytes", "after_bytes"]].sum().to_frame("TOTAL").T
+    return pd.concat([report, totals])
+
+
+if __name__ == "__main__":
+    # Usage: python src/storage.py [table.csv] [max rows]
+    import sys
+
+    table = sys.argv[1] if len(sys.argv) > 1 else "dataset/orders.csv"
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    report = memory_report(table, rows)
+    total = report.loc["TOTAL"]
+
+    print(report.fillna("").to_string())
+    print(
+        f"✅ {table}: {total['before_bytes'] / 2**20:.1f} MB -> {total['after_bytes'] / 2**20:.1f} MB "
+        f"({total['before_bytes'] / max(total['after_bytes'], 1):.1f}x smaller)"
+    )
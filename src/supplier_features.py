@@ -0,0 +1,76 @@
+import pandas as pd
+
+# -----------------------------
+# Shared per-supplier feature engine
+# -----------------------------
+# Every supplier aggregate used by the pipeline is derived from running sums
+# and counts, computed in one vectorized groupby (no per-group Python lambdas).
+
+# order column -> (sum column, average feature)
+SUM_COLUMNS = {
+    "delay_days": ("delay_days_sum", "avg_delay_days"),
+    "defect_rate": ("defect_rate_sum", "avg_defect_rate"),
+    "price_change_percent": ("price_change_sum", "avg_price_change"),
+}
+
+# Supplier history features fed to the delay model
+HISTORY_FEATURES = {
+    "avg_delay_days": "supplier_avg_delay_days",
+    "avg_defect_rate": "supplier_avg_defect_rate",
+    "on_time_rate": "supplier_on_time_rate",
+}
+
+
+def supplier_aggregates(orders):
+    """
+    Per-supplier running totals: total_orders, on_time_count and a *_sum
+    column for every numeric order column present in `orders`.
+    """
+    frame = pd.DataFrame({"supplier_id": orders["supplier_id"]})
+    agg_spec = {"total_orders": ("supplier_id", "size")}
+
+    if "order_status" in orders.columns:
+        frame["on_time"] = (orders["order_status"] == "OnTime").astype("int64")
+        agg_spec["on_time_count"] = ("on_time", "sum")
+
+    for col, (sum_col, _) in SUM_COLUMNS.items():
+        if col in orders.columns:
+            frame[col] = orders[col]
+            agg_spec[sum_col] = (col, "sum")
+
+    return frame.groupby("supplier_id", sort=True, observed=True).agg(**agg_spec).reset_index()
+
+
+def features_from_aggregates(aggregates):
+    """Turn running totals into per-supplier averages and rates."""
+    features = aggregates[["supplier_id", "total_orders"]].copy()
+    counts = aggregates["total_orders"]
+
+    for sum_col, avg_col in SUM_COLUMNS.values():
+        if sum_col in aggregates.columns:
+            features[avg_col] = aggregates[sum_col] / counts
+
+    if "on_time_count" in aggregates.columns:
+        features["on_time_rate"] = aggregates["on_time_count"] / counts
+
+    return features
+
+
+def supplier_features(orders):
+    """
+    Per-supplier features: total_orders, avg_delay_days, avg_defect_rate,
+    avg_price_change and on_time_rate (for the columns present in `orders`).
+    """
+    return features_from_aggregates(supplier_aggregates(orders))
+
+
+def history_features(features):
+    """Rename supplier features to the supplier_* names the delay model uses."""
+    return features[["supplier_id", *HISTORY_FEATURES]].rename(columns=HISTORY_FEATURES)
+
+
+def add_supplier_history(orders, features=None):
+    """Left-join supplier history features onto order rows."""
+    if features is None:
+        features = supplier_features(orders)
+    return orders.merge(history_features(features), on="supplier_id", how="left")
@@ -0,0 +1,146 @@
+import json
+import os
+import uuid
+
+import pandas as pd
+
+import order_log
+from instrumentation import add_rows, timed
+from storage import ORDER_DTYPES, read_table, resolve_table_path
+from supplier_features import features_from_aggregates, supplier_aggregates
+
+# -----------------------------
+# Persistent per-supplier running totals
+# -----------------------------
+# dataset/supplier_aggregates.csv holds, per supplier, total_orders,
+# on_time_count, delay_days_sum, defect_rate_sum and price_change_sum.
+# A small JSON state file holds an order_log snapshot of orders.csv, so rows
+# appended to the CSV are folded in by reading only the new tail.
+# A rewritten orders file (or a columnar copy) triggers a full rebuild.
+
+ORDERS_PATH = "dataset/orders.csv"
+AGGREGATES_PATH = "dataset/supplier_aggregates.csv"
+STATE_PATH = "dataset/supplier_aggregates.json"
+
+AGGREGATE_INPUT_COLS = ["supplier_id", "order_status", "delay_days", "defect_rate", "price_change_percent"]
+AGGREGATE_COLS = ["total_orders", "on_time_count", "delay_days_sum", "defect_rate_sum", "price_change_sum"]
+
+
+def _load_state():
+    if not (os.path.exists(STATE_PATH) and os.path.exists(AGGREGATES_PATH)):
+        return None
+    with open(STATE_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save(aggregates, state):
+    os.makedirs(os.path.dirname(AGGREGATES_PATH), exist_ok=True)
+    # Write-then-rename so readers never see a half-written store; unique tmp
+    # names because app sessions and pipeline stages may sync at the same time
+    tmp_path = f"{AGGREGATES_PATH}.{uuid.uuid4().hex[:8]}.tmp"
+    aggregates.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, AGGREGATES_PATH)
+
+    tmp_path = f"{STATE_PATH}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, STATE_PATH)
+
+
+def merge_aggregates(base, delta):
+    """Add the running totals in `delta` onto `base` (both keyed by supplier_id)."""
+    merged = (
+        base.set_index("supplier_id")[AGGREGATE_COLS]
+        .add(delta.set_index("supplier_id")[AGGREGATE_COLS], fill_value=0)
+    )
+    merged[["total_orders", "on_time_count"]] = merged[["total_orders", "on_time_count"]].astype("int64")
+    return merged.reset_index()
+
+
+def rebuild(orders_path=ORDERS_PATH, orders=None):
+    """Recompute the store from the full order history (`orders`, if already loaded)."""
+    if orders is None:
+        orders = read_table(orders_path, columns=AGGREGATE_INPUT_COLS)
+    add_rows(len(orders))
+    aggregates = supplier_aggregates(orders)[["supplier_id", *AGGREGATE_COLS]]
+
+    resolved = resolve_table_path(orders_path)
+    if resolved.endswith(".csv"):
+        state = order_log.snapshot(resolved)
+    else:
+        stat = os.stat(resolved)
+        state = {"orders_path": resolved, "signature": [stat.st_mtime_ns, stat.st_size]}
+
+    _save(aggregates, state)
+    return aggregates
+
+
+@timed("stage.supplier_store_sync")
+def sync(orders_path=ORDERS_PATH, orders=None):
+    """
+    Bring the store up to date with the orders file and return the totals.
+
+    Rows appended to orders.csv since the last sync are read and folded in;
+    anything else (first run, rewritten file, columnar orders) rebuilds,
+    from `orders` when the caller has the full table loaded already.
+    """
+    state = _load_state()
+    resolved = resolve_table_path(orders_path)
+    if resolved is None:
+        raise FileNotFoundError(f"{orders_path} not found")
+
+    if state is None or state.get("orders_path") != resolved:
+        return rebuild(orders_path, orders)
+
+    if not resolved.endswith(".csv"):
+        stat = os.stat(resolved)
+        if state.get("signature") == [stat.st_mtime_ns, stat.st_size]:
+            return pd.read_csv(AGGREGATES_PATH, dtype={"supplier_id": str})
+        return rebuild(orders_path, orders)
+
+    if not order_log.is_append_of(resolved, state):
+        return rebuild(orders_path, orders)
+
+    aggregates = pd.read_csv(AGGREGATES_PATH, dtype={"supplier_id": str})
+    if not order_log.has_new_rows(resolved, state):
+        return aggregates
+
+    new_rows = order_log.read_appended(
+        state,
+        columns=AGGREGATE_INPUT_COLS,
+        dtype={c: ORDER_DTYPES[c] for c in AGGREGATE_INPUT_COLS}
+    )
+    add_rows(len(new_rows))
+    aggregates = merge_aggregates(aggregates, supplier_aggregates(new_rows))
+    _save(aggregates, order_log.snapshot(resolved))
+    return aggregates
+
+
+def append_orders(new_orders, orders_path=ORDERS_PATH):
+    """
+    Append order rows to orders.csv and fold them into the store in
+    O(len(new_orders)).
+    """
+    aggregates = sync(orders_path)
+    resolved = resolve_table_path(orders_path)
+    if not resolved.endswith(".csv"):
+        raise ValueError(f"Appending is only supported for CSV order files, got {resolved}")
+
+    header = order_log.read_header(resolved)
+    missing = [c for c in header if c not in new_orders.columns]
+    if missing:
+        raise ValueError(f"New orders are missing columns: {missing}")
+
+    if not order_log.ends_with_newline(resolved):
+        with open(resolved, "a", encoding="utf-8") as f:
+            f.write("\n")
+    new_orders[header].to_csv(resolved, mode="a", header=False, index=False)
+
+    aggregates = merge_aggregates(aggregates, supplier_aggregates(new_orders))
+    _save(aggregates, order_log.snapshot(resolved))
+    return aggregates
+
+
+def load_supplier_features(orders_path=ORDERS_PATH):
+    """Per-supplier averages and rates, served from the synced store."""
+    return features_from_aggregates(sync(orders_path))
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Trigram text index for the search boxes
+# -----------------------------
+# Each row's searchable columns (all of them by default; numbers and dates
+# by their string form) are lower-cased and joined with a separator that
+# never appears in a query, so matches cannot span two fields. A query is
+# one phrase matched case-insensitively as a substring of any field, like
+# the str.contains scan it replaces:
+#   - phrases of 3+ characters: intersect the posting lists of the phrase's
+#     trigrams, then confirm the candidates with a substring check
+#   - shorter phrases: a substring scan over the joined row text
+# Posting lists are kept CSR-style: one row-id array sliced by per-gram
+# offsets.
+
+NGRAM = 3
+FIELD_SEPARATOR = "\x1f"
+
+# Candidate counts up to this are confirmed with a plain loop (less overhead)
+SCAN_THRESHOLD = 256
+
+SUPPLIER_SEARCH_COLUMNS = ["supplier_id", "supplier_name", "location", "category", "contact_email"]
+
+
+def _postings(keys, rows, size):
+    """(keys by code, CSR offsets, row ids) with each key's rows sorted and unique."""
+    codes, uniques = pd.factorize(keys)
+    # One int64 per (code, row): sorting orders by code, then row
+    pairs = np.sort(codes.astype("int64") * max(size, 1) + rows)
+    keep = np.ones(len(pairs), dtype=bool)
+    keep[1:] = pairs[1:] != pairs[:-1]
+    pairs = pairs[keep]
+    codes, row_ids = np.divmod(pairs, max(size, 1))
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(uniques)))])
+    return list(uniques), offsets, row_ids.astype("int32")
+
+
+def _intersect(small, large):
+    """Sorted intersection; binary-searches the smaller list into the larger."""
+    if len(small) > len(large):
+        small, large = large, small
+    if len(small) == 0:
+        return small
+    positions = np.minimum(np.searchsorted(large, small), len(large) - 1)
+    return small[large[positions] == small]
+
+
+class TextIndex:
+    """Trigram index over the text columns of a frame."""
+
+    def __init__(self, frame, columns=None):
+        if columns is None:
+            # Every column, like the cell-by-cell search it replaces: log
+            # metrics (accuracy, F1, durations) stay searchable
+            columns = list(frame.columns)
+        self.columns = [c for c in columns if c in frame.columns]
+        self.size = len(frame)
+
+        texts = pd.Series([""] * self.size, dtype="str")
+        if self.columns:
+            texts = frame[self.columns[0]].fillna("").astype(str)
+            for col in self.columns[1:]:
+                texts = texts + FIELD_SEPARATOR + frame[col].fillna("").astype(str)
+        self.texts = texts.str.lower().reset_index(drop=True)
+
+        # Trigrams: one vectorized slice per character position
+        lengths = self.texts.str.len().to_numpy()
+        gram_keys, gram_rows = [], []
+        for start in range(int(lengths.max(initial=0)) - NGRAM + 1):
+            live = np.flatnonzero(lengths >= start + NGRAM)
+            grams = self.texts.iloc[live].str.slice(start, start + NGRAM)
+            keep = ~grams.str.contains(FIELD_SEPARATOR, regex=False).to_numpy()
+            gram_keys.append(grams.to_numpy()[keep])
+            gram_rows.append(live[keep])
+        grams, self._gram_offsets, self._gram_rows = _postings(
+            np.concatenate(gram_keys) if gram_keys else np.empty(0, dtype=object),
+            np.concatenate(gram_rows) if gram_rows else np.empty(0, dtype="int64"),
+            self.size
+        )
+        self._gram_codes = {gram: code for code, gram in enumerate(grams)}
+
+    @property
+    def nbytes(self):
+        arrays = [self._gram_offsets, self._gram_rows]
+        keys = 64 * len(self._gram_codes)
+        return int(sum(a.nbytes for a in arrays) + self.texts.memory_usage(deep=True) + keys)
+
+    def _gram(self, gram):
+        code = self._gram_codes.get(gram)
+        if code is None:
+            return None
+        return self._gram_rows[self._gram_offsets[code]:self._gram_offsets[code + 1]]
+
+    def _substring(self, term):
+        postings = [self._gram(term[i:i + NGRAM]) for i in range(len(term) - NGRAM + 1)]
+        if any(p is None for p in postings):
+            return np.empty(0, dtype="int32")
+        postings.sort(key=len)
+        rows = postings[0]
+        for other in postings[1:]:
+            if len(rows) == 0:
+                break
+            rows = _intersect(rows, other)
+        if len(term) == NGRAM or len(rows) == 0:
+            return rows
+        # Trigrams can all occur without being adjacent; confirm the survivors
+        if len(rows) <= SCAN_THRESHOLD:
+            found = [term in self.texts.iat[r] for r in rows]
+        else:
+            found = self.texts.iloc[rows].str.contains(term, regex=False).to_numpy()
+        return rows[np.asarray(found, dtype=bool)]
+
+    def _scan(self, phrase):
+        found = self.texts.str.contains(phrase, regex=False).to_numpy()
+        return np.flatnonzero(found).astype("int32")
+
+    def search(self, query):
+        """Sorted row positions with a field containing `query` (case-insensitive)."""
+        if not query.strip():
+            return np.arange(self.size, dtype="int32")
+        phrase = query.lower()
+        if len(phrase) < NGRAM:
+            # Too short for a trigram; every row is a candidate anyway
+            return self._scan(phrase)
+        return self._substring(phrase)
@@ -0,0 +1,294 @@
+import json
+import os
+import shutil
+import threading
+import uuid
+
+import pandas as pd
+
+import order_log
+from instrumentation import add_rows, timed
+from storage import ORDER_DTYPES, iter_table, resolve_table_path
+
+# -----------------------------
+# Date-partitioned order trend rollups
+# -----------------------------
+# Order counts, delayed counts and delay-day sums per period and per
+# (supplier, region, category), at daily / weekly / monthly grain:
+#
+#   dataset/trends/daily/2025-09.csv     one file per month of days
+#   dataset/trends/weekly/2025.csv       one file per year of weeks
+#   dataset/trends/monthly/2025.csv      one file per year of months
+#
+# Rows appended to orders.csv are rolled up and merged into the partitions
+# they touch only (tracked with an order_log snapshot, like supplier_store);
+# a rewritten orders file rebuilds everything. Charts read just the
+# partitions overlapping the requested date range.
+
+ORDERS_PATH = "dataset/orders.csv"
+TREND_DIR = "dataset/trends"
+STATE_PATH = os.path.join(TREND_DIR, "state.json")
+
+# grain -> (pandas period frequency, partition key format)
+GRAINS = {
+    "daily": ("D", "%Y-%m"),
+    "weekly": ("W", "%Y"),
+    "monthly": ("M", "%Y"),
+}
+
+DIMENSIONS = ["supplier_id", "region", "item_category"]
+MEASURE_COLS = ["orders", "delayed_orders", "delay_days_sum"]
+TREND_INPUT_COLS = ["order_date", *DIMENSIONS, "order_status", "delay_days"]
+
+CHUNK_SIZE = int(os.environ.get("APIS_TREND_CHUNK_SIZE", "500000"))
+
+# App sessions share one process; never merge the same appended rows twice
+_sync_lock = threading.Lock()
+
+
+def rollup(orders, grain):
+    """Sum the trend measures of `orders` per period start and dimension."""
+    freq = GRAINS[grain][0]
+    dates = pd.to_datetime(orders["order_date"], errors="coerce")
+    frame = pd.DataFrame({
+        "period": dates.dt.to_period(freq).dt.start_time,
+        **{dim: orders[dim] for dim in DIMENSIONS},
+        "orders": 1,
+        "delayed_orders": (orders["order_status"] == "Delayed").astype("int64"),
+        "delay_days_sum": orders["delay_days"].fillna(0),
+    })
+    frame = frame.dropna(subset=["period"])
+    return (
+        frame.groupby(["period", *DIMENSIONS], dropna=False, observed=True)[MEASURE_COLS]
+        .sum()
+        .reset_index()
+    )
+
+
+def merge_rollups(frames):
+    """Add rollups of the same grain together."""
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        # Typed, so callers can still use .dt on an empty rollup (e.g. only
+        # undated rows were appended)
+        return pd.DataFrame({
+            "period": pd.Series(dtype="datetime64[ns]"),
+            **{dim: pd.Series(dtype=object) for dim in DIMENSIONS},
+            "orders": pd.Series(dtype="int64"),
+            "delayed_orders": pd.Series(dtype="int64"),
+            "delay_days_sum": pd.Series(dtype="float64"),
+        })
+    if len(frames) == 1:
+        return frames[0]
+    return (
+        pd.concat(frames, ignore_index=True)
+        .groupby(["period", *DIMENSIONS], dropna=False, observed=True)[MEASURE_COLS]
+        .sum()
+        .reset_index()
+    )
+
+
+def _partition_keys(periods, grain):
+    return periods.dt.strftime(GRAINS[grain][1])
+
+
+def _grain_dir(grain):
+    return os.path.join(TREND_DIR, grain)
+
+
+def read_partition(path):
+    return pd.read_csv(path, dtype={dim: str for dim in DIMENSIONS}, parse_dates=["period"])
+
+
+def _write_partition(frame, path):
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    frame.sort_values("period").to_csv(tmp_path, index=False, date_format="%Y-%m-%d")
+    os.replace(tmp_path, path)
+
+
+def _merge_into_partitions(grain, delta):
+    """Fold `delta` into the partitions it touches; others are not read."""
+    if delta.empty:
+        return
+    grain_dir = _grain_dir(grain)
+    os.makedirs(grain_dir, exist_ok=True)
+    for key, part in delta.groupby(_partition_keys(delta["period"], grain)):
+        path = os.path.join(grain_dir, f"{key}.csv")
+        if os.path.exists(path):
+            part = merge_rollups([read_partition(path), part])
+        _write_partition(part, path)
+
+
+def _load_state():
+    if not os.path.exists(STATE_PATH):
+        return None
+    with open(STATE_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_state(state, resolved, periods):
+    state = dict(state)
+    firsts = [periods.min()]
+    lasts = [periods.max()]
+    previous = _load_state() or {}
+    if previous.get("orders_path") == resolved:
+        # Appends only widen the date range
+        firsts.append(pd.Timestamp(previous.get("first_date")))
+        lasts.append(pd.Timestamp(previous.get("last_date")))
+    firsts = [d for d in firsts if not pd.isna(d)]
+    lasts = [d for d in lasts if not pd.isna(d)]
+    state["first_date"] = min(firsts).strftime("%Y-%m-%d") if firsts else None
+    state["last_date"] = max(lasts).strftime("%Y-%m-%d") if lasts else None
+
+    os.makedirs(TREND_DIR, exist_ok=True)
+    tmp_path = f"{STATE_PATH}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, STATE_PATH)
+
+
+def _snapshot(resolved):
+    if resolved.endswith(".csv"):
+        return order_log.snapshot(resolved)
+    stat = os.stat(resolved)
+    return {"orders_path": resolved, "signature": [stat.st_mtime_ns, stat.st_size]}
+
+
+def _rollup_chunks(chunks):
+    """Daily/weekly/monthly rollups of a stream of order chunks."""
+    parts = {grain: [] for grain in GRAINS}
+    for chunk in chunks:
+        add_rows(len(chunk))
+        for grain in GRAINS:
+            parts[grain].append(rollup(chunk, grain))
+    return {grain: merge_rollups(frames) for grain, frames in parts.items()}
+
+
+def rebuild(orders_path=ORDERS_PATH):
+    """Recompute every partition from the full order history."""
+    resolved = resolve_table_path(orders_path)
+    rollups = _rollup_chunks(iter_table(orders_path, columns=TREND_INPUT_COLS, chunksize=CHUNK_SIZE))
+
+    for grain, frame in rollups.items():
+        # Build the new partitions beside the old ones, then swap directories
+        staging = f"{_grain_dir(grain)}.{uuid.uuid4().hex[:8]}.tmp"
+        os.makedirs(staging)
+        for key, part in frame.groupby(_partition_keys(frame["period"], grain)):
+            _write_partition(part, os.path.join(staging, f"{key}.csv"))
+        if os.path.exists(_grain_dir(grain)):
+            shutil.rmtree(_grain_dir(grain))
+        os.replace(staging, _grain_dir(grain))
+
+    if os.path.exists(STATE_PATH):
+        os.remove(STATE_PATH)
+    _save_state(_snapshot(resolved), resolved, rollups["daily"]["period"])
+
+
+@timed("stage.trend_sync")
+def sync(orders_path=ORDERS_PATH):
+    """
+    Bring the rollups up to date with the orders file.
+
+    Rows appended to orders.csv since the last sync are rolled up and merged
+    into their partitions; anything else (first run, rewritten file, new
+    columnar copy) rebuilds.
+    """
+    with _sync_lock:
+        state = _load_state()
+        resolved = resolve_table_path(orders_path)
+        if resolved is None:
+            raise FileNotFoundError(f"{orders_path} not found")
+
+        if state is None or state.get("orders_path") != resolved:
+            rebuild(orders_path)
+            return
+
+        if not resolved.endswith(".csv"):
+            stat = os.stat(resolved)
+            if state.get("signature") != [stat.st_mtime_ns, stat.st_size]:
+                rebuild(orders_path)
+            return
+
+        if not order_log.is_append_of(resolved, state):
+            rebuild(orders_path)
+            return
+
+        if not order_log.has_new_rows(resolved, state):
+            return
+
+        new_rows = order_log.read_appended(
+            state,
+            columns=TREND_INPUT_COLS,
+            dtype={c: ORDER_DTYPES[c] for c in TREND_INPUT_COLS if c in ORDER_DTYPES},
+            chunksize=CHUNK_SIZE
+        )
+        rollups = _rollup_chunks(new_rows)
+        for grain, frame in rollups.items():
+            _merge_into_partitions(grain, frame)
+        _save_state(order_log.snapshot(resolved), resolved, rollups["daily"]["period"])
+
+
+def date_bounds():
+    """(first, last) order date covered by the rollups, or (None, None)."""
+    state = _load_state() or {}
+    first, last = state.get("first_date"), state.get("last_date")
+    return (
+        pd.Timestamp(first) if first else None,
+        pd.Timestamp(last) if last else None,
+    )
+
+
+def load_trend(grain="daily", start=None, end=None, by=None, filters=None, reader=read_partition):
+    """
+    Orders, delayed orders, delay rate (%) and average delay per period.
+
+    Only partitions overlapping [start, end] are read. `by` splits the series
+    by one dimension; `filters` ({dimension: value}) keeps matching rows.
+    `reader` lets callers cache partitions (defaults to reading the CSV).
+    """
+    grain_dir = _grain_dir(grain)
+    freq, key_format = GRAINS[grain]
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+
+    # Partitions are keyed by period start: the week holding `start` can sit
+    # in the previous year's file
+    first_period = start.to_period(freq).start_time if start is not None else None
+
+    frames = []
+    if os.path.isdir(grain_dir):
+        for name in sorted(os.listdir(grain_dir)):
+            if not name.endswith(".csv"):
+                continue
+            key = name[:-len(".csv")]
+            if first_period is not None and key < first_period.strftime(key_format):
+                continue
+            if end is not None and key > end.strftime(key_format):
+                continue
+            frames.append(reader(os.path.join(grain_dir, name)))
+
+    group_cols = ["period"] + ([by] if by else [])
+    if not frames:
+        return pd.DataFrame(columns=[*group_cols, *MEASURE_COLS, "delay_rate", "avg_delay_days"])
+
+    trend = pd.concat(frames, ignore_index=True)
+    mask = pd.Series(True, index=trend.index)
+    if start is not None:
+        mask &= trend["period"] >= first_period
+    if end is not None:
+        mask &= trend["period"] <= end
+    for dim, value in (filters or {}).items():
+        mask &= trend[dim] == value
+
+    trend = trend[mask].groupby(group_cols, dropna=False, observed=True)[MEASURE_COLS].sum().reset_index()
+    trend["delay_rate"] = (trend["delayed_orders"] / trend["orders"] * 100).round(2)
+    trend["avg_delay_days"] = (trend["delay_days_sum"] / trend["orders"]).round(2)
+    return trend
+
+
+if __name__ == "__main__":
+    sync()
+    first, last = date_bounds()
+    print("✅ Order trend rollups up to date!")
+    print(f"Covering: {first:%Y-%m-%d} -> {last:%Y-%m-%d}" if first is not None else "Covering: no dated orders")
+    print(f"Saved: {TREND_DIR}/<daily|weekly|monthly>/")
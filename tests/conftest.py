@@ -0,0 +1,17 @@
+import os
+import sys
+
+# Pipeline modules in src/ are imported by bare name, as the scripts do
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+import pytest
+
+# The 200-order sample shipped with the repo
+SAMPLE_DIR = os.path.join(os.path.dirname(SRC_DIR), "Dataset")
+
+
+@pytest.fixture(scope="session")
+def sample_orders_path():
+    return os.path.join(SAMPLE_DIR, "orders.csv")
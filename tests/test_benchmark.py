@@ -0,0 +1,31 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+import benchmark
+
+WORKER_MB = 300
+
+
+def _allocate(mb):
+    block = np.ones(mb * 2**20, dtype="uint8")  # touched, so it is resident
+    time.sleep(4 * benchmark.RSS_SAMPLE_INTERVAL_S)
+    return int(block[-1])
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc") or "forkserver" not in multiprocessing.get_all_start_methods(),
+                    reason="needs /proc and the forkserver start method")
+def test_forkserver_worker_peak_is_reported():
+    # Training pools start from a forkserver, whose workers are not our children
+    sampler = benchmark.TreeRssSampler()
+    sampler.start()
+    with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("forkserver")) as pool:
+        assert list(pool.map(_allocate, [WORKER_MB, WORKER_MB])) == [1, 1]
+    peak_mb, source = benchmark._peak_rss_mb(sampler.stop())
+
+    assert source == "children"
+    assert peak_mb >= WORKER_MB
@@ -0,0 +1,90 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder
+
+import feature_cache
+from feature_cache import CATEGORICAL_COLUMNS, FEATURES, HISTORY_COLUMNS, NUMERIC_COLUMNS, design_matrix
+
+
+@pytest.fixture
+def frame(sample_orders_path):
+    df = pd.read_csv(sample_orders_path)
+    rng = np.random.default_rng(0)
+    for col in HISTORY_COLUMNS:
+        df[col] = rng.random(len(df))
+    df["target"] = (df["order_status"] == "Delayed").astype(int)
+    return df
+
+
+def _baseline(df):
+    # The encoding model_training.py fitted on the raw frame before the cache
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ("cat", OneHotEncoder(handle_unknown="ignore"), CATEGORICAL_COLUMNS),
+            ("num", "passthrough", NUMERIC_COLUMNS)
+        ],
+        sparse_threshold=0
+    )
+    return preprocessor.fit_transform(df[FEATURES])
+
+
+def _check(df, cache_dir, expected_status):
+    X, y, preprocessor, status = design_matrix(df, cache_dir)
+    with X:
+        assert status == expected_status
+        np.testing.assert_array_equal(X.rows(np.arange(len(df))), _baseline(df))
+        np.testing.assert_array_equal(y, df["target"].to_numpy())
+        np.testing.assert_array_equal(preprocessor.transform(df[FEATURES]), _baseline(df))
+
+
+def test_rebuild_hit_and_append_match_full_encoding(frame, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    head = frame.iloc[:150]
+    assert all(set(frame[c]) == set(head[c]) for c in CATEGORICAL_COLUMNS)
+
+    _check(head, cache_dir, "rebuilt")
+    _check(head, cache_dir, "hit")
+    _check(frame, cache_dir, "appended")
+    _check(frame, cache_dir, "hit")
+
+
+def test_changed_rows_and_new_categories_rebuild(frame, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    _check(frame.iloc[:150], cache_dir, "rebuilt")
+
+    changed = frame.copy()
+    changed.loc[3, "quantity"] += 1
+    _check(changed, cache_dir, "rebuilt")
+
+    grown = pd.concat([changed, changed.tail(5).assign(region="Antarctica")], ignore_index=True)
+    _check(grown, cache_dir, "rebuilt")
+
+
+def test_blocks_are_compacted(frame, tmp_path, monkeypatch):
+    monkeypatch.setattr(feature_cache, "MAX_BLOCKS", 2)
+    cache_dir = str(tmp_path / "cache")
+    for rows in [100, 120, 140, 160, 200]:
+        status = "rebuilt" if rows == 100 else "appended"
+        _check(frame.iloc[:rows], cache_dir, status)
+    assert len(feature_cache._load_meta(cache_dir)["blocks"]) <= 2
+
+
+def test_rows_gather_across_blocks_and_survive_pickling(frame, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    design_matrix(frame.iloc[:150], cache_dir)[0].close()
+    X, _, _, _ = design_matrix(frame, cache_dir)
+
+    index = np.array([199, 0, 150, 149, 7, 199])
+    expected = _baseline(frame)[index]
+    np.testing.assert_array_equal(X.rows(index), expected)
+    np.testing.assert_array_equal(pickle.loads(pickle.dumps(X)).rows(index, "float32"), expected.astype("float32"))
+    assert X.shape == (len(frame), expected.shape[1])
+
+    history_path = X._history_path
+    X.close()
+    assert not os.path.exists(history_path)
@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import generate_final_report as report
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # Several chunks even for small test tables
+    monkeypatch.setattr(report, "CHUNK_SIZE", 7)
+
+
+@pytest.fixture
+def risk_report(tmp_path):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        "supplier_id": [f"S{i:03d}" for i in range(60)],
+        # Few distinct values, so ties straddle chunk boundaries
+        "risk_score": rng.integers(0, 8, 60) * 12.5,
+    })
+    path = os.path.join(tmp_path, "supplier_risk_report.csv")
+    frame.to_csv(path, index=False)
+    return path, frame
+
+
+@pytest.mark.parametrize("k", [1, 3, 10])
+def test_top_k_matches_stable_sort(small_chunks, risk_report, k):
+    path, frame = risk_report
+    riskiest, safest = report.top_k_suppliers(path, k)
+
+    expected = frame.sort_values("risk_score", ascending=False, kind="stable").head(k)
+    assert riskiest == expected["supplier_id"].tolist()
+    expected = frame.sort_values("risk_score", ascending=True, kind="stable").head(k)
+    assert safest == expected["supplier_id"].tolist()
+
+
+def test_segment_counts_match_value_counts(small_chunks, tmp_path, sample_orders_path):
+    clusters = pd.read_csv(os.path.join(os.path.dirname(sample_orders_path), "supplier_clusters.csv"))
+    clusters = pd.concat([clusters] * 5, ignore_index=True)
+    path = os.path.join(tmp_path, "supplier_clusters.csv")
+    clusters.to_csv(path, index=False)
+
+    counts = report.segment_counts(path)
+    assert counts == clusters["supplier_segment"].value_counts().to_dict()
+    assert list(counts.values()) == sorted(counts.values(), reverse=True)
+
+
+def test_missing_inputs_give_empty_summaries(tmp_path):
+    missing = os.path.join(tmp_path, "nothing.csv")
+    assert report.top_k_suppliers(missing) == ([], [])
+    assert report.segment_counts(missing) == {}
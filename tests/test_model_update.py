@@ -0,0 +1,127 @@
+import copy
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+import model_comparison
+import model_training
+import model_update
+import retrain_model
+from enrich_orders import generate
+from feature_cache import design_matrix
+from model_registry import latest_version, load_version, version_metrics
+
+FIRST_ROWS = 3000
+APPENDED_ROWS = 500
+
+
+def _forest():
+    return {"RandomForest": RandomForestClassifier(n_estimators=20, random_state=42, n_jobs=1)}
+
+
+def _logistic():
+    return {"LogisticRegression": LogisticRegression(max_iter=2000)}
+
+
+def _write_orders(all_orders, rows):
+    all_orders.head(rows).to_csv("dataset/orders.csv", index=False)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generate(30, FIRST_ROWS + APPENDED_ROWS, out_dir="synthetic")
+    os.makedirs("dataset")
+    all_orders = pd.read_csv("synthetic/orders.csv")
+    _write_orders(all_orders, FIRST_ROWS)
+
+    # Small, in-process fits; every update clears the thresholds
+    monkeypatch.setattr(model_comparison, "TRAIN_WORKERS", 1)
+    monkeypatch.setattr(model_training, "candidate_models", _forest)
+    monkeypatch.setattr(retrain_model, "candidate_models", _forest)
+    monkeypatch.setattr(model_update, "MIN_NEW_ROWS", 100)
+    monkeypatch.setattr(model_update, "MAX_F1_DROP", 1.0)
+    return all_orders
+
+
+@pytest.fixture
+def encoded(workdir):
+    X, y, _, _ = design_matrix(retrain_model.training_frame())
+    yield X, y
+    X.close()
+
+
+def test_forest_update_keeps_live_trees_and_grows_new_ones(encoded):
+    X, y = encoded
+    seen, fit_rows = np.arange(2000), np.arange(2000, FIRST_ROWS)
+    live = RandomForestClassifier(n_estimators=10, random_state=0).fit(X.rows(seen), y[seen])
+    before = copy.deepcopy(live)
+
+    updated = model_update.update_estimator(live, X, y, fit_rows)
+
+    assert len(updated.estimators_) == 10 + model_update.UPDATE_TREES
+    rows = X.rows(np.arange(FIRST_ROWS))
+    for old, kept in zip(before.estimators_, updated.estimators_):
+        np.testing.assert_array_equal(old.predict(rows), kept.predict(rows))
+    # The live model itself is untouched
+    assert len(live.estimators_) == 10
+
+
+def test_partial_fit_update_learns_from_new_rows_only(encoded):
+    X, y = encoded
+    seen, fit_rows = np.arange(2000), np.arange(2000, FIRST_ROWS)
+    live = SGDClassifier(loss="log_loss", random_state=0).fit(X.rows(seen), y[seen])
+
+    expected = copy.deepcopy(live).partial_fit(X.rows(fit_rows), y[fit_rows])
+    updated = model_update.update_estimator(live, X, y, fit_rows)
+    np.testing.assert_array_equal(updated.coef_, expected.coef_)
+
+
+def test_logistic_regression_has_no_incremental_update(encoded):
+    X, y = encoded
+    live = LogisticRegression(max_iter=2000).fit(X.rows(np.arange(2000)), y[:2000])
+    assert model_update.update_estimator(live, X, y, np.arange(2000, FIRST_ROWS)) is None
+
+
+def test_update_after_model_training_publishes_holdout_metrics(workdir):
+    model_training.main()
+    base = latest_version()
+    assert version_metrics(base)["order_rows"] == FIRST_ROWS
+
+    _write_orders(workdir, FIRST_ROWS + APPENDED_ROWS)
+    record = model_update.update_model()
+    assert record["action"] == "published"
+
+    info = version_metrics(record["version"])
+    assert info["update"] == "incremental"
+    assert info["order_rows"] == FIRST_ROWS + APPENDED_ROWS
+    assert info["holdout_rows"] == APPENDED_ROWS * model_update.HOLDOUT_SIZE
+    assert "f1_score" not in info and info["holdout_f1_score"] == record["updated_f1"]
+
+    # The published forest is the live one plus UPDATE_TREES trees
+    live, updated = load_version(base), load_version(record["version"])
+    assert len(updated.named_steps["model"].estimators_) == (
+        len(live.named_steps["model"].estimators_) + model_update.UPDATE_TREES
+    )
+    assert model_update.update_model()["action"] == "skipped"
+
+    with open(model_update.UPDATE_LOG_PATH, newline="", encoding="utf-8") as f:
+        log = list(csv.reader(f))
+    assert log[0] == model_update.UPDATE_LOG_COLUMNS
+    assert [row[1] for row in log[1:]] == ["published", "skipped"]
+
+
+def test_live_logistic_regression_gets_a_full_retrain(workdir, monkeypatch):
+    monkeypatch.setattr(retrain_model, "candidate_models", _logistic)
+    retrain_model.train_and_save_model()
+
+    _write_orders(workdir, FIRST_ROWS + APPENDED_ROWS)
+    record = model_update.update_model()
+    assert record["action"] == "full_retrain"
+    assert record["reason"] == "LogisticRegression has no incremental update"
+    assert version_metrics(latest_version())["order_rows"] == FIRST_ROWS + APPENDED_ROWS
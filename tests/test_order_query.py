@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from order_query import OrderIndex
+from storage import read_table
+
+
+@pytest.fixture(scope="module")
+def orders(sample_orders_path):
+    return read_table(sample_orders_path)
+
+
+@pytest.fixture(scope="module")
+def index(orders):
+    return OrderIndex(orders)
+
+
+def _baseline_mask(df, filters, ranges):
+    # The explorer's boolean masks before the index
+    mask = pd.Series(True, index=df.index)
+    for col, value in filters.items():
+        mask &= df[col] == value
+    for col, (low, high) in ranges.items():
+        if low is not None:
+            mask &= df[col] >= low
+        if high is not None:
+            mask &= df[col] <= high
+    return mask.to_numpy()
+
+
+QUERIES = [
+    ({}, {}),
+    ({"supplier_id": "S01"}, {}),
+    ({"order_status": "Delayed", "order_priority": "High"}, {}),
+    ({}, {"delay_days": (1, None)}),
+    ({"region": "North"}, {"defect_rate": (0.02, 0.04), "quantity": (None, 150)}),
+    ({"supplier_id": "S03", "order_status": "OnTime"}, {"unit_price": (100, 100)}),
+    ({"supplier_id": "S99"}, {}),
+]
+
+
+@pytest.mark.parametrize("filters, ranges", QUERIES)
+def test_filter_rows_match_masks(orders, index, filters, ranges):
+    expected = np.flatnonzero(_baseline_mask(orders, filters, ranges))
+    np.testing.assert_array_equal(index.filter_rows(filters, ranges), expected)
+
+
+@pytest.mark.parametrize("filters, ranges", QUERIES[:5])
+@pytest.mark.parametrize("sort_by", ["delay_days", "defect_rate", "unit_price"])
+@pytest.mark.parametrize("ascending", [True, False])
+def test_pages_match_sort_values(orders, index, filters, ranges, sort_by, ascending):
+    expected = orders[_baseline_mask(orders, filters, ranges)].sort_values(sort_by, ascending=ascending, kind="stable")
+
+    rows = index.filter_rows(filters, ranges)
+    pages = [index.query(filters, ranges, sort_by, ascending, page, page_size=7)[0] for page in range(len(rows) // 7 + 2)]
+    result = pd.concat(pages)
+
+    # Same sort keys in the same order; rows with equal keys may come in either order
+    np.testing.assert_array_equal(result[sort_by].to_numpy(), expected[sort_by].to_numpy())
+    assert sorted(result["order_id"]) == sorted(expected["order_id"])
+    if ascending:
+        assert list(result["order_id"]) == list(expected["order_id"])
+
+
+@pytest.mark.parametrize("filters, ranges", QUERIES)
+def test_summary_matches_frame_aggregates(orders, index, filters, ranges):
+    filtered = orders[_baseline_mask(orders, filters, ranges)]
+    summary = index.summary(index.filter_rows(filters, ranges))
+
+    assert summary["orders"] == len(filtered)
+    assert summary["OnTime"] == (filtered["order_status"] == "OnTime").sum()
+    assert summary["Delayed"] == (filtered["order_status"] == "Delayed").sum()
+    np.testing.assert_allclose(
+        [summary["avg_delay_days"], summary["avg_defect_rate"]],
+        [filtered["delay_days"].mean(), filtered["defect_rate"].mean()]
+    )
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import risk_engine
+from storage import read_table
+
+
+# Row-wise formulas the pages and scripts used before the engine
+def _baseline_order_risk(df):
+    priority_weight = {"Low": 5, "Medium": 10, "High": 20}
+    df = df.assign(priority_weight=df["order_priority"].astype(object).map(priority_weight).fillna(10))
+    return (
+        (df["delay_days"] * 18) +
+        (df["defect_rate"] * 100 * 2.5) +
+        (df["price_change_percent"].abs() * 1.2) +
+        (df["priority_weight"] * 0.6)
+    ).clip(0, 100)
+
+
+def _baseline_category(score):
+    if score >= 70:
+        return "High"
+    elif score >= 40:
+        return "Medium"
+    return "Low"
+
+
+@pytest.fixture
+def orders(sample_orders_path):
+    df = read_table(sample_orders_path)
+    # An unknown priority label falls back to the default weight
+    df["order_priority"] = df["order_priority"].cat.add_categories("Urgent")
+    df.loc[0, "order_priority"] = "Urgent"
+    return df
+
+
+def test_order_risk_matches_row_formula(orders):
+    np.testing.assert_allclose(risk_engine.order_risk_scores(orders), _baseline_order_risk(orders))
+
+
+def _supplier_means(frame):
+    return {str(k): v for k, v in zip(frame["supplier_id"], frame["risk_score"])}
+
+
+def test_supplier_order_risk_matches_groupby_mean(sample_orders_path):
+    df = read_table(sample_orders_path)
+    expected = (
+        df.assign(risk_score=_baseline_order_risk(df).to_numpy())
+        .groupby("supplier_id", observed=True)["risk_score"].mean()
+    )
+    expected = {str(k): v for k, v in expected.items()}
+
+    # Streamed from the file in small chunks, and scored as one loaded frame
+    streamed = _supplier_means(risk_engine.supplier_order_risk(sample_orders_path, chunksize=37))
+    in_memory = _supplier_means(risk_engine.supplier_order_risk(orders=df))
+    for result in (streamed, in_memory):
+        assert result.keys() == expected.keys()
+        np.testing.assert_allclose([result[k] for k in expected], list(expected.values()))
+
+
+def test_supplier_risk_and_bands_match_row_formula():
+    features = pd.DataFrame({
+        "avg_defect_rate": [0.0, 0.05, 0.1, 0.2, 0.04],
+        "avg_delay_days": [0.0, 2.0, 5.0, 10.0, 1.5],
+        "on_time_rate": [1.0, 0.8, 0.5, 0.0, 0.9],
+    })
+    expected = (
+        (features["avg_defect_rate"] * 400) +
+        (features["avg_delay_days"] * 3) +
+        ((1 - features["on_time_rate"]) * 50)
+    ).clip(0, 100)
+
+    scores = risk_engine.supplier_risk_scores(features)
+    np.testing.assert_allclose(scores, expected)
+    # Band edges included
+    edges = np.array([*scores, 0, 39.99, 40, 69.99, 70, 100])
+    assert list(risk_engine.risk_category(edges)) == [_baseline_category(s) for s in edges]
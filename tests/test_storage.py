@@ -0,0 +1,62 @@
+import shutil
+
+import pandas as pd
+import pytest
+
+import storage
+
+
+@pytest.fixture
+def orders_csv(tmp_path, sample_orders_path):
+    path = tmp_path / "orders.csv"
+    shutil.copy(sample_orders_path, path)
+    return str(path)
+
+
+def _baseline(path):
+    # What the loaders did before the storage layer: inferred dtypes
+    return pd.read_csv(path, parse_dates=storage.ORDER_DATE_COLS)
+
+
+def test_csv_read_matches_inferred_read(orders_csv):
+    typed = storage.read_table(orders_csv)
+    assert isinstance(typed["supplier_id"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(
+        typed.astype({c: object for c in typed.select_dtypes("category").columns}),
+        _baseline(orders_csv),
+        check_dtype=False
+    )
+
+
+@pytest.mark.skipif(not storage.HAS_PYARROW, reason="pyarrow not installed")
+@pytest.mark.parametrize("fmt", ["parquet", "feather"])
+def test_columnar_round_trip_keeps_values_and_dtypes(orders_csv, fmt):
+    expected = storage.read_table(orders_csv)
+    out_path = storage.write_table(expected, orders_csv, fmt=fmt)
+
+    assert storage.resolve_table_path(orders_csv) == out_path
+    pd.testing.assert_frame_equal(storage.read_table(orders_csv), expected)
+    pd.testing.assert_frame_equal(
+        storage.read_table(orders_csv, columns=["order_id", "defect_rate"]),
+        expected[["order_id", "defect_rate"]]
+    )
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "feather"])
+def test_iter_table_chunks_concatenate_to_read_table(orders_csv, fmt):
+    if fmt != "csv":
+        if not storage.HAS_PYARROW:
+            pytest.skip("pyarrow not installed")
+        storage.write_table(storage.read_table(orders_csv), orders_csv, fmt=fmt)
+
+    chunks = list(storage.iter_table(orders_csv, chunksize=64))
+    if fmt != "feather":
+        # Feather yields the record batches the file was written with
+        assert [len(c) for c in chunks] == [64, 64, 64, 8]
+    # Each chunk has its own categories, so the concatenation is compared by value
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks, ignore_index=True),
+        storage.read_table(orders_csv),
+        check_dtype=False,
+        check_categorical=False
+    )
@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from text_index import SUPPLIER_SEARCH_COLUMNS, TextIndex
+
+
+def _baseline(frame, query, columns=None):
+    # The cell-by-cell scan the search boxes used before the index
+    frame = frame[columns] if columns else frame
+    mask = frame.astype(str).apply(lambda x: x.str.contains(query, case=False, regex=False)).any(axis=1)
+    return np.flatnonzero(mask.to_numpy())
+
+
+@pytest.fixture(scope="module")
+def tables(sample_orders_path):
+    sample_dir = os.path.dirname(sample_orders_path)
+    return {
+        "orders": pd.read_csv(sample_orders_path),
+        "suppliers": pd.read_csv(os.path.join(sample_dir, "suppliers.csv")),
+    }
+
+
+QUERIES = ["01", "a", "O", "ind sup", "S0", "2025-09", "0.02", "delayed", "Net6", "high", "60,", "xyz", "@"]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_orders_search_matches_str_contains(tables, query):
+    orders = tables["orders"]
+    np.testing.assert_array_equal(TextIndex(orders).search(query), _baseline(orders, query))
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_supplier_columns_search_matches_str_contains(tables, query):
+    suppliers = tables["suppliers"]
+    np.testing.assert_array_equal(
+        TextIndex(suppliers, SUPPLIER_SEARCH_COLUMNS).search(query),
+        _baseline(suppliers, query, [c for c in SUPPLIER_SEARCH_COLUMNS if c in suppliers.columns])
+    )
+
+
+def test_matches_do_not_span_fields():
+    frame = pd.DataFrame({"a": ["abc", "xyz"], "b": ["def", "abc def"]})
+    index = TextIndex(frame)
+    np.testing.assert_array_equal(index.search("c d"), [1])
+    np.testing.assert_array_equal(index.search("c"), [0, 1])
+    assert len(index.search("   ")) == 2
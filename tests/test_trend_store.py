@@ -0,0 +1,55 @@
+import os
+
+import pandas as pd
+import pytest
+
+import trend_store
+
+
+def _orders(dates, status="Delivered"):
+    return pd.DataFrame({
+        "order_id": [f"O{i}" for i in range(len(dates))],
+        "order_date": dates,
+        "supplier_id": "S1",
+        "region": "North",
+        "item_category": "Electronics",
+        "order_status": status,
+        "delay_days": 0,
+    })
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("dataset")
+    return tmp_path
+
+
+def test_sync_consumes_appended_undated_rows(workdir):
+    _orders(["2025-01-02", "2025-01-03"]).to_csv(trend_store.ORDERS_PATH, index=False)
+    trend_store.sync()
+
+    _orders([""] * 10).to_csv(trend_store.ORDERS_PATH, mode="a", header=False, index=False)
+    trend_store.sync()
+
+    # The snapshot moved past the undated rows, so the next sync has nothing to do
+    state = trend_store._load_state()
+    assert state["offset"] == os.path.getsize(trend_store.ORDERS_PATH)
+    assert trend_store.load_trend("daily")["orders"].sum() == 2
+    assert trend_store.date_bounds() == (pd.Timestamp("2025-01-02"), pd.Timestamp("2025-01-03"))
+
+
+def test_merge_rollups_of_nothing_is_typed():
+    empty = trend_store.merge_rollups([])
+    assert pd.api.types.is_datetime64_any_dtype(empty["period"])
+    assert trend_store._partition_keys(empty["period"], "weekly").empty
+
+
+def test_weekly_trend_keeps_week_starting_in_previous_year(workdir):
+    # 2024-12-30 is a Monday; that week is stored in weekly/2024.csv
+    _orders(["2024-12-31", "2025-01-02", "2025-01-08"]).to_csv(trend_store.ORDERS_PATH, index=False)
+    trend_store.sync()
+
+    trend = trend_store.load_trend("weekly", start="2025-01-01", end="2025-01-31")
+    assert list(trend["period"]) == [pd.Timestamp("2024-12-30"), pd.Timestamp("2025-01-06")]
+    assert list(trend["orders"]) == [2, 1]